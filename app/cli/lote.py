@@ -0,0 +1,78 @@
+# app/cli/lote.py
+"""
+Conversión masiva de estados de cuenta archivados (app/services/lote.py), sin la API.
+
+Analiza en un pool de procesos los PDFs de un directorio (recursivamente) o de un ZIP y escribe
+en el directorio de salida `resultados.ndjson` (una línea por documento, en el esquema v2) y,
+con --parquet (requiere pyarrow), las transacciones en `transacciones/parte-NNNNN.parquet`.
+Si se interrumpe, volver a ejecutar el mismo comando continúa desde el punto de control.
+
+Uso (desde la raíz del repositorio):
+    python -m app.cli.lote estados/ --salida convertidos/
+    python -m app.cli.lote archivo_2023.zip --salida convertidos/ --trabajadores 8 --parquet
+"""
+import argparse
+import sys
+from typing import Optional
+
+from app.core.config import LOTE_DOCUMENTOS_POR_BLOQUE, LOTE_TRABAJADORES
+from app.core.registro import configurar_registro
+from app.services import lote
+
+
+def _duracion(segundos: Optional[float]) -> str:
+    if segundos is None:
+        return "?"
+    minutos, segundos = divmod(int(segundos), 60)
+    horas, minutos = divmod(minutos, 60)
+    return f"{horas}:{minutos:02d}:{segundos:02d}"
+
+
+def reportar(progreso: lote.Progreso) -> None:
+    porcentaje = 100 * progreso.terminados / progreso.total if progreso.total else 100.0
+    errores = progreso.terminados - progreso.por_estado["ok"]
+    print(
+        f"{progreso.terminados}/{progreso.total} documentos ({porcentaje:.1f}%), {errores} sin convertir  "
+        f"{progreso.documentos_por_s:.2f} documentos/s, {progreso.transacciones_por_s:.0f} transacciones/s  "
+        f"transcurrido {_duracion(progreso.transcurrido_s)}, restante {_duracion(progreso.restante_s)}",
+        file=sys.stderr,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("origen", help="Directorio o archivo ZIP con los PDFs.")
+    parser.add_argument("--salida", required=True, help="Directorio de los resultados y del punto de control.")
+    parser.add_argument("--trabajadores", type=int, default=LOTE_TRABAJADORES, help="Procesos en paralelo (0: uno por CPU).")
+    parser.add_argument("--parquet", action="store_true", help="Escribe también las transacciones en Parquet.")
+    parser.add_argument("--plazo", type=float, default=None,
+                        help="Segundos máximos por documento (por omisión PLAZO_ANALISIS_S; 0 sin plazo).")
+    parser.add_argument("--documentos-por-bloque", type=int, default=LOTE_DOCUMENTOS_POR_BLOQUE)
+    parser.add_argument("--intervalo-progreso", type=float, default=5.0, help="Segundos entre reportes de avance.")
+    args = parser.parse_args()
+
+    if args.parquet and lote.pyarrow is None:
+        parser.error("--parquet requiere pyarrow (pip install pyarrow).")
+
+    configurar_registro()
+    try:
+        progreso = lote.convertir_lote(
+            args.origen,
+            args.salida,
+            trabajadores=args.trabajadores,
+            plazo_s=args.plazo,
+            parquet=args.parquet,
+            documentos_por_bloque=args.documentos_por_bloque,
+            al_progresar=reportar,
+            intervalo_progreso_s=args.intervalo_progreso,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    if progreso.previos:
+        print(f"{progreso.previos} documentos ya estaban convertidos (punto de control).", file=sys.stderr)
+    print(f"Resultados por estado: {dict(progreso.por_estado.most_common())}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
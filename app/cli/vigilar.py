@@ -0,0 +1,58 @@
+# app/cli/vigilar.py
+"""
+Ingesta continua de una carpeta (app/services/vigilancia.py), sin la API.
+
+Vigila un directorio (y sus subdirectorios) y analiza en un pool de procesos cada PDF nuevo o
+modificado, una sola vez por contenido (SHA-256). Los resultados se agregan a
+`resultados.ndjson` del directorio de salida, cuyo punto de control es el manifiesto de lo ya
+procesado; con --junto también se escribe `<archivo>.pdf.json` al lado de cada PDF. Se detiene
+con Ctrl+C o SIGTERM; al volver a arrancar procesa lo que llegó mientras estaba detenido.
+
+Uso (desde la raíz del repositorio):
+    python -m app.cli.vigilar /srv/sftp/estados --salida /var/lib/whobank/ingesta
+    python -m app.cli.vigilar /srv/sftp/estados --salida /var/lib/whobank/ingesta --trabajadores 8 --junto
+"""
+import argparse
+import signal
+import threading
+
+from app.core.config import LOTE_TRABAJADORES, VIGILANCIA_ESTABILIDAD_S
+from app.core.registro import configurar_registro
+from app.services import lote, vigilancia
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directorio", help="Directorio a vigilar.")
+    parser.add_argument("--salida", required=True, help="Directorio de los resultados y del manifiesto.")
+    parser.add_argument("--trabajadores", type=int, default=LOTE_TRABAJADORES, help="Procesos en paralelo (0: uno por CPU).")
+    parser.add_argument("--junto", action="store_true", help="Escribe también el resultado al lado de cada PDF.")
+    parser.add_argument("--parquet", action="store_true", help="Escribe también las transacciones en Parquet.")
+    parser.add_argument("--plazo", type=float, default=None,
+                        help="Segundos máximos por documento (por omisión PLAZO_ANALISIS_S; 0 sin plazo).")
+    parser.add_argument("--estabilidad", type=float, default=VIGILANCIA_ESTABILIDAD_S,
+                        help="Segundos sin cambios antes de analizar un PDF.")
+    parser.add_argument("--sondeo", action="store_true",
+                        help="Revisa la carpeta periódicamente (carpetas de red sin avisos del sistema).")
+    args = parser.parse_args()
+
+    if args.parquet and lote.pyarrow is None:
+        parser.error("--parquet requiere pyarrow (pip install pyarrow).")
+
+    configurar_registro()
+    vigilante = vigilancia.VigilanteCarpeta(
+        args.directorio,
+        args.salida,
+        trabajadores=args.trabajadores,
+        plazo_s=args.plazo,
+        parquet=args.parquet,
+        junto=args.junto,
+        estabilidad_s=args.estabilidad,
+    )
+    detener = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: detener.set())
+    vigilante.ejecutar(detener, sondeo=args.sondeo)
+
+
+if __name__ == "__main__":
+    main()
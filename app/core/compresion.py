@@ -0,0 +1,237 @@
+# app/core/compresion.py
+import zlib
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import (
+    COMPRESION_MINIMO_BYTES,
+    COMPRESION_NIVEL_BROTLI,
+    COMPRESION_NIVEL_GZIP,
+    COMPRESION_NIVEL_ZSTD,
+)
+
+# brotli y zstandard son opcionales: si no están instalados solo se ofrece gzip.
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depende del entorno
+    zstandard = None
+
+# Tipos de contenido que vale la pena comprimir (los PDF e imágenes ya vienen comprimidos).
+TIPOS_COMPRIMIBLES = ("application/json", "application/vnd.", "application/x-ndjson", "text/")
+
+
+class _Compresor(ABC):
+    """Interfaz común de los compresores incrementales (gzip, brotli, zstd)."""
+
+    @abstractmethod
+    def comprimir(self, datos: bytes) -> bytes:
+        ...
+
+    @abstractmethod
+    def vaciar(self) -> bytes:
+        """Entrega lo comprimido hasta ahora sin cerrar el flujo (para respuestas en streaming)."""
+
+    @abstractmethod
+    def terminar(self) -> bytes:
+        ...
+
+
+class _CompresorGzip(_Compresor):
+    def __init__(self):
+        self._compresor = zlib.compressobj(COMPRESION_NIVEL_GZIP, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def comprimir(self, datos: bytes) -> bytes:
+        return self._compresor.compress(datos)
+
+    def vaciar(self) -> bytes:
+        return self._compresor.flush(zlib.Z_SYNC_FLUSH)
+
+    def terminar(self) -> bytes:
+        return self._compresor.flush(zlib.Z_FINISH)
+
+
+class _CompresorBrotli(_Compresor):
+    def __init__(self):
+        self._compresor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=COMPRESION_NIVEL_BROTLI)
+
+    def comprimir(self, datos: bytes) -> bytes:
+        return self._compresor.process(datos)
+
+    def vaciar(self) -> bytes:
+        return self._compresor.flush()
+
+    def terminar(self) -> bytes:
+        return self._compresor.finish()
+
+
+class _CompresorZstd(_Compresor):
+    def __init__(self):
+        self._compresor = zstandard.ZstdCompressor(level=COMPRESION_NIVEL_ZSTD).compressobj()
+
+    def comprimir(self, datos: bytes) -> bytes:
+        return self._compresor.compress(datos)
+
+    def vaciar(self) -> bytes:
+        return self._compresor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def terminar(self) -> bytes:
+        return self._compresor.flush()
+
+
+def _codificaciones_disponibles() -> Dict[str, Callable[[], _Compresor]]:
+    """Codificaciones soportadas, en orden de preferencia del servidor."""
+    codificaciones: Dict[str, Callable[[], _Compresor]] = {}
+    if brotli is not None:
+        codificaciones["br"] = _CompresorBrotli
+    if zstandard is not None:
+        codificaciones["zstd"] = _CompresorZstd
+    codificaciones["gzip"] = _CompresorGzip
+    return codificaciones
+
+
+CODIFICACIONES = _codificaciones_disponibles()
+
+
+def elegir_codificacion(accept_encoding: str) -> Optional[str]:
+    """
+    Elige la codificación según la cabecera Accept-Encoding del cliente, respetando sus
+    valores q. A igual preferencia del cliente se usa el orden de `CODIFICACIONES`.
+    Devuelve None si el cliente no acepta ninguna de las disponibles.
+    """
+    aceptadas: Dict[str, float] = {}
+    for parte in accept_encoding.lower().split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        calidad = 1.0
+        parametro = parametros.strip()
+        if parametro.startswith("q="):
+            try:
+                calidad = float(parametro[2:])
+            except ValueError:
+                continue
+        if nombre:
+            aceptadas[nombre.strip()] = calidad
+
+    candidatas: List[Tuple[float, int, str]] = []
+    for orden, codificacion in enumerate(CODIFICACIONES):
+        calidad = aceptadas.get(codificacion, aceptadas.get("*", 0.0))
+        if calidad > 0:
+            candidatas.append((-calidad, orden, codificacion))
+    return min(candidatas)[2] if candidatas else None
+
+
+class CompresionMiddleware:
+    """
+    Middleware ASGI que comprime las respuestas con gzip, brotli o zstd según lo que
+    acepte el cliente.
+
+    - Las respuestas completas menores a `minimo_bytes` se envían sin comprimir.
+    - Las respuestas en streaming se comprimen por partes y cada parte se vacía al
+      cliente en cuanto llega, así que no se acumula todo el cuerpo en memoria.
+    - Las respuestas que ya traen Content-Encoding o cuyo tipo no es texto/JSON no se tocan.
+    - Todas llevan `Vary: Accept-Encoding`, también las que se envían sin comprimir: la
+      misma URL puede responderse comprimida a otro cliente, y un cache compartido no debe
+      entregar un cuerpo con una codificación distinta de la negociada.
+    """
+
+    def __init__(self, app: ASGIApp, minimo_bytes: int = COMPRESION_MINIMO_BYTES):
+        self.app = app
+        self.minimo_bytes = minimo_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codificacion = elegir_codificacion(Headers(scope=scope).get("accept-encoding", ""))
+        if codificacion is None:
+            async def enviar(mensaje: Message) -> None:
+                if mensaje["type"] == "http.response.start":
+                    _agregar_vary(mensaje)
+                await send(mensaje)
+
+            await self.app(scope, receive, enviar)
+            return
+
+        respuesta = _RespuestaComprimida(send, codificacion, self.minimo_bytes)
+        await self.app(scope, receive, respuesta.enviar)
+
+
+def _agregar_vary(inicio: Message) -> None:
+    MutableHeaders(raw=inicio["headers"]).add_vary_header("Accept-Encoding")
+
+
+class _RespuestaComprimida:
+    """Estado de la compresión de una sola respuesta."""
+
+    def __init__(self, send: Send, codificacion: str, minimo_bytes: int):
+        self.send = send
+        self.codificacion = codificacion
+        self.minimo_bytes = minimo_bytes
+        self.inicio: Optional[Message] = None
+        self.compresor: Optional[_Compresor] = None
+        self.directo = False
+
+    def _es_comprimible(self, cabeceras: Headers) -> bool:
+        if "content-encoding" in cabeceras:
+            return False
+        tipo = cabeceras.get("content-type", "")
+        if not tipo.startswith(TIPOS_COMPRIMIBLES):
+            return False
+        longitud = cabeceras.get("content-length")
+        return longitud is None or int(longitud) >= self.minimo_bytes
+
+    async def enviar(self, mensaje: Message) -> None:
+        if self.directo:
+            await self.send(mensaje)
+            return
+
+        if mensaje["type"] == "http.response.start":
+            # El inicio se retiene hasta ver el primer fragmento del cuerpo.
+            _agregar_vary(mensaje)
+            self.inicio = mensaje
+            if not self._es_comprimible(Headers(raw=mensaje["headers"])):
+                self.directo = True
+                await self.send(mensaje)
+            return
+
+        if mensaje["type"] != "http.response.body":
+            await self.send(mensaje)
+            return
+
+        cuerpo = mensaje.get("body", b"")
+        hay_mas = mensaje.get("more_body", False)
+
+        if self.compresor is None:
+            # Primer fragmento: si la respuesta está completa y es pequeña, no vale la pena.
+            if not hay_mas and len(cuerpo) < self.minimo_bytes:
+                self.directo = True
+                await self.send(self.inicio)
+                await self.send(mensaje)
+                return
+
+            self.compresor = CODIFICACIONES[self.codificacion]()
+            cabeceras = MutableHeaders(raw=self.inicio["headers"])
+            cabeceras["Content-Encoding"] = self.codificacion
+            if hay_mas:
+                del cabeceras["Content-Length"]
+            else:
+                comprimido = self.compresor.comprimir(cuerpo) + self.compresor.terminar()
+                cabeceras["Content-Length"] = str(len(comprimido))
+                await self.send(self.inicio)
+                await self.send({"type": "http.response.body", "body": comprimido})
+                return
+            await self.send(self.inicio)
+
+        if hay_mas:
+            comprimido = self.compresor.comprimir(cuerpo) + self.compresor.vaciar()
+        else:
+            comprimido = self.compresor.comprimir(cuerpo) + self.compresor.terminar()
+        await self.send({"type": "http.response.body", "body": comprimido, "more_body": hay_mas})
@@ -7,4 +7,95 @@ load_dotenv()
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
-SUPABASE_JWT_SECRET = os.environ.get("SUPABASE_JWT_SECRET")
\ No newline at end of file
+SUPABASE_JWT_SECRET = os.environ.get("SUPABASE_JWT_SECRET")
+
+# --- Compresión de respuestas (app/core/compresion.py) ---
+# Las respuestas completas menores a este tamaño se envían sin comprimir.
+COMPRESION_MINIMO_BYTES = int(os.environ.get("COMPRESION_MINIMO_BYTES", "1024"))
+COMPRESION_NIVEL_GZIP = int(os.environ.get("COMPRESION_NIVEL_GZIP", "6"))
+# brotli y zstd se usan en niveles bajos: comprimen mejor que gzip y siguen siendo rápidos.
+COMPRESION_NIVEL_BROTLI = int(os.environ.get("COMPRESION_NIVEL_BROTLI", "4"))
+COMPRESION_NIVEL_ZSTD = int(os.environ.get("COMPRESION_NIVEL_ZSTD", "3"))
+
+# --- Perfilado de peticiones (app/services/perfilador.py) ---
+# IDs de usuario (Supabase) que pueden pedir el perfilado de un análisis, separados por comas.
+ADMIN_USER_IDS = frozenset(filter(None, (uid.strip() for uid in os.environ.get("ADMIN_USER_IDS", "").split(","))))
+# Directorio donde se guardan los perfiles (.pstats), uno por petición.
+PROFILING_DIR = os.environ.get("PROFILING_DIR", "perfiles")
+
+# --- Registro (app/core/registro.py) ---
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+# Niveles por módulo, p. ej. "app.services.pdf_processor_banorte=DEBUG,app.routers=WARNING".
+LOG_LEVELS = os.environ.get("LOG_LEVELS", "")
+# "json" (una línea JSON por evento) o "texto".
+LOG_FORMATO = os.environ.get("LOG_FORMATO", "json")
+# De los eventos por fila (una línea por transacción) solo se emite uno de cada N.
+LOG_MUESTREO_FILAS = int(os.environ.get("LOG_MUESTREO_FILAS", "100"))
+
+# --- Memoria por petición (app/services/memoria.py) ---
+# Crecimiento máximo de memoria (RSS) permitido a un análisis, en MB; 0 lo desactiva.
+MEMORIA_PRESUPUESTO_MB = int(os.environ.get("MEMORIA_PRESUPUESTO_MB", "0"))
+# Cada cuánto se muestrea la memoria del proceso mientras se analiza un documento.
+MEMORIA_INTERVALO_S = float(os.environ.get("MEMORIA_INTERVALO_S", "0.05"))
+# Con "1" también se mide el pico de memoria de Python con tracemalloc (más preciso, más costoso).
+MEMORIA_TRACEMALLOC = os.environ.get("MEMORIA_TRACEMALLOC", "0") == "1"
+
+# --- Control de admisión (app/services/admision.py) ---
+# Los documentos de hasta estas páginas y este tamaño van por el carril ligero; el resto, por el pesado.
+ADMISION_PAGINAS_LIGERO = int(os.environ.get("ADMISION_PAGINAS_LIGERO", "10"))
+ADMISION_BYTES_LIGERO = int(os.environ.get("ADMISION_BYTES_LIGERO", str(2 * 2**20)))
+# Páginas estimadas por tamaño cuando el PDF no dice cuántas tiene.
+ADMISION_BYTES_POR_PAGINA = int(os.environ.get("ADMISION_BYTES_POR_PAGINA", str(100 * 2**10)))
+# Análisis simultáneos por worker en cada carril y cuántos más pueden esperar turno.
+ADMISION_CONCURRENCIA_LIGEROS = int(os.environ.get("ADMISION_CONCURRENCIA_LIGEROS", "4"))
+ADMISION_CONCURRENCIA_PESADOS = int(os.environ.get("ADMISION_CONCURRENCIA_PESADOS", "2"))
+ADMISION_COLA_LIGEROS = int(os.environ.get("ADMISION_COLA_LIGEROS", "32"))
+ADMISION_COLA_PESADOS = int(os.environ.get("ADMISION_COLA_PESADOS", "4"))
+# Tiempo máximo que un documento espera turno antes de rechazarse con 503.
+ADMISION_ESPERA_MAX_S = float(os.environ.get("ADMISION_ESPERA_MAX_S", "20"))
+# Retry-After mínimo (en segundos) de los rechazos.
+ADMISION_RETRY_AFTER_S = int(os.environ.get("ADMISION_RETRY_AFTER_S", "5"))
+
+# --- Plazo de análisis (app/services/aislamiento.py) ---
+# Segundos máximos para analizar un documento; al vencer se mata el proceso que lo analiza.
+# Con 0 el análisis corre en el mismo proceso de la API, sin plazo.
+PLAZO_ANALISIS_S = float(os.environ.get("PLAZO_ANALISIS_S", "60"))
+# Plazos por banco, p. ej. "banorte=90,bbva=45"; se aplican en cuanto se identifica el documento.
+PLAZOS_POR_BANCO = {
+    banco.strip(): float(segundos)
+    for banco, _, segundos in (
+        parte.partition("=") for parte in os.environ.get("PLAZOS_POR_BANCO", "").split(",") if "=" in parte
+    )
+}
+
+# --- Motores de extracción (app/services/extraccion.py) ---
+# "pdfplumber" (pdfminer, Python puro) o "pdfium" (pypdfium2, nativo y más rápido).
+MOTOR_EXTRACCION = os.environ.get("MOTOR_EXTRACCION", "pdfplumber")
+# Motor por banco, p. ej. "bbva=pdfium,banorte=pdfium"; los bancos que no aparecen usan MOTOR_EXTRACCION.
+MOTORES_POR_BANCO = {
+    banco.strip(): motor.strip()
+    for banco, _, motor in (
+        parte.partition("=") for parte in os.environ.get("MOTORES_POR_BANCO", "").split(",") if "=" in parte
+    )
+}
+
+# --- Clasificación previa de páginas (app/services/clasificacion.py) ---
+# Con "0" todas las páginas se extraen completas, aunque sean anexos o avisos legales.
+CLASIFICAR_PAGINAS = os.environ.get("CLASIFICAR_PAGINAS", "1") == "1"
+
+# --- Conversión masiva (app/services/lote.py) ---
+# Procesos que analizan documentos en paralelo; 0 usa uno por CPU.
+LOTE_TRABAJADORES = int(os.environ.get("LOTE_TRABAJADORES", "0"))
+# Documentos por bloque: cada bloque se escribe y se anota en el punto de control de una vez.
+LOTE_DOCUMENTOS_POR_BLOQUE = int(os.environ.get("LOTE_DOCUMENTOS_POR_BLOQUE", "100"))
+# Segundos máximos que un bloque con resultados espera a llenarse antes de escribirse.
+LOTE_CONFIRMACION_S = float(os.environ.get("LOTE_CONFIRMACION_S", "30"))
+
+# --- Ingesta de una carpeta (app/services/vigilancia.py) ---
+# Segundos que un PDF debe quedarse sin cambiar de tamaño ni de fecha antes de analizarse.
+VIGILANCIA_ESTABILIDAD_S = float(os.environ.get("VIGILANCIA_ESTABILIDAD_S", "2"))
+# Cada cuántos segundos se revisa toda la carpeta por si se perdió algún aviso del sistema.
+VIGILANCIA_REVISION_S = float(os.environ.get("VIGILANCIA_REVISION_S", "60"))
+# Veces que se vuelve a analizar un PDF cuyo análisis falló por una causa pasajera (memoria,
+# plazo o un error inesperado) antes de anotar la falla como definitiva.
+VIGILANCIA_REINTENTOS = int(os.environ.get("VIGILANCIA_REINTENTOS", "2"))
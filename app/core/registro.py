@@ -0,0 +1,127 @@
+# app/core/registro.py
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from app.core.config import LOG_FORMATO, LOG_LEVEL, LOG_LEVELS, LOG_MUESTREO_FILAS
+
+# Registro estructurado de la aplicación.
+# - Los módulos usan `logging.getLogger(__name__)` y mensajes con argumentos
+#   (`logger.debug("Página %d: %d transacciones", n, total)`), así que el texto solo se
+#   arma si el nivel está habilitado, y además se arma en el hilo del listener, no en
+#   el hilo de la petición.
+# - Los handlers escriben desde un QueueListener: la petición solo encola el registro
+#   y nunca se bloquea esperando a stdout.
+# - Los eventos por fila (una línea por transacción) se marcan con `extra=FILA` y solo
+#   se emite uno de cada LOG_MUESTREO_FILAS.
+# - Niveles por módulo con LOG_LEVELS, p. ej. "app.services.pdf_processor_banorte=DEBUG".
+
+# Marca para los eventos por fila que se muestrean.
+FILA = {"muestreo": "fila"}
+
+# Atributos estándar de un LogRecord; el resto son campos extra del evento.
+_ATRIBUTOS_ESTANDAR = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_lock = threading.Lock()
+
+
+class FormateadorJson(logging.Formatter):
+    """Una línea JSON por evento, con los campos extra del registro."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        evento = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensaje": record.getMessage(),
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_ESTANDAR and clave != "muestreo":
+                evento[clave] = valor
+        if record.exc_info:
+            evento["excepcion"] = self.formatException(record.exc_info)
+        return json.dumps(evento, ensure_ascii=False, default=str)
+
+
+class FiltroMuestreo(logging.Filter):
+    """Deja pasar uno de cada `tasa` eventos por fila de cada mensaje; el resto pasa siempre."""
+
+    def __init__(self, tasa: int):
+        super().__init__()
+        self.tasa = max(1, tasa)
+        self._contadores: Dict[tuple, itertools.count] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "muestreo", None) != "fila" or self.tasa == 1:
+            return True
+        clave = (record.name, record.msg)
+        contador = self._contadores.get(clave)
+        if contador is None:
+            contador = self._contadores.setdefault(clave, itertools.count())
+        return next(contador) % self.tasa == 0
+
+
+class _ManejadorCola(logging.handlers.QueueHandler):
+    """
+    QueueHandler que encola el registro tal cual. El QueueHandler estándar formatea el
+    mensaje antes de encolarlo (en el hilo de la petición); aquí eso lo hace el listener.
+    Por eso los argumentos de los mensajes deben ser valores, no objetos que cambien después.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _niveles_por_modulo(texto: str) -> Dict[str, str]:
+    niveles = {}
+    for parte in texto.split(","):
+        modulo, _, nivel = parte.partition("=")
+        if modulo.strip() and nivel.strip():
+            niveles[modulo.strip()] = nivel.strip().upper()
+    return niveles
+
+
+def configurar_registro() -> None:
+    """Configura el logger `app` (una sola vez por proceso)."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+
+        salida = logging.StreamHandler(sys.stdout)
+        if LOG_FORMATO == "json":
+            salida.setFormatter(FormateadorJson())
+        else:
+            salida.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+        cola: queue.SimpleQueue = queue.SimpleQueue()
+        manejador = _ManejadorCola(cola)
+        manejador.addFilter(FiltroMuestreo(LOG_MUESTREO_FILAS))
+
+        raiz_app = logging.getLogger("app")
+        raiz_app.setLevel(LOG_LEVEL.upper())
+        raiz_app.addHandler(manejador)
+        raiz_app.propagate = False
+        for modulo, nivel in _niveles_por_modulo(LOG_LEVELS).items():
+            logging.getLogger(modulo).setLevel(nivel)
+
+        _listener = logging.handlers.QueueListener(cola, salida, respect_handler_level=True)
+        _listener.start()
+        atexit.register(detener_registro)
+
+
+def detener_registro() -> None:
+    """Vacía la cola y detiene el listener."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
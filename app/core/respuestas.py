@@ -0,0 +1,33 @@
+# app/core/respuestas.py
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+
+from app.services.tabla_transacciones import TablaTransacciones
+
+
+def _serializar_extra(obj: Any) -> Any:
+    """Tipos que orjson no conoce de forma nativa."""
+    if isinstance(obj, TablaTransacciones):
+        return obj.a_dicts()
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+
+def serializar(contenido: Any) -> bytes:
+    """Serializa a JSON con orjson, expandiendo las tablas de transacciones al vuelo."""
+    return orjson.dumps(contenido, default=_serializar_extra)
+
+
+class RespuestaAnalisis(Response):
+    """
+    Respuesta JSON para los resultados de los procesadores.
+
+    Los procesadores ya validaron sus datos, así que el contenido se serializa directamente
+    con orjson: FastAPI no aplica `jsonable_encoder` a un `Response` devuelto por el endpoint,
+    y las `TablaTransacciones` se convierten durante la serialización, sin copias intermedias.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return serializar(content)
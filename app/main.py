@@ -1,8 +1,16 @@
 # app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.compresion import CompresionMiddleware
+from app.core.registro import configurar_registro
 from app.routers import auth, analysis  # Importa los routers
 from app.routers import contact
+from app.routers import metrics
+from app.routers import user
+
+# --- Registro Estructurado ---
+# Debe configurarse antes de que los módulos empiecen a registrar eventos.
+configurar_registro()
 
 # --- Creación de la Instancia de FastAPI ---
 app = FastAPI(
@@ -27,11 +35,18 @@ app.add_middleware(
     allow_headers=["*"], # Permite todas las cabeceras
 )
 
+# --- Compresión de Respuestas ---
+# Comprime con brotli, zstd o gzip (según lo que acepte el cliente) las respuestas grandes,
+# como el JSON de un estado de cuenta con miles de movimientos.
+app.add_middleware(CompresionMiddleware)
+
 # --- Inclusión de los Routers ---
 # Aquí se conectan los endpoints definidos en otros archivos a la app principal.
 app.include_router(auth.router)
 app.include_router(analysis.router)
 app.include_router(contact.router)
+app.include_router(metrics.router)
+app.include_router(user.router)
 
 # --- Endpoint Raíz ---
 @app.get("/", tags=["Root"])
@@ -1,9 +1,10 @@
+import logging
 import shutil
 import os
-import pdfplumber
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Request
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Request, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, AsyncIterator
 from jose import JWTError, jwt
 from pydantic import BaseModel
 from datetime import datetime
@@ -12,21 +13,22 @@ from datetime import datetime
 # Se importan los servicios que se van a utilizar.
 from app.services.supabase_client import supabase
 from app.core.config import SUPABASE_JWT_SECRET
+from app.core.respuestas import RespuestaAnalisis
+from app.services.tabla_transacciones import CAMPOS_V1, convertir_resultado
 from app.services import (
-    document_identifier,
-    pdf_processor_banorte,       # Para identificar el banco y tipo de cuenta.
+    admision,                   # Control de admisión por costo estimado del documento.
+    aislamiento,                # Análisis en un proceso aparte, con plazo.
+    analizador,                 # Flujo de extracción, identificación y procesamiento del PDF.
     rate_limiter,              # Para el control de límites de uso (placeholders).
-    pdf_processor_banamex_personal,    # Procesador para Banamex Personal.
-    pdf_processor_banamex_empresarial, # Procesador para Banamex Empresarial.
-    pdf_processor_banbajio,    # Procesador para BanBajio Empresarial.
-    pdf_processor_bbva,         # Procesador para BBVA.
-    pdf_processor_banorte,      # Procesador para Banorte.
-    pdf_processor_scotiabank,   # Procesador para Scotiabank.
-
+    metricas,                   # Métricas por etapa (expuestas en /metrics).
+    memoria,                    # Pico de memoria y presupuesto por análisis.
+    perfilador,                 # Perfilado opcional de un análisis (solo administradores).
+    esquema_v2,                 # Conversión al esquema canónico v2.
 )
 
 # --- Configuración del Router y Autenticación ---
 router = APIRouter(prefix="/analysis", tags=["Analysis"])
+logger = logging.getLogger(__name__)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 # --- Modelo Pydantic para la Respuesta del Historial ---
@@ -58,22 +60,107 @@ async def get_current_user(token: Optional[str] = Depends(oauth2_scheme)) -> Opt
     except JWTError:
         raise credentials_exception
 
+# --- Versionado del Esquema de Respuesta ---
+# v1: formato histórico, distinto por banco. v2: esquema canónico (app/schemas/analysis_v2.py).
+# Se elige con ?version=2 o con la cabecera 'Accept: application/vnd.whobank.v2+json'.
+MEDIA_TYPE_V2 = "application/vnd.whobank.v2+json"
+VERSIONES_ESQUEMA = (1, 2)
+
+def obtener_version_esquema(request: Request, version: Optional[int]) -> int:
+    """
+    Determina la versión del esquema de respuesta. El parámetro de consulta tiene
+    prioridad sobre la cabecera Accept; sin ninguno de los dos se usa v1.
+    """
+    if version is not None:
+        if version not in VERSIONES_ESQUEMA:
+            raise HTTPException(status_code=400, detail=f"Versión de esquema no soportada: {version}. Use 1 o 2.")
+        return version
+    if MEDIA_TYPE_V2 in request.headers.get("accept", ""):
+        return 2
+    return 1
+
+# --- Proyección de la Respuesta ---
+# Los clientes que no necesitan todo el detalle (p. ej. la app móvil) pueden pedir solo algunos
+# campos de cada transacción (?fields=fecha,deposito,retiro), una ventana de transacciones
+# (?offset=0&limit=50) o solo el encabezado y los totales (?summary_only=true).
+def obtener_campos(fields: Optional[str], version_esquema: int) -> Optional[List[str]]:
+    """
+    Valida la lista de campos pedida contra los campos de transacción de la versión del esquema.
+    Devuelve None si no se pidió ninguna proyección.
+    """
+    if fields is None:
+        return None
+    campos = [campo.strip() for campo in fields.split(",") if campo.strip()]
+    validos = CAMPOS_V1 if version_esquema == 1 else esquema_v2.CAMPOS_TRANSACCION_V2
+    desconocidos = [campo for campo in campos if campo not in validos]
+    if not campos or desconocidos:
+        invalidos = ", ".join(desconocidos) or repr(fields)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos no válidos: {invalidos}. Use alguno de: {', '.join(sorted(validos))}.",
+        )
+    return campos
+
+# --- Perfilado Opcional ---
+# Un administrador puede pedir que el análisis se ejecute bajo cProfile con ?profile=true
+# o con la cabecera 'X-Profile: 1' (ver app/services/perfilador.py).
+def obtener_perfil(request: Request, profile: bool, current_user: Optional[Dict[str, Any]]) -> Optional[perfilador.Perfil]:
+    """Devuelve el perfil de la petición si se pidió, o None. Solo los administradores pueden pedirlo."""
+    if not profile and request.headers.get("x-profile", "").lower() not in ("1", "true"):
+        return None
+    if not perfilador.es_administrador(current_user):
+        raise HTTPException(status_code=403, detail="El perfilado solo está disponible para administradores.")
+    return perfilador.Perfil()
+
+# --- Control de Admisión ---
+# Antes de analizar se estima el costo del documento (tamaño y páginas declaradas) y se espera
+# turno en su carril (ver app/services/admision.py). Se hace antes del límite de conversiones
+# para que un documento rechazado por saturación no consuma la cuota del usuario.
+async def admitir_documento(archivo: UploadFile = File(...)) -> AsyncIterator[admision.CostoDocumento]:
+    costo = await run_in_threadpool(admision.estimar_costo, archivo.file, archivo.size)
+    try:
+        turno = await admision.CONTROL.admitir(costo)
+    except admision.AdmisionRechazada as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"El servicio está saturado, intenta de nuevo en {e.reintentar_en_s} segundos.",
+            headers={"Retry-After": str(e.reintentar_en_s)},
+        )
+    try:
+        yield costo
+    finally:
+        turno.liberar()
+
 # --- Endpoint Principal para Procesar PDF ---
 # Nota: No se usa 'response_model' aquí porque la función puede devolver diferentes
 # modelos de respuesta (uno por cada banco), lo que lo hace dinámico.
-@router.post("/process-pdf")
+# La respuesta se serializa directamente con orjson (ver app/core/respuestas.py).
+@router.post("/process-pdf", response_class=RespuestaAnalisis)
 async def process_pdf_endpoint(
     request: Request,
     archivo: UploadFile = File(...),
-    current_user: Optional[Dict[str, Any]] = Depends(get_current_user)
+    version: Optional[int] = Query(None, description="Versión del esquema de respuesta (1 o 2)."),
+    fields: Optional[str] = Query(None, description="Campos de cada transacción, separados por comas."),
+    offset: int = Query(0, ge=0, description="Índice de la primera transacción de cada cuenta."),
+    limit: Optional[int] = Query(None, ge=0, description="Máximo de transacciones por cuenta."),
+    summary_only: bool = Query(False, description="Devuelve solo el encabezado y los totales."),
+    profile: bool = Query(False, description="Perfila el análisis con cProfile (solo administradores)."),
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user),
+    costo: admision.CostoDocumento = Depends(admitir_documento),
 ):
     """
     Endpoint principal que recibe un PDF, lo identifica y lo procesa
     según el banco y el tipo de cuenta.
     """
+    version_esquema = obtener_version_esquema(request, version)
+    campos = obtener_campos(fields, version_esquema)
+    cronometro = metricas.CronometroEtapas(monitor=memoria.MonitorMemoria())
+    perfil = obtener_perfil(request, profile, current_user)
+
     # Lógica de rate limiting (sin cambios)
     if current_user:
-        rate_limiter.check_registered_user_limit(current_user)
+        with cronometro.etapa("supabase"):
+            await run_in_threadpool(rate_limiter.check_registered_user_limit, current_user)
     else:
         rate_limiter.check_anonymous_limit(request)
 
@@ -81,76 +168,88 @@ async def process_pdf_endpoint(
         raise HTTPException(status_code=400, detail="El archivo debe ser un PDF.")
 
     ruta_temporal = f"temp_{archivo.filename}"
+    resultado = "error"
     try:
-        with open(ruta_temporal, "wb") as buffer:
-            shutil.copyfileobj(archivo.file, buffer)
+        with metricas.EN_CURSO.rastrear(), cronometro.monitor:
+            # El análisis es CPU y disco; se ejecuta fuera del event loop.
+            # Con perfilado se analiza en este proceso (y sin plazo) para que cProfile lo vea.
+            if perfil:
+                datos_analizados = await run_in_threadpool(
+                    perfil.ejecutar, _procesar_subida, archivo, ruta_temporal, cronometro, False
+                )
+            else:
+                datos_analizados = await run_in_threadpool(_procesar_subida, archivo, ruta_temporal, cronometro)
 
-        texto_completo = ""
-        with pdfplumber.open(ruta_temporal) as pdf:
-            if not pdf.pages:
-                raise HTTPException(status_code=422, detail="El archivo PDF está vacío o corrupto.")
-            
-            # Se extrae el texto de TODAS las páginas para mayor robustez,
-            # usando tolerancias que funcionan bien con PDFs complejos.
-            texto_completo = "".join(page.extract_text(x_tolerance=2, y_tolerance=2) or "" for page in pdf.pages)
-
-        if not texto_completo:
-            raise HTTPException(status_code=422, detail="No se pudo leer el contenido del PDF o el archivo es ilegible.")
-
-        # --- Flujo de Identificación y Procesamiento Jerárquico ---
-        banco = document_identifier.identificar_banco(texto_completo)
-        datos_analizados = None
-
-        if banco == "banamex":
-            tipo_cuenta = document_identifier.identificar_tipo_cuenta_banamex(texto_completo)
-            if tipo_cuenta == "personal":
-                datos_analizados = pdf_processor_banamex_personal.procesar_estado_de_cuenta(ruta_temporal)
-            elif tipo_cuenta == "empresarial":
-                datos_analizados = pdf_processor_banamex_empresarial.procesar_estado_de_cuenta_empresarial(ruta_temporal)
-        
-        elif banco == "banbajio":
-            # Asumimos que solo hay un tipo de cuenta para BanBajío por ahora
-            datos_analizados = pdf_processor_banbajio.procesar_estado_de_cuenta_banbajio_empresarial(ruta_temporal)
-
-        # --- INICIO DE LA INTEGRACIÓN DE BBVA ---
-        elif banco == "bbva":
-            # Por ahora, solo tenemos un procesador para BBVA (Maestra Pyme)
-            # No es necesario un identificador de tipo de cuenta adicional.
-            datos_analizados = pdf_processor_bbva.procesar_estado_de_cuenta_bbva(ruta_temporal)
-        # --- FIN DE LA INTEGRACIÓN DE BBVA ---
-
-        # --- INICIO DE LA INTEGRACIÓN DE BANORTE ---
-        elif banco == "banorte":
-            # Por ahora, solo tenemos un procesador para Banorte (Preferente)
-            # No es necesario un identificador de tipo de cuenta adicional.
-            datos_analizados = pdf_processor_banorte.procesar_estado_de_cuenta_banorte(ruta_temporal)
-        # --- FIN DE LA INTEGRACIÓN DE BANORTE ---
-        # --- INICIO DE LA INTEGRACIÓN DE SCOTIABANK ---
-        elif banco == "scotiabank":
-            tipo_cuenta = document_identifier.identificar_tipo_cuenta_scotiabank(texto_completo)
-            if tipo_cuenta == "pyme_pfae":
-                datos_analizados = pdf_processor_scotiabank.procesar_estado_de_cuenta_scotiabank(ruta_temporal)
-    # --- FIN DE LA INTEGRACIÓN DE SCOTIABANK ---
-
-
-        if not datos_analizados:
-            banco_str = f"'{banco.upper()}'" if banco else "desconocido"
-            raise HTTPException(status_code=422, detail=f"El tipo de estado de cuenta del banco {banco_str} no es soportado o el archivo es ilegible.")
-
-        if current_user:
-            supabase.table("analysis_history").insert({
-                "user_id": current_user['id'],
-                "file_name": archivo.filename
-            }).execute()
-            
-        return datos_analizados
+            if current_user:
+                with cronometro.etapa("supabase"):
+                    await run_in_threadpool(
+                        supabase.table("analysis_history").insert({
+                            "user_id": current_user['id'],
+                            "file_name": archivo.filename
+                        }).execute
+                    )
 
+            # Los procesadores devuelven sus transacciones en tablas columnares y ya validadas;
+            # se proyectan (campos, ventana, solo resumen) al convertirlas al formato de salida y
+            # se serializan una sola vez, aquí en el borde, sin pasar por jsonable_encoder.
+            # La respuesta depende de la cabecera Accept, así que se indica a los caches.
+            with cronometro.etapa("serializacion"):
+                if version_esquema == 2:
+                    respuesta = RespuestaAnalisis(
+                        esquema_v2.convertir_a_v2(datos_analizados, campos, offset, limit, summary_only),
+                        media_type=MEDIA_TYPE_V2,
+                        headers={"Vary": "Accept"},
+                    )
+                else:
+                    respuesta = RespuestaAnalisis(
+                        convertir_resultado(datos_analizados, campos, offset, limit, summary_only),
+                        headers={"Vary": "Accept"},
+                    )
+        resultado = "ok"
+        if perfil:
+            respuesta.headers.update(perfil.cabeceras())
+        return respuesta
+
+    except analizador.ErrorAnalisis as e:
+        resultado = e.resultado
+        raise HTTPException(status_code=e.codigo_http, detail=e.detalle, headers=perfil.cabeceras() if perfil else None)
+    except memoria.PresupuestoMemoriaExcedido as e:
+        resultado = "memoria"
+        logger.warning("Análisis abortado por memoria: %s", e, extra={"banco": cronometro.banco})
+        raise HTTPException(
+            status_code=503,
+            detail=f"El documento requiere más memoria de la disponible. {e}",
+            headers={"Retry-After": "30", **(perfil.cabeceras() if perfil else {})},
+        )
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Ocurrió un error inesperado: {str(e)}")
+        logger.exception("Error inesperado analizando %s", archivo.filename,
+                         extra={"banco": cronometro.banco, "tipo_cuenta": cronometro.tipo_cuenta})
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ocurrió un error inesperado: {str(e)}",
+            headers=perfil.cabeceras() if perfil else None,
+        )
     finally:
+        cronometro.registrar(resultado)
         if os.path.exists(ruta_temporal):
             os.remove(ruta_temporal)
 
+def _procesar_subida(
+    archivo: UploadFile, ruta_temporal: str, cronometro: metricas.CronometroEtapas, con_plazo: bool = True
+) -> Dict[str, Any]:
+    """
+    Copia el PDF subido a disco y lo analiza (se ejecuta en el threadpool). Con `con_plazo`
+    el análisis corre en un proceso aparte que se cancela si excede su plazo.
+    """
+    with cronometro.etapa("copia_disco"):
+        with open(ruta_temporal, "wb") as buffer:
+            shutil.copyfileobj(archivo.file, buffer)
+    if con_plazo:
+        return aislamiento.analizar_con_plazo(ruta_temporal, cronometro)
+    return analizador.analizar_documento(ruta_temporal, cronometro)
+
 # --- Endpoint para Obtener el Historial de Análisis ---
 @router.get("/history", response_model=List[HistoryItem])
 async def get_analysis_history(current_user: Dict[str, Any] = Depends(get_current_user)):
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from app.schemas.user import UserCreate, UserLogin
 from app.services.supabase_client import supabase
 from gotrue.errors import AuthApiError
@@ -12,7 +13,8 @@ router = APIRouter(
 async def create_user(user_credentials: UserCreate):
     """Crea un nuevo usuario en Supabase Auth."""
     try:
-        session = await supabase.auth.sign_up({
+        # El cliente de Supabase es síncrono: se llama fuera del event loop.
+        session = await run_in_threadpool(supabase.auth.sign_up, {
             "email": user_credentials.email,
             "password": user_credentials.password,
         })
@@ -27,7 +29,7 @@ async def create_user(user_credentials: UserCreate):
 async def login_user(user_credentials: UserLogin):
     """Inicia sesión y devuelve un token de acceso."""
     try:
-        session = await supabase.auth.sign_in_with_password({
+        session = await run_in_threadpool(supabase.auth.sign_in_with_password, {
             "email": user_credentials.email,
             "password": user_credentials.password
         })
@@ -1,5 +1,6 @@
 # app/routers/contact.py
 
+import logging
 import os
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel, EmailStr
@@ -10,6 +11,8 @@ from dotenv import load_dotenv
 # Cargar las variables de entorno del archivo .env
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/contact",
     tags=["Contact"]
@@ -27,19 +30,9 @@ async def send_contact_email(request: ContactRequest):
     Recibe los datos de un formulario de contacto y envía un correo usando SendGrid.
     """
 
-    # --- INICIO DEL CÓDIGO DE DEPURACIÓN ---
-    # ¡AÑADE ESTAS LÍNEAS PARA VERIFICAR LAS VARIABLES!
-    print("--- INICIANDO DEPURACIÓN DE ENVÍO DE CORREO ---")
-    api_key = os.getenv('SENDGRID_API_KEY')
-    sender = os.getenv("SENDER_EMAIL")
-    recipient = os.getenv("RECIPIENT_EMAIL")
-
-    # Imprimimos de forma segura solo una parte de la API Key para verificarla
-    print(f"API Key Encontrada: {api_key[:5]}...{api_key[-4:] if api_key else '¡NO ENCONTRADA!'}")
-    print(f"Email Remitente: {sender}")
-    print(f"Email Destinatario: {recipient}")
-    print("---------------------------------------------")
-    # --- FIN DEL CÓDIGO DE DEPURACIÓN ---
+    # Nunca se registra la API Key (ni una parte de ella), solo si falta configuración.
+    if not os.getenv("SENDGRID_API_KEY") or not os.getenv("SENDER_EMAIL") or not os.getenv("RECIPIENT_EMAIL"):
+        logger.warning("Falta configurar SENDGRID_API_KEY, SENDER_EMAIL o RECIPIENT_EMAIL")
 
     # Construir el correo electrónico
     message = Mail(
@@ -71,7 +64,7 @@ async def send_contact_email(request: ContactRequest):
             )
 
     except Exception as e:
-        print(f"Error al enviar correo: {e}")
+        logger.exception("Error al enviar correo de contacto")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error en el servidor: {e}"
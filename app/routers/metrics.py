@@ -0,0 +1,17 @@
+# app/routers/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services import metricas
+
+router = APIRouter(tags=["Metrics"])
+
+# --- Endpoint de Métricas ---
+# Formato de texto de Prometheus; cada worker expone sus propios valores.
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Expone las métricas del servicio (duración por etapa, páginas, transacciones,
+    fallos, aciertos de cache y análisis en curso) para que Prometheus las recolecte.
+    """
+    return PlainTextResponse(metricas.exponer(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,3 +1,4 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict, List
 from pydantic import BaseModel
@@ -6,6 +7,8 @@ from datetime import datetime
 from app.services.supabase_client import supabase
 from app.routers.analysis import get_current_user
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/user",
     tags=["User"]
@@ -63,5 +66,5 @@ async def get_user_panel_data(current_user: Dict = Depends(get_current_user)):
         # Re-lanzar excepciones HTTP para que FastAPI las maneje
         raise e
     except Exception as e:
-        print(f"Error inesperado en get_user_panel_data: {e}")
+        logger.exception("Error inesperado en get_user_panel_data")
         raise HTTPException(status_code=500, detail="Error interno al obtener los datos del panel.")
@@ -0,0 +1,68 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+# Esquema canónico v2, común a todos los bancos.
+# - Los montos son enteros en centavos (sin errores de redondeo de punto flotante).
+# - Las fechas están normalizadas a ISO 8601 (AAAA-MM-DD); None si no se pudieron interpretar.
+# - No hay campos duplicados ni alias (p. ej. descripcion/concepto o depositos/total_ingresos).
+# - Los campos opcionales de una transacción sin valor (categoria, referencia) se omiten.
+# - Con el parámetro `fields` una transacción solo trae los campos pedidos.
+
+TIPOS_MOVIMIENTO = ("ingreso", "gasto", "saldo_inicial", "informativo")
+
+class TransaccionV2(BaseModel):
+    """
+    Define la estructura de una transacción en el esquema canónico.
+    """
+    fecha: Optional[str] = None
+    descripcion: str
+    retiro: int = 0
+    deposito: int = 0
+    saldo: Optional[int] = None
+    tipo_movimiento: str  # Uno de TIPOS_MOVIMIENTO
+    categoria: Optional[str] = None
+    referencia: Optional[str] = None
+
+class ConciliacionV2(BaseModel):
+    """
+    Conciliación de las transacciones de la cuenta con sus saldos y con el resumen
+    (ver app/services/conciliacion.py).
+    """
+    cuadra: bool
+    confianza: float  # De 0 a 1.
+    # Índices (en el orden de `transacciones`, sin paginar) de las filas cuyo saldo no sigue
+    # de la fila con saldo anterior.
+    filas_descuadradas: List[int]
+    eslabones: int
+    # total_depositos, total_retiros y saldo_final: lo extraído menos lo declarado en centavos
+    # (0 si cuadra, None si no hay datos para comprobarlo).
+    diferencias: Dict[str, Optional[int]]
+
+class CuentaV2(BaseModel):
+    """
+    Define la estructura de una cuenta dentro del estado de cuenta.
+    """
+    nombre_cuenta: Optional[str] = None
+    numero_cuenta: Optional[str] = None
+    moneda: Optional[str] = None
+    saldo_inicial: Optional[int] = None
+    total_depositos: Optional[int] = None
+    total_retiros: Optional[int] = None
+    saldo_final: Optional[int] = None
+    conciliacion: Optional[ConciliacionV2] = None
+    # Con `summary_only` se omiten las transacciones; al paginar o pedir solo el resumen
+    # `total_transacciones` indica cuántas tiene la cuenta en total.
+    transacciones: Optional[List[TransaccionV2]] = None
+    total_transacciones: Optional[int] = None
+
+class AnalisisV2(BaseModel):
+    """
+    Define la respuesta del análisis de un PDF en el esquema canónico v2.
+    """
+    version: int = 2
+    nombre_archivo: str
+    banco: str
+    fecha_corte: Optional[str] = None
+    periodo_inicio: Optional[str] = None
+    periodo_fin: Optional[str] = None
+    cuentas: List[CuentaV2]
@@ -0,0 +1,202 @@
+# app/services/admision.py
+import asyncio
+import logging
+import math
+import time
+from typing import BinaryIO, Dict, Optional
+
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
+
+from app.core.config import (
+    ADMISION_BYTES_LIGERO,
+    ADMISION_BYTES_POR_PAGINA,
+    ADMISION_COLA_LIGEROS,
+    ADMISION_COLA_PESADOS,
+    ADMISION_CONCURRENCIA_LIGEROS,
+    ADMISION_CONCURRENCIA_PESADOS,
+    ADMISION_ESPERA_MAX_S,
+    ADMISION_PAGINAS_LIGERO,
+    ADMISION_RETRY_AFTER_S,
+)
+from app.services import metricas
+
+logger = logging.getLogger(__name__)
+
+# Control de admisión de los análisis de cada worker.
+# Antes de extraer texto se estima el costo del documento con su tamaño y el número de
+# páginas que declara el PDF (se lee del trailer y del catálogo, sin interpretar ninguna
+# página, y leyendo a lo más BYTES_CONTEO_PAGINAS: si la tabla de referencias está dañada no
+# se repara recorriendo todo el archivo, el costo se estima solo con el tamaño). Los
+# documentos chicos van por un carril ligero y los grandes por uno pesado, cada uno con su
+# límite de análisis simultáneos y de documentos en espera: un estado de cuenta de 200
+# páginas no retrasa a los de 3, y si la cola de un carril está llena se responde de
+# inmediato con 503 y Retry-After en lugar de dejar que el cliente espere hasta su timeout.
+
+LIGERO = "ligero"
+PESADO = "pesado"
+
+# Alcanza para el trailer, una tabla de referencias de ~10 000 objetos y el árbol de páginas.
+BYTES_CONTEO_PAGINAS = 256 * 2**10
+
+
+class CostoDocumento:
+    """Costo estimado de analizar un documento, antes de leer su contenido."""
+
+    def __init__(self, bytes_: int, paginas: Optional[int]):
+        self.bytes = bytes_
+        # Páginas declaradas por el PDF; None si no se pudieron leer.
+        self.paginas = paginas
+
+    @property
+    def paginas_estimadas(self) -> int:
+        if self.paginas is not None:
+            return self.paginas
+        return max(1, math.ceil(self.bytes / ADMISION_BYTES_POR_PAGINA))
+
+    @property
+    def carril(self) -> str:
+        if self.paginas_estimadas <= ADMISION_PAGINAS_LIGERO and self.bytes <= ADMISION_BYTES_LIGERO:
+            return LIGERO
+        return PESADO
+
+
+class _PresupuestoAgotado(Exception):
+    pass
+
+
+class _LecturaAcotada:
+    """Archivo que deja de leer (lanza `_PresupuestoAgotado`) al pasar de `presupuesto` bytes."""
+
+    def __init__(self, archivo: BinaryIO, presupuesto: int):
+        self._archivo = archivo
+        self._restante = presupuesto
+
+    def read(self, cantidad: int = -1) -> bytes:
+        if cantidad < 0 or cantidad > self._restante:
+            raise _PresupuestoAgotado()
+        datos = self._archivo.read(cantidad)
+        self._restante -= len(datos)
+        return datos
+
+    def seek(self, posicion: int, desde: int = 0) -> int:
+        return self._archivo.seek(posicion, desde)
+
+    def tell(self) -> int:
+        return self._archivo.tell()
+
+
+def contar_paginas(archivo: BinaryIO, presupuesto: int = BYTES_CONTEO_PAGINAS) -> Optional[int]:
+    """
+    Número de páginas que declara el PDF (/Count del árbol de páginas), leído del trailer y el
+    catálogo sin interpretar el contenido y sin leer más de `presupuesto` bytes. Deja el
+    archivo al inicio. None si no se puede leer.
+    """
+    try:
+        archivo.seek(0)
+        # Sin `fallback` pdfminer no reconstruye las referencias recorriendo todo el archivo.
+        documento = PDFDocument(PDFParser(_LecturaAcotada(archivo, presupuesto)), fallback=False)
+        paginas = resolve1(resolve1(documento.catalog.get("Pages")).get("Count"))
+        return int(paginas) if isinstance(paginas, int) and paginas >= 0 else None
+    except Exception:
+        # PDF dañado, cifrado o cuyas referencias no caben en el presupuesto: el costo se estima
+        # solo con el tamaño.
+        return None
+    finally:
+        archivo.seek(0)
+
+
+def estimar_costo(archivo: BinaryIO, tamano: Optional[int] = None) -> CostoDocumento:
+    if tamano is None:
+        archivo.seek(0, 2)
+        tamano = archivo.tell()
+        archivo.seek(0)
+    return CostoDocumento(tamano, contar_paginas(archivo))
+
+
+class AdmisionRechazada(Exception):
+    def __init__(self, carril: str, motivo: str, reintentar_en_s: int):
+        super().__init__(f"El carril {carril} está saturado ({motivo}).")
+        self.carril = carril
+        self.motivo = motivo
+        self.reintentar_en_s = reintentar_en_s
+
+
+class Carril:
+    """Límite de análisis simultáneos con una cola de espera acotada."""
+
+    def __init__(self, nombre: str, concurrencia: int, cola: int):
+        self.nombre = nombre
+        self.concurrencia = concurrencia
+        self.cola = cola
+        self.esperando = 0
+        # Duración media (móvil) de los análisis del carril, para calcular el Retry-After.
+        self.duracion_media_s = float(ADMISION_RETRY_AFTER_S)
+        self._semaforo = asyncio.Semaphore(concurrencia)
+
+    def reintentar_en(self) -> int:
+        """Segundos estimados hasta que se desocupe el carril (al menos ADMISION_RETRY_AFTER_S)."""
+        tandas = (self.esperando + 1) / max(1, self.concurrencia)
+        return max(ADMISION_RETRY_AFTER_S, math.ceil(self.duracion_media_s * tandas))
+
+    async def entrar(self, espera_max_s: float) -> None:
+        if self._semaforo.locked() and self.esperando >= self.cola:
+            metricas.ADMISION.inc(carril=self.nombre, resultado="cola_llena")
+            raise AdmisionRechazada(self.nombre, "cola_llena", self.reintentar_en())
+
+        inicio = time.perf_counter()
+        self.esperando += 1
+        metricas.ADMISION_COLA.inc(carril=self.nombre)
+        try:
+            await asyncio.wait_for(self._semaforo.acquire(), espera_max_s)
+        except asyncio.TimeoutError:
+            metricas.ADMISION.inc(carril=self.nombre, resultado="espera_agotada")
+            raise AdmisionRechazada(self.nombre, "espera_agotada", self.reintentar_en())
+        finally:
+            self.esperando -= 1
+            metricas.ADMISION_COLA.dec(carril=self.nombre)
+        metricas.ADMISION.inc(carril=self.nombre, resultado="admitido")
+        metricas.ADMISION_ESPERA.observar(time.perf_counter() - inicio, carril=self.nombre)
+
+    def salir(self, duracion_s: float) -> None:
+        self.duracion_media_s = 0.8 * self.duracion_media_s + 0.2 * duracion_s
+        self._semaforo.release()
+
+
+class Turno:
+    """Lugar de un documento en su carril; `liberar()` al terminar el análisis."""
+
+    def __init__(self, carril: Carril):
+        self.carril = carril
+        self._inicio = time.perf_counter()
+        self._liberado = False
+
+    def liberar(self) -> None:
+        if not self._liberado:
+            self._liberado = True
+            self.carril.salir(time.perf_counter() - self._inicio)
+
+
+class ControlAdmision:
+    def __init__(self, espera_max_s: float = ADMISION_ESPERA_MAX_S):
+        self.espera_max_s = espera_max_s
+        self.carriles: Dict[str, Carril] = {
+            LIGERO: Carril(LIGERO, ADMISION_CONCURRENCIA_LIGEROS, ADMISION_COLA_LIGEROS),
+            PESADO: Carril(PESADO, ADMISION_CONCURRENCIA_PESADOS, ADMISION_COLA_PESADOS),
+        }
+
+    async def admitir(self, costo: CostoDocumento) -> Turno:
+        """Espera turno en el carril del documento; lanza `AdmisionRechazada` si está saturado."""
+        carril = self.carriles[costo.carril]
+        try:
+            await carril.entrar(self.espera_max_s)
+        except AdmisionRechazada as e:
+            logger.warning("Documento rechazado por admisión: %s", e,
+                           extra={"paginas": costo.paginas_estimadas, "bytes": costo.bytes})
+            raise
+        return Turno(carril)
+
+
+# Un controlador por proceso: cada worker de uvicorn limita sus propios análisis.
+CONTROL = ControlAdmision()
@@ -0,0 +1,137 @@
+# app/services/aislamiento.py
+import logging
+import multiprocessing
+import time
+from multiprocessing.connection import Connection
+from typing import Any, Dict, Optional
+
+from app.core.config import PLAZO_ANALISIS_S, PLAZOS_POR_BANCO
+from app.core.registro import configurar_registro, detener_registro
+from app.services import analizador, estrategias, metricas
+from app.services.memoria import MonitorMemoria
+from app.services.metricas import CronometroEtapas
+
+logger = logging.getLogger(__name__)
+
+# Análisis de un documento en un proceso aparte, con plazo.
+# Un PDF dañado o malicioso puede tener a pdfminer ocupado durante minutos y un hilo de Python
+# no se puede interrumpir, así que el análisis corre en un proceso hijo que se mata si no
+# termina a tiempo. Los hijos se crean desde un servidor "forkserver" que ya tiene importados
+# los procesadores, así que arrancar uno cuesta milisegundos y no hereda los hilos de la API.
+#
+# El plazo general es PLAZO_ANALISIS_S; en cuanto el hijo identifica el banco se cambia por el
+# de PLAZOS_POR_BANCO si lo hay. El hijo mide sus etapas y su memoria (el presupuesto de
+# app/services/memoria.py se aplica allí) y al terminar envía el resultado junto con sus
+# duraciones y métricas, que se suman a las del proceso de la API. También recibe y devuelve lo
+# aprendido sobre las estrategias de extracción (app/services/estrategias.py).
+
+if "forkserver" in multiprocessing.get_all_start_methods():
+    _CONTEXTO = multiprocessing.get_context("forkserver")
+    _CONTEXTO.set_forkserver_preload(["app.services.analizador"])
+else:  # Windows
+    _CONTEXTO = multiprocessing.get_context("spawn")
+
+
+class PlazoExcedido(analizador.ErrorAnalisis):
+    def __init__(self, banco: str, plazo_s: float):
+        super().__init__(
+            f"El documento tardó más de {plazo_s:g} segundos en analizarse y se canceló. "
+            "Verifica que sea un estado de cuenta válido.",
+            resultado="plazo",
+            codigo_http=422,
+        )
+        self.banco = banco
+        self.plazo_s = plazo_s
+
+    def __reduce__(self):
+        return type(self), (self.banco, self.plazo_s)
+
+
+def _analizar_en_hijo(conexion: Connection, ruta_pdf: str, aprendido: Dict[Any, Any]) -> None:
+    """Punto de entrada del proceso hijo: analiza el documento y envía el resultado por `conexion`."""
+    metricas.reiniciar()
+    estrategias.fusionar(aprendido)
+    configurar_registro()
+    cronometro = CronometroEtapas(monitor=MonitorMemoria())
+    try:
+        with cronometro.monitor:
+            datos = analizador.analizar_documento(
+                ruta_pdf, cronometro, lambda banco, tipo_cuenta: conexion.send(("identificado", banco, tipo_cuenta))
+            )
+        mensaje = ("ok", datos)
+    except Exception as e:
+        mensaje = ("error", e)
+
+    resumen = {
+        "duraciones": cronometro.duraciones,
+        "pico_bytes": cronometro.monitor.pico_bytes,
+        "metricas": metricas.instantanea(),
+        "estrategias": estrategias.instantanea(),
+    }
+    try:
+        conexion.send(mensaje + (resumen,))
+    except Exception:
+        # El error del análisis no se pudo serializar; se envía su descripción.
+        error = mensaje[1]
+        conexion.send(("error", RuntimeError(f"{type(error).__name__}: {error}"), resumen))
+    finally:
+        conexion.close()
+        detener_registro()
+
+
+def _incorporar(cronometro: CronometroEtapas, resumen: Dict[str, Any]) -> None:
+    for etapa, duracion in resumen["duraciones"].items():
+        cronometro.duraciones[etapa] = cronometro.duraciones.get(etapa, 0.0) + duracion
+    if cronometro.monitor is not None:
+        cronometro.monitor.incluir_pico(resumen["pico_bytes"])
+    metricas.fusionar(resumen["metricas"])
+    estrategias.fusionar(resumen["estrategias"])
+
+
+def analizar_con_plazo(ruta_pdf: str, cronometro: CronometroEtapas, plazo_s: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Igual que `analizador.analizar_documento`, pero en un proceso hijo que se mata si no termina
+    dentro del plazo (lanza `PlazoExcedido`). Con plazo 0 analiza en este mismo proceso.
+    """
+    plazo_s = PLAZO_ANALISIS_S if plazo_s is None else plazo_s
+    if plazo_s <= 0:
+        return analizador.analizar_documento(ruta_pdf, cronometro)
+
+    receptor, emisor = _CONTEXTO.Pipe(duplex=False)
+    proceso = _CONTEXTO.Process(
+        target=_analizar_en_hijo, args=(emisor, ruta_pdf, estrategias.instantanea()), name="analisis", daemon=True
+    )
+    inicio = time.monotonic()
+    proceso.start()
+    emisor.close()
+    limite = inicio + plazo_s
+    try:
+        while True:
+            restante = limite - time.monotonic()
+            if restante <= 0 or not receptor.poll(restante):
+                logger.warning("Análisis cancelado por exceder el plazo de %g s", plazo_s,
+                               extra={"banco": cronometro.banco, "tipo_cuenta": cronometro.tipo_cuenta})
+                raise PlazoExcedido(cronometro.banco, plazo_s)
+            try:
+                mensaje = receptor.recv()
+            except EOFError:
+                proceso.join()
+                raise RuntimeError(f"El proceso de análisis terminó inesperadamente (código {proceso.exitcode}).")
+
+            if mensaje[0] == "identificado":
+                cronometro.banco, cronometro.tipo_cuenta = mensaje[1], mensaje[2]
+                if cronometro.banco in PLAZOS_POR_BANCO:
+                    plazo_s = PLAZOS_POR_BANCO[cronometro.banco]
+                    limite = inicio + plazo_s
+                continue
+
+            estado, valor, resumen = mensaje
+            _incorporar(cronometro, resumen)
+            if estado == "error":
+                raise valor
+            return valor
+    finally:
+        if proceso.is_alive():
+            proceso.kill()
+        proceso.join()
+        receptor.close()
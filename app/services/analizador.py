@@ -0,0 +1,151 @@
+# app/services/analizador.py
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.services import (
+    conciliacion,
+    document_identifier,
+    extraccion,
+    metricas,
+    pdf_processor_banamex_empresarial,
+    pdf_processor_banamex_personal,
+    pdf_processor_banbajio,
+    pdf_processor_banorte,
+    pdf_processor_bbva,
+    pdf_processor_scotiabank,
+)
+from app.services.metricas import CronometroEtapas
+from app.services.tabla_transacciones import TablaTransacciones
+
+# Flujo completo (síncrono) del análisis de un PDF ya guardado en disco: extracción del texto,
+# identificación del banco y del tipo de cuenta, ejecución del procesador correspondiente y
+# conciliación de las transacciones con el resumen (app/services/conciliacion.py).
+# Cada etapa se mide con un `CronometroEtapas` (ver app/services/metricas.py).
+
+# Procesador por (banco, tipo de cuenta).
+PROCESADORES: Dict[Tuple[str, str], Callable[[str], Optional[Dict[str, Any]]]] = {
+    ("banamex", "personal"): pdf_processor_banamex_personal.procesar_estado_de_cuenta,
+    ("banamex", "empresarial"): pdf_processor_banamex_empresarial.procesar_estado_de_cuenta_empresarial,
+    ("banbajio", "empresarial"): pdf_processor_banbajio.procesar_estado_de_cuenta_banbajio_empresarial,
+    ("bbva", "empresarial"): pdf_processor_bbva.procesar_estado_de_cuenta_bbva,
+    ("banorte", "preferente"): pdf_processor_banorte.procesar_estado_de_cuenta_banorte,
+    ("scotiabank", "pyme_pfae"): pdf_processor_scotiabank.procesar_estado_de_cuenta_scotiabank,
+}
+
+# Bancos con más de un tipo de cuenta: el tipo se identifica a partir del texto.
+IDENTIFICADORES_TIPO_CUENTA: Dict[str, Callable[[str], Optional[str]]] = {
+    "banamex": document_identifier.identificar_tipo_cuenta_banamex,
+    "scotiabank": document_identifier.identificar_tipo_cuenta_scotiabank,
+}
+
+# Bancos para los que por ahora solo hay un procesador (un solo tipo de cuenta).
+TIPO_CUENTA_UNICO = {
+    "banbajio": "empresarial",
+    "bbva": "empresarial",
+    "banorte": "preferente",
+}
+
+# Páginas con las que se intenta identificar el documento antes de extraer todas.
+PAGINAS_IDENTIFICACION = 1
+
+
+class ErrorAnalisis(Exception):
+    """
+    El documento no se pudo analizar por un motivo esperado (ilegible, banco o tipo de cuenta
+    no soportado). `resultado` es la etiqueta con la que se registra en las métricas.
+    """
+
+    def __init__(self, detalle: str, resultado: str = "no_soportado", codigo_http: int = 422):
+        super().__init__(detalle)
+        self.detalle = detalle
+        self.resultado = resultado
+        self.codigo_http = codigo_http
+
+    def __reduce__(self):
+        # Para que llegue completo desde el proceso hijo del análisis (app/services/aislamiento.py).
+        return type(self), (self.detalle, self.resultado, self.codigo_http)
+
+
+def extraer_texto(ruta_pdf: str, punto_control: Optional[Callable[[], None]] = None,
+                  limite_paginas: Optional[int] = None) -> Tuple[str, int]:
+    """
+    Devuelve el texto de las primeras `limite_paginas` páginas del PDF (de todas, si no se
+    indica) y el número total de páginas.
+    `punto_control` se llama después de cada página (p. ej. para el presupuesto de memoria).
+    """
+    with extraccion.abrir(ruta_pdf) as documento:
+        paginas = documento.numero_paginas()
+        if not paginas:
+            raise ErrorAnalisis("El archivo PDF está vacío o corrupto.", resultado="ilegible")
+        # Tolerancias que funcionan bien con PDFs complejos.
+        partes = []
+        for indice in range(min(paginas, limite_paginas or paginas)):
+            partes.append(documento.texto_pagina(indice))
+            if punto_control:
+                punto_control()
+        return "".join(partes), paginas
+
+
+def identificar_documento(texto: str) -> Tuple[Optional[str], Optional[str]]:
+    """Identifica el banco y el tipo de cuenta de un estado de cuenta."""
+    banco = document_identifier.identificar_banco(texto)
+    if banco in IDENTIFICADORES_TIPO_CUENTA:
+        return banco, IDENTIFICADORES_TIPO_CUENTA[banco](texto)
+    return banco, TIPO_CUENTA_UNICO.get(banco)
+
+
+def contar_transacciones(resultado: Dict[str, Any]) -> int:
+    return sum(
+        len(cuenta["transacciones"])
+        for cuenta in resultado.get("cuentas", [])
+        if isinstance(cuenta.get("transacciones"), TablaTransacciones)
+    )
+
+
+def analizar_documento(
+    ruta_pdf: str,
+    cronometro: Optional[CronometroEtapas] = None,
+    al_identificar: Optional[Callable[[str, str], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Analiza un estado de cuenta y devuelve el resultado del procesador de su banco
+    (con las transacciones en `TablaTransacciones`). Lanza `ErrorAnalisis` si el
+    documento es ilegible o no está soportado. `al_identificar(banco, tipo_cuenta)` se
+    llama en cuanto se identifica el documento, antes de ejecutar el procesador.
+    """
+    cronometro = cronometro or CronometroEtapas()
+
+    # Los identificadores buscan frases de la primera página; solo si con ella no se identifica
+    # un documento soportado se extrae el texto de todas las páginas.
+    with cronometro.etapa("extraccion"):
+        texto, paginas = extraer_texto(ruta_pdf, cronometro.punto_control, PAGINAS_IDENTIFICACION)
+    with cronometro.etapa("identificacion"):
+        banco, tipo_cuenta = identificar_documento(texto)
+    if (banco, tipo_cuenta) not in PROCESADORES and paginas > PAGINAS_IDENTIFICACION:
+        with cronometro.etapa("extraccion"):
+            texto, _ = extraer_texto(ruta_pdf, cronometro.punto_control)
+        with cronometro.etapa("identificacion"):
+            banco, tipo_cuenta = identificar_documento(texto)
+    if not texto:
+        raise ErrorAnalisis("No se pudo leer el contenido del PDF o el archivo es ilegible.", resultado="ilegible")
+    cronometro.banco = banco or metricas.DESCONOCIDO
+    cronometro.tipo_cuenta = tipo_cuenta or metricas.DESCONOCIDO
+    metricas.PAGINAS.inc(paginas, banco=cronometro.banco)
+    if al_identificar:
+        al_identificar(cronometro.banco, cronometro.tipo_cuenta)
+
+    procesador = PROCESADORES.get((banco, tipo_cuenta))
+    datos_analizados = None
+    if procesador:
+        with cronometro.etapa("procesador"):
+            datos_analizados = procesador(ruta_pdf)
+
+    if not datos_analizados:
+        banco_str = f"'{banco.upper()}'" if banco else "desconocido"
+        raise ErrorAnalisis(f"El tipo de estado de cuenta del banco {banco_str} no es soportado o el archivo es ilegible.")
+
+    metricas.TRANSACCIONES.inc(
+        contar_transacciones(datos_analizados), banco=cronometro.banco, tipo_cuenta=cronometro.tipo_cuenta
+    )
+    with cronometro.etapa("conciliacion"):
+        conciliacion.conciliar_resultado(datos_analizados, cronometro.banco)
+    return datos_analizados
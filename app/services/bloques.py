@@ -0,0 +1,69 @@
+# app/services/bloques.py
+import re
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+# Búsqueda acotada de bloques de resumen (saldos y totales) dentro del texto de un estado de cuenta.
+#
+# Los resúmenes se buscaban con un solo patrón de la forma "ANCLA .*? A .*? B .*? C" con
+# re.DOTALL sobre todo el documento. Si falta alguna de las partes, el motor vuelve a intentar
+# desde cada aparición del ancla y recorre el resto del texto cada vez: tiempo cuadrático en el
+# tamaño del documento. Aquí cada parte se busca por separado, a partir de donde terminó la
+# anterior y sin salir de una ventana que empieza en el ancla. La búsqueda de cada parte se
+# recuerda y se reutiliza para las apariciones siguientes del ancla, así que el texto se recorre
+# un número fijo de veces sin importar cuántas anclas haya.
+
+# Caracteres que puede ocupar un bloque de resumen a partir de su ancla.
+VENTANA_RESUMEN = 4000
+
+# Monto con separadores de miles ("1,234.56"). El lookbehind hace que solo se intente desde el
+# inicio de una secuencia de dígitos: el resultado es el mismo y una secuencia muy larga sin
+# punto decimal se descarta en tiempo lineal.
+MONTO = r"(?<![\d,])([\d,]+\.\d{2})"
+
+
+class _Busqueda:
+    """Recuerda la última búsqueda de cada patrón para no repetir recorridos."""
+
+    def __init__(self, texto: str):
+        self.texto = texto
+        self._memo: Dict[Pattern, Tuple[int, Optional[re.Match]]] = {}
+
+    def siguiente(self, patron: Pattern, posicion: int) -> Optional[re.Match]:
+        """Primera coincidencia de `patron` que empieza en `posicion` o después."""
+        previa = self._memo.get(patron)
+        if previa is not None:
+            desde, coincidencia = previa
+            # Si la búsqueda anterior empezó antes y su coincidencia (o la falta de ella) no
+            # queda antes de `posicion`, la respuesta es la misma.
+            if desde <= posicion and (coincidencia is None or coincidencia.start() >= posicion):
+                return coincidencia
+        coincidencia = patron.search(self.texto, posicion)
+        self._memo[patron] = (posicion, coincidencia)
+        return coincidencia
+
+
+def extraer_bloque(texto: str, patrones: Sequence[Pattern], ventana: int = VENTANA_RESUMEN) -> Optional[List[str]]:
+    """
+    Busca los `patrones` en orden: el primero es el ancla del bloque y cada uno de los demás
+    debe aparecer después del anterior, todos dentro de `ventana` caracteres desde el ancla.
+    Devuelve el grupo 1 de cada patrón que tenga grupos, para la primera aparición del ancla
+    con la que se completa la secuencia; None si ninguna la completa.
+    """
+    busqueda = _Busqueda(texto)
+    for ancla in patrones[0].finditer(texto):
+        limite = ancla.start() + ventana
+        valores = [ancla.group(1)] if patrones[0].groups else []
+        posicion = ancla.end()
+        for patron in patrones[1:]:
+            coincidencia = busqueda.siguiente(patron, posicion)
+            if coincidencia is None:
+                # Tampoco aparecerá después de un ancla posterior.
+                return None
+            if coincidencia.end() > limite:
+                break
+            if patron.groups:
+                valores.append(coincidencia.group(1))
+            posicion = coincidencia.end()
+        else:
+            return valores
+    return None
@@ -0,0 +1,95 @@
+# app/services/clasificacion.py
+import re
+from typing import List, Sequence, Tuple, Union
+
+from app.core.config import CLASIFICAR_PAGINAS
+from app.services import metricas
+from app.services.columnas import normalizar
+from app.services.extraccion import DocumentoPdf
+
+# Clasificación previa de las páginas de un estado de cuenta.
+# Extraer una página con coordenadas (palabras, líneas, columnas) es la parte cara del análisis,
+# y muchos estados traen al final páginas que ningún procesador usa: anexos legales, avisos,
+# publicidad. Antes de extraer nada, cada página se clasifica con su texto rápido de PDFium
+# (ver DocumentoPdf.texto_rapido) buscando las frases de su banco:
+#
+# - movimientos: de la primera a la última página con alguna frase de movimientos (título del
+#   detalle, encabezado de la tabla...). Las páginas intermedias cuentan aunque no tengan
+#   ninguna frase: una tabla puede continuar en una página sin título ni encabezado.
+# - resumen: las páginas anteriores a los movimientos (encabezado del estado y resumen del
+#   periodo) y, después de los movimientos, las que tengan alguna frase de resumen.
+# - relleno: las demás páginas posteriores a los movimientos. Los procesadores no las extraen.
+#
+# Los datos de encabezado y resumen se toman de la primera coincidencia en el documento, que
+# está en las páginas que siempre se leen. Si ninguna página tiene frases de movimientos (otro
+# formato, un PDF escaneado) no se descarta ninguna.
+
+RESUMEN = "resumen"
+MOVIMIENTOS = "movimientos"
+RELLENO = "relleno"
+
+# Una frase, o varias que deben aparecer todas en la página (p. ej. los títulos de las columnas).
+Marcador = Union[str, Sequence[str]]
+
+_ESPACIOS = re.compile(r"\s+")
+
+
+def compactar(texto: str) -> str:
+    """Mayúsculas, sin acentos ni espacios: cada motor separa las palabras a su manera."""
+    return _ESPACIOS.sub("", normalizar(texto))
+
+
+class PerfilPaginas:
+    """Frases que distinguen las páginas de movimientos y de resumen de un banco."""
+
+    def __init__(self, banco: str, movimientos: Sequence[Marcador], resumen: Sequence[Marcador] = ()):
+        self.banco = banco
+        self.movimientos = self._compilar(movimientos)
+        self.resumen = self._compilar(resumen)
+
+    @staticmethod
+    def _compilar(marcadores: Sequence[Marcador]) -> Tuple[Tuple[str, ...], ...]:
+        return tuple(
+            (compactar(marcador),) if isinstance(marcador, str) else tuple(compactar(frase) for frase in marcador)
+            for marcador in marcadores
+        )
+
+    @staticmethod
+    def _coincide(marcadores: Tuple[Tuple[str, ...], ...], texto: str) -> bool:
+        return any(all(frase in texto for frase in frases) for frases in marcadores)
+
+    def es_movimientos(self, texto_compacto: str) -> bool:
+        return self._coincide(self.movimientos, texto_compacto)
+
+    def es_resumen(self, texto_compacto: str) -> bool:
+        return self._coincide(self.resumen, texto_compacto)
+
+
+def clasificar(documento: DocumentoPdf, perfil: PerfilPaginas) -> List[str]:
+    """
+    Clase de cada página del documento (RESUMEN, MOVIMIENTOS o RELLENO). Con
+    CLASIFICAR_PAGINAS desactivado todas las páginas son RESUMEN y se extraen completas.
+    """
+    paginas = documento.numero_paginas()
+    if not CLASIFICAR_PAGINAS:
+        return [RESUMEN] * paginas
+
+    textos = [compactar(documento.texto_rapido(indice)) for indice in range(paginas)]
+    con_movimientos = [indice for indice, texto in enumerate(textos) if perfil.es_movimientos(texto)]
+    if not con_movimientos:
+        etiquetas = [RESUMEN] * paginas
+    else:
+        primera, ultima = con_movimientos[0], con_movimientos[-1]
+        etiquetas = [
+            RESUMEN if indice < primera
+            else MOVIMIENTOS if indice <= ultima
+            else RESUMEN if perfil.es_resumen(texto)
+            else RELLENO
+            for indice, texto in enumerate(textos)
+        ]
+
+    for clase in (RESUMEN, MOVIMIENTOS, RELLENO):
+        cantidad = etiquetas.count(clase)
+        if cantidad:
+            metricas.PAGINAS_CLASIFICADAS.inc(cantidad, banco=perfil.banco, clase=clase)
+    return etiquetas
@@ -0,0 +1,265 @@
+# app/services/columnas.py
+import re
+import threading
+import unicodedata
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.services import metricas
+from app.services.extraccion import DocumentoPdf, agrupar_lineas
+
+# Lectura de tablas de movimientos por coordenadas.
+# Las palabras de cada página se extraen una sola vez (ver app/services/extraccion.py) y se agrupan en
+# líneas por su posición vertical. Las columnas de montos (depósito, retiro, saldo...) se
+# aprenden de la fila de encabezado de la tabla: cada columna queda centrada en el texto de su
+# encabezado y las fronteras entre columnas están a la mitad entre centros vecinos. Un monto
+# pertenece a la columna en la que cae su centro, así que si es cargo o abono lo dice su
+# posición y no cuántos montos tiene la línea ni la descripción.
+#
+# El encabezado de una tabla es el mismo en todas las páginas y en todos los estados de un
+# mismo formato, así que las columnas aprendidas se guardan por banco y texto/posición del
+# encabezado.
+#
+# En las páginas de continuación solo interesan las líneas de la tabla: desde su encabezado
+# hasta el pie de página (aviso legal, dirección del banco...), que se buscan en cada página
+# (ver lineas_tabla).
+
+# Tolerancias de extract_words, las mismas con las que se extrae el texto en los procesadores.
+TOLERANCIA_X = 2
+TOLERANCIA_Y = 2
+# Separación horizontal (en puntos) a partir de la cual dos palabras del encabezado ya no son
+# parte del mismo título de columna ("MONTO DEL DEPOSITO").
+SEPARACION_TITULO = 6
+DISPOSICIONES_EN_CACHE = 128
+
+# Un monto ocupa una palabra completa: "1,234.56", "$1,234.56" o "-1,234.56".
+_MONTO_PALABRA = re.compile(r"^\$?-?\$?[\d,]*\d\.\d{2}$")
+
+Palabra = Dict[str, object]
+Linea = List[Palabra]
+
+
+def normalizar(texto: str) -> str:
+    """Mayúsculas y sin acentos, para comparar con las claves de los encabezados."""
+    return "".join(c for c in unicodedata.normalize("NFKD", texto.upper()) if not unicodedata.combining(c))
+
+
+def valor_monto(texto: str) -> float:
+    return float(texto.replace("$", "").replace(",", ""))
+
+
+class FormatoTabla:
+    """
+    Describe la tabla de movimientos de un banco: las claves que identifican su fila de
+    encabezado y, de izquierda a derecha, sus columnas de montos con las palabras que las
+    nombran en el encabezado.
+    """
+
+    def __init__(self, banco: str, claves_encabezado: Sequence[str],
+                 columnas: Sequence[Tuple[str, Sequence[str]]], requeridas: Sequence[str],
+                 frases_pie: Sequence[str] = ()):
+        self.banco = banco
+        self.claves_encabezado = tuple(normalizar(c) for c in claves_encabezado)
+        self.columnas = tuple((nombre, tuple(normalizar(c) for c in claves)) for nombre, claves in columnas)
+        self.requeridas = tuple(requeridas)
+        # Frases del pie de página: la primera línea con alguna de ellas, debajo de la tabla,
+        # marca dónde termina la tabla.
+        self.frases_pie = tuple(normalizar(f) for f in frases_pie)
+
+    def es_encabezado(self, linea: Linea) -> bool:
+        texto = normalizar(texto_linea(linea))
+        return all(clave in texto for clave in self.claves_encabezado)
+
+    def es_pie(self, linea: Linea) -> bool:
+        if not self.frases_pie:
+            return False
+        texto = normalizar(texto_linea(linea))
+        return any(frase in texto for frase in self.frases_pie)
+
+    def columna_de_titulo(self, texto: str) -> Optional[str]:
+        texto = normalizar(texto)
+        for nombre, claves in self.columnas:
+            if any(clave in texto for clave in claves):
+                return nombre
+        return None
+
+
+class Fila:
+    """Una línea de la tabla: el texto a la izquierda de los montos y los montos por columna."""
+
+    def __init__(self, textos: List[str], montos: Dict[str, str]):
+        self.textos = textos
+        self.montos = montos
+
+    @property
+    def texto(self) -> str:
+        return " ".join(self.textos)
+
+    def monto(self, columna: str) -> Optional[float]:
+        valor = self.montos.get(columna)
+        return valor_monto(valor) if valor is not None else None
+
+
+class Disposicion:
+    """Posición de las columnas de montos de una tabla, aprendida de su encabezado."""
+
+    def __init__(self, nombres: Sequence[str], centros: Sequence[float], inicio: float):
+        self.nombres = tuple(nombres)
+        self.centros = tuple(centros)
+        # Fronteras entre columnas vecinas y x a partir de la cual empiezan los montos.
+        self.limites = tuple((a + b) / 2 for a, b in zip(self.centros, self.centros[1:]))
+        self.inicio = inicio
+
+    def columna(self, palabra: Palabra) -> Optional[str]:
+        """Columna de montos en la que cae la palabra; None si está a la izquierda de los montos."""
+        centro = (palabra["x0"] + palabra["x1"]) / 2
+        if centro < self.inicio:
+            return None
+        return self.nombres[bisect_right(self.limites, centro)]
+
+    def separar(self, linea: Linea) -> Fila:
+        textos: List[str] = []
+        montos: Dict[str, str] = {}
+        for palabra in linea:
+            texto = palabra["text"]
+            columna = self.columna(palabra)
+            if columna is None:
+                textos.append(texto)
+            elif _MONTO_PALABRA.match(texto):
+                montos.setdefault(columna, texto)
+            # El texto que no es monto dentro de la zona de montos ("USD", "$") se descarta.
+        return Fila(textos, montos)
+
+
+def lineas_de_pagina(documento: DocumentoPdf, indice: int, y_tolerancia: float = TOLERANCIA_Y) -> List[Linea]:
+    """Palabras de la página agrupadas en líneas (de arriba abajo), cada una de izquierda a derecha."""
+    return agrupar_lineas(documento.palabras_pagina(indice, TOLERANCIA_X, y_tolerancia), y_tolerancia)
+
+
+def texto_linea(linea: Linea) -> str:
+    return " ".join(palabra["text"] for palabra in linea)
+
+
+def texto_de_lineas(lineas: Sequence[Linea]) -> str:
+    """
+    Texto de la página a partir de sus líneas: lo mismo que DocumentoPdf.texto_pagina con las
+    mismas tolerancias (que agrupa las mismas palabras de la misma forma), sin volver a extraerlas.
+    """
+    return "\n".join(texto_linea(linea) for linea in lineas)
+
+
+def _titulos(encabezado: Linea, formato: FormatoTabla) -> Dict[str, Tuple[float, float]]:
+    """
+    Extensión horizontal del título de cada columna de montos en la fila de encabezado. Un
+    título son las palabras seguidas (sin separación mayor a SEPARACION_TITULO) que terminan
+    en una palabra clave de la columna; solo se buscan a partir del título de la primera
+    columna, para no confundirlas con palabras iguales del lado de las fechas ("LIQ").
+    """
+    primera_claves = formato.columnas[0][1]
+    desde = next((i for i, p in enumerate(encabezado)
+                  if any(clave in normalizar(p["text"]) for clave in primera_claves)), None)
+    if desde is None:
+        return {}
+    # Las palabras que preceden a la primera clave y están pegadas a ella son parte de su título.
+    while desde > 0 and encabezado[desde]["x0"] - encabezado[desde - 1]["x1"] <= SEPARACION_TITULO:
+        desde -= 1
+
+    titulos: Dict[str, Tuple[float, float]] = {}
+    inicio_titulo: Optional[float] = None
+    anterior: Optional[Palabra] = None
+    for palabra in encabezado[desde:]:
+        if anterior is not None and palabra["x0"] - anterior["x1"] > SEPARACION_TITULO:
+            inicio_titulo = None
+        if inicio_titulo is None:
+            inicio_titulo = palabra["x0"]
+        nombre = formato.columna_de_titulo(palabra["text"])
+        if nombre is not None:
+            if nombre not in titulos:
+                titulos[nombre] = (inicio_titulo, palabra["x1"])
+            inicio_titulo = None
+        anterior = palabra
+    return titulos
+
+
+def aprender_disposicion(encabezado: Linea, formato: FormatoTabla) -> Optional[Disposicion]:
+    """Columnas de montos a partir de la fila de encabezado; None si falta alguna requerida."""
+    titulos = _titulos(encabezado, formato)
+    if any(nombre not in titulos for nombre in formato.requeridas):
+        return None
+    nombres = [nombre for nombre, _ in formato.columnas if nombre in titulos]
+    centros = [(titulos[n][0] + titulos[n][1]) / 2 for n in nombres]
+    if any(b <= a for a, b in zip(centros, centros[1:])):
+        return None
+    # Los montos empiezan donde empieza el título de la primera columna, o antes si la columna
+    # es más ancha que su título (tanto como la mitad de la distancia a la siguiente).
+    semiancho = (centros[1] - centros[0]) / 2 if len(centros) > 1 else 0.0
+    inicio = min(titulos[nombres[0]][0], centros[0] - semiancho)
+    return Disposicion(nombres, centros, inicio)
+
+
+class _CacheLRU:
+    """Cache acotado (se descarta lo usado hace más tiempo) con métricas de aciertos y fallos."""
+
+    def __init__(self, nombre: str, tamano: int):
+        self.nombre = nombre
+        self.tamano = tamano
+        self._datos: "OrderedDict[Tuple, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: Tuple) -> Tuple[bool, object]:
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                metricas.CACHE.inc(cache=self.nombre, resultado="acierto")
+                return True, self._datos[clave]
+        metricas.CACHE.inc(cache=self.nombre, resultado="fallo")
+        return False, None
+
+    def guardar(self, clave: Tuple, valor: object) -> None:
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            if len(self._datos) > self.tamano:
+                self._datos.popitem(last=False)
+
+
+_DISPOSICIONES = _CacheLRU("columnas", DISPOSICIONES_EN_CACHE)
+
+
+def disposicion(encabezado: Linea, formato: FormatoTabla) -> Optional[Disposicion]:
+    """`aprender_disposicion` con cache por banco y texto/posición del encabezado."""
+    firma = (formato.banco,) + tuple((p["text"], round(p["x0"]), round(p["x1"])) for p in encabezado)
+    encontrada, aprendida = _DISPOSICIONES.obtener(firma)
+    if not encontrada:
+        aprendida = aprender_disposicion(encabezado, formato)
+        _DISPOSICIONES.guardar(firma, aprendida)
+    return aprendida
+
+
+def hasta_pie(lineas: List[Linea], formato: FormatoTabla) -> List[Linea]:
+    """Las líneas de la tabla (la primera es su encabezado) hasta el pie de página, sin incluirlo."""
+    fin = next((i for i, linea in enumerate(lineas) if i and formato.es_pie(linea)), len(lineas))
+    return lineas[:fin]
+
+
+def huella_pagina(documento: DocumentoPdf, indice: int, formato: FormatoTabla) -> Tuple:
+    """Identifica el formato de la página sin leer su contenido: banco, tamaño y programa productor."""
+    ancho, alto = documento.tamano_pagina(indice)
+    metadatos = documento.metadatos()
+    return (formato.banco, documento.motor, round(ancho), round(alto),
+            metadatos.get("Producer", ""), metadatos.get("Creator", ""))
+
+
+def lineas_tabla(documento: DocumentoPdf, indice: int, formato: FormatoTabla,
+                 y_tolerancia: float = TOLERANCIA_Y) -> Tuple[List[Linea], bool]:
+    """
+    Líneas de la tabla de una página de continuación, desde su encabezado hasta el pie de esa
+    página. Devuelve (líneas, True) si se encontró el encabezado y (todas las líneas de la
+    página, False) si no.
+    """
+    lineas = lineas_de_pagina(documento, indice, y_tolerancia)
+    inicio = next((i for i, linea in enumerate(lineas) if formato.es_encabezado(linea)), None)
+    if inicio is None:
+        return lineas, False
+    return hasta_pie(lineas[inicio:], formato), True
@@ -0,0 +1,156 @@
+# app/services/conciliacion.py
+import math
+from array import array
+from itertools import accumulate, compress
+from operator import eq, ne, sub
+from typing import Any, Dict, Optional
+
+from app.services import metricas
+from app.services.tabla_transacciones import TablaTransacciones
+
+# Conciliación de los movimientos de una cuenta con sus saldos y con el resumen del periodo.
+# Los procesadores deciden la dirección de cada monto (depósito o retiro) con heurísticas por
+# banco, así que una fila mal leída solo se nota al sumar. Aquí se comprueba, en centavos enteros
+# y sobre las columnas completas (sin un objeto por fila):
+#
+# - la cadena de saldos: entre dos filas con saldo, la diferencia de saldos debe ser la suma de
+#   depósitos menos retiros de las filas intermedias (las filas sin saldo no rompen la cadena).
+#   La primera fila con saldo se compara contra el saldo inicial del resumen. Un retiro
+#   intercambiado con su saldo sigue cuadrando con la fila anterior; se marca la siguiente.
+# - los totales del resumen: suma de depósitos, suma de retiros y saldo final.
+#
+# La confianza de la cuenta es el promedio de la proporción de eslabones de la cadena que cuadran
+# y la de controles del resumen que cuadran (de los que hay datos para comprobar).
+#
+# El analizador concilia cada cuenta al terminar el procesador (ver `conciliar_resultado`); el
+# resultado se expone en el esquema v2 y en las métricas, el formato v1 no cambia.
+
+# Campos con los que cada procesador nombra los totales del resumen (ver esquema_v2.convertir_a_v2).
+CAMPOS_RESUMEN = {
+    "saldo_inicial": ("saldo_inicial", "saldo_anterior_resumen"),
+    "total_depositos": ("depositos", "total_ingresos"),
+    "total_retiros": ("retiros", "total_gastos"),
+    "saldo_final": ("saldo_final", "saldo_actual_resumen"),
+}
+
+
+def a_centavos(valor: Optional[float]) -> Optional[int]:
+    """Convierte un monto en pesos (float) a centavos enteros; None y NaN se mantienen como None."""
+    if valor is None or math.isnan(valor):
+        return None
+    return int(round(valor * 100))
+
+
+def _centavos(columna: array) -> array:
+    """Una columna de montos (sin NaN) en centavos enteros."""
+    return array("q", [round(monto * 100) for monto in columna])
+
+
+def totales_resumen(cuenta: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    """Saldo inicial, total de depósitos, total de retiros y saldo final de la cuenta, en centavos."""
+    totales = {}
+    for total, campos in CAMPOS_RESUMEN.items():
+        valor = next((cuenta[campo] for campo in campos if cuenta.get(campo) is not None), None)
+        totales[total] = a_centavos(valor)
+    return totales
+
+
+def conciliar(
+    tabla: TablaTransacciones,
+    saldo_inicial: Optional[int] = None,
+    total_depositos: Optional[int] = None,
+    total_retiros: Optional[int] = None,
+    saldo_final: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Concilia una tabla de transacciones con los totales del resumen (en centavos; None si el
+    resumen no lo trae). Devuelve:
+
+    - cuadra: True si todos los eslabones y controles comprobados cuadran (y hubo alguno).
+    - confianza: de 0 a 1 (ver el comentario del módulo).
+    - filas_descuadradas: índices de las filas cuyo saldo no sigue de la fila con saldo anterior.
+    - eslabones: cuántas filas con saldo se comprobaron.
+    - diferencias: por control del resumen, lo extraído menos lo declarado en centavos
+      (0 si cuadra, None si no hay datos para comprobarlo).
+    """
+    depositos = _centavos(tabla.depositos)
+    retiros = _centavos(tabla.retiros)
+    # netos[i] = depósitos menos retiros de las filas 0..i.
+    netos = array("q", accumulate(map(sub, depositos, retiros)))
+
+    # Filas con saldo y lo acumulado hasta cada una (los saldos ausentes son NaN).
+    if any(map(math.isnan, tabla.saldos)):
+        indices = list(compress(range(len(tabla)), map(eq, tabla.saldos, tabla.saldos)))
+        saldos = _centavos(array("d", (tabla.saldos[i] for i in indices)))
+        netos_filas = array("q", (netos[i] for i in indices))
+    else:
+        indices, saldos, netos_filas = range(len(tabla)), _centavos(tabla.saldos), netos
+
+    # Cada saldo menos lo acumulado hasta su fila es el saldo inicial que implica; debe ser el
+    # mismo de una fila con saldo a la siguiente (y el del resumen, para la primera).
+    iniciales = array("q", map(sub, saldos, netos_filas))
+    if saldo_inicial is None:
+        filas, comparados, previos = indices[1:], iniciales[1:], iniciales[:-1]
+    else:
+        filas, comparados, previos = indices, iniciales, array("q", [saldo_inicial]) + iniciales[:-1]
+    filas_descuadradas = list(compress(filas, map(ne, comparados, previos)))
+
+    # Saldo final según las filas: el último saldo más los movimientos posteriores sin saldo.
+    neto_total = netos[-1] if netos else 0
+    if indices:
+        final_extraido: Optional[int] = iniciales[-1] + neto_total
+    elif saldo_inicial is not None:
+        final_extraido = saldo_inicial + neto_total
+    else:
+        final_extraido = None
+    diferencias = {
+        "total_depositos": None if total_depositos is None else sum(depositos) - total_depositos,
+        "total_retiros": None if total_retiros is None else sum(retiros) - total_retiros,
+        "saldo_final": None if saldo_final is None or final_extraido is None else final_extraido - saldo_final,
+    }
+
+    componentes = []
+    if filas:
+        componentes.append(1 - len(filas_descuadradas) / len(filas))
+    controles = [diferencia for diferencia in diferencias.values() if diferencia is not None]
+    if controles:
+        componentes.append(controles.count(0) / len(controles))
+    confianza = sum(componentes) / len(componentes) if componentes else 0.0
+    return {
+        "cuadra": bool(componentes) and confianza == 1.0,
+        "confianza": round(confianza, 4),
+        "filas_descuadradas": filas_descuadradas,
+        "eslabones": len(filas),
+        "diferencias": diferencias,
+    }
+
+
+def sin_datos(conciliacion: Dict[str, Any]) -> bool:
+    """True si la conciliación no pudo comprobar nada: ni saldos encadenados ni totales del resumen."""
+    return not conciliacion["eslabones"] and all(d is None for d in conciliacion["diferencias"].values())
+
+
+def conciliar_cuenta(cuenta: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Concilia una cuenta del resultado de un procesador; None si no trae una TablaTransacciones."""
+    tabla = cuenta.get("transacciones")
+    if not isinstance(tabla, TablaTransacciones):
+        return None
+    return conciliar(tabla, **totales_resumen(cuenta))
+
+
+def conciliar_resultado(resultado: Dict[str, Any], banco: str) -> None:
+    """Agrega a cada cuenta del resultado su `conciliacion` y la registra en las métricas."""
+    for cuenta in resultado.get("cuentas", []):
+        conciliacion = conciliar_cuenta(cuenta)
+        if conciliacion is None:
+            continue
+        cuenta["conciliacion"] = conciliacion
+        if conciliacion["cuadra"]:
+            estado = "cuadra"
+        elif sin_datos(conciliacion):
+            estado = "sin_datos"
+        else:
+            estado = "descuadra"
+        metricas.CONCILIACION.inc(banco=banco, resultado=estado)
+        if conciliacion["filas_descuadradas"]:
+            metricas.FILAS_DESCUADRADAS.inc(len(conciliacion["filas_descuadradas"]), banco=banco)
@@ -0,0 +1,143 @@
+# app/services/esquema_v2.py
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.schemas.analysis_v2 import TransaccionV2
+from app.services import fechas, metricas
+from app.services.conciliacion import a_centavos, totales_resumen
+from app.services.tabla_transacciones import TablaTransacciones
+
+VERSION_ESQUEMA = 2
+
+# Campos de transacción del esquema v2 (los que acepta el parámetro `fields`).
+CAMPOS_TRANSACCION_V2 = frozenset(TransaccionV2.model_fields)
+
+# Los procesadores usan nombres distintos para el mismo tipo de movimiento.
+TIPOS_CANONICOS = {
+    "ingreso": "ingreso",
+    "gasto": "gasto",
+    "saldo_inicial": "saldo_inicial",
+    "saldo_anterior": "saldo_inicial",
+    "informativo": "informativo",
+    "otro": "informativo",
+}
+
+# Valores de relleno que algunos procesadores usan cuando no encuentran un dato.
+VALORES_NO_ENCONTRADOS = {"", "No encontrado", "No encontrada", "N/A", "No Identificada"}
+
+
+def _limpiar(valor: Optional[str]) -> Optional[str]:
+    return None if valor is None or valor in VALORES_NO_ENCONTRADOS else valor
+
+
+def _tipo_movimiento(tipo: str, retiro: int, deposito: int) -> str:
+    if tipo in TIPOS_CANONICOS:
+        return TIPOS_CANONICOS[tipo]
+    if deposito > 0:
+        return "ingreso"
+    if retiro > 0:
+        return "gasto"
+    return "informativo"
+
+
+def transacciones_v2(
+    tabla: TablaTransacciones,
+    fin_periodo: Optional[date],
+    campos: Optional[Sequence[str]] = None,
+    inicio: int = 0,
+    fin: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Convierte una tabla de transacciones a la lista de transacciones del esquema v2. Las fechas
+    sin año lo toman de `fin_periodo` (ver fechas.fecha_en_periodo).
+    Con `campos` e `inicio`/`fin` solo se calculan los campos y filas pedidos.
+    """
+    quiere = CAMPOS_TRANSACCION_V2 if campos is None else frozenset(campos)
+    # Las fechas están internadas, así que basta con interpretar cada valor distinto una vez.
+    fechas_iso: Dict[str, Optional[str]] = {}
+    fallos = 0
+    transacciones = []
+    for i in range(*slice(inicio, fin).indices(len(tabla))):
+        transaccion: Dict[str, Any] = {}
+        if "fecha" in quiere:
+            fecha = tabla.fechas[i]
+            if fecha not in fechas_iso:
+                fechas_iso[fecha] = fechas.a_iso(fechas.fecha_en_periodo(fecha, fin_periodo))
+                fallos += 1
+            transaccion["fecha"] = fechas_iso[fecha]
+        if "descripcion" in quiere:
+            transaccion["descripcion"] = tabla.descripciones[i]
+        retiro = a_centavos(tabla.retiros[i])
+        deposito = a_centavos(tabla.depositos[i])
+        if "retiro" in quiere:
+            transaccion["retiro"] = retiro
+        if "deposito" in quiere:
+            transaccion["deposito"] = deposito
+        if "saldo" in quiere:
+            transaccion["saldo"] = a_centavos(tabla.saldos[i])
+        if "tipo_movimiento" in quiere:
+            transaccion["tipo_movimiento"] = _tipo_movimiento(tabla.tipos_movimiento[i], retiro, deposito)
+        # Los campos opcionales sin valor se omiten para no inflar la respuesta, igual que la
+        # referencia cuando el banco ya la incluye al inicio de la descripción (BBVA, BanBajío).
+        if "categoria" in quiere and tabla.categorias[i]:
+            transaccion["categoria"] = tabla.categorias[i]
+        referencia = tabla.referencias[i]
+        if "referencia" in quiere and referencia and not tabla.descripciones[i].startswith(referencia):
+            transaccion["referencia"] = referencia
+        transacciones.append(transaccion)
+
+    if "fecha" in quiere:
+        metricas.CACHE.inc(len(transacciones) - fallos, cache="fechas_v2", resultado="acierto")
+        metricas.CACHE.inc(fallos, cache="fechas_v2", resultado="fallo")
+    return transacciones
+
+
+def convertir_a_v2(
+    resultado: Dict[str, Any],
+    campos: Optional[Sequence[str]] = None,
+    inicio: int = 0,
+    limite: Optional[int] = None,
+    solo_resumen: bool = False,
+) -> Dict[str, Any]:
+    """
+    Convierte el resultado de cualquier procesador al esquema canónico v2
+    (ver app/schemas/analysis_v2.py) sin crear modelos Pydantic por fila.
+
+    `campos`, `inicio`/`limite` y `solo_resumen` proyectan la salida igual que
+    `tabla_transacciones.convertir_resultado`.
+    """
+    periodo_inicio, periodo_fin = fechas.interpretar_periodo(resultado.get("periodo"))
+    fecha_corte = fechas.interpretar_fecha(resultado.get("fecha_corte") or "")
+    # Las fechas sin año lo toman del fin del periodo (o de la fecha de corte).
+    fin_periodo = periodo_fin or fecha_corte
+    paginado = solo_resumen or inicio > 0 or limite is not None
+    fin = None if limite is None else inicio + limite
+
+    cuentas = []
+    for cuenta in resultado.get("cuentas", []):
+        tabla = cuenta.get("transacciones")
+        if not isinstance(tabla, TablaTransacciones):
+            tabla = TablaTransacciones()
+        # Los bancos nombran distinto los mismos totales (ver conciliacion.CAMPOS_RESUMEN).
+        cuenta_v2 = {
+            "nombre_cuenta": _limpiar(cuenta.get("nombre_cuenta")),
+            "numero_cuenta": _limpiar(cuenta.get("numero_cuenta")),
+            "moneda": _limpiar(cuenta.get("moneda")),
+            **totales_resumen(cuenta),
+            "conciliacion": cuenta.get("conciliacion"),
+        }
+        if not solo_resumen:
+            cuenta_v2["transacciones"] = transacciones_v2(tabla, fin_periodo, campos, inicio, fin)
+        if paginado:
+            cuenta_v2["total_transacciones"] = len(tabla)
+        cuentas.append(cuenta_v2)
+
+    return {
+        "version": VERSION_ESQUEMA,
+        "nombre_archivo": resultado.get("nombre_archivo"),
+        "banco": (resultado.get("banco") or "").lower(),
+        "fecha_corte": fechas.a_iso(fecha_corte),
+        "periodo_inicio": fechas.a_iso(periodo_inicio),
+        "periodo_fin": fechas.a_iso(periodo_fin),
+        "cuentas": cuentas,
+    }
@@ -0,0 +1,138 @@
+# app/services/estrategias.py
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from app.services import conciliacion, metricas
+
+# Estrategias de extracción con orden aprendido por formato.
+# Un procesador puede leer sus transacciones de varias formas (por columnas, por texto...), cada
+# una con un costo estimado. `SelectorEstrategias` las prueba de la más barata a la más cara y
+# valida cada resultado con la conciliación (app/services/conciliacion.py): el primero que cuadra
+# (o que no se puede comprobar) es el que se usa. Si ninguno cuadra se usa el de mayor confianza.
+#
+# Lo que funcionó se recuerda por huella del formato (banco, tamaño de página, programa que
+# generó el PDF; ver columnas.huella_pagina) y esa estrategia se prueba primero la siguiente vez,
+# así un formato en el que la estrategia barata nunca sirve no la paga en cada página o documento.
+# Si en esa huella ninguna estrategia cuadró, las siguientes veces solo se prueba la que ganó,
+# pero cada REVALIDAR_CADA usos se vuelven a probar todas: un documento atípico (p. ej. con un
+# total mal impreso en el resumen) no deja el formato fijo para siempre en una estrategia que
+# quizá no cuadre con los siguientes.
+#
+# Cada análisis corre en un proceso hijo (app/services/aislamiento.py): el hijo recibe lo
+# aprendido hasta entonces (`instantanea`) y al terminar devuelve lo suyo, que el proceso de la
+# API incorpora con `fusionar`, igual que las métricas.
+
+HUELLAS_EN_MEMORIA = 256
+REVALIDAR_CADA = 8
+
+# Una estrategia devuelve su resultado o None si no aplica a la entrada (p. ej. no encontró el
+# encabezado de la tabla). La conciliación de un resultado la calcula quien usa el selector.
+Extractor = Callable[..., Optional[Any]]
+Conciliador = Callable[[Any], Dict[str, Any]]
+
+
+class Estrategia:
+    """Una forma de extraer las transacciones, con su costo relativo estimado."""
+
+    def __init__(self, nombre: str, costo: float, extraer: Extractor):
+        self.nombre = nombre
+        self.costo = costo
+        self.extraer = extraer
+
+
+# Lo recordado por huella: estrategia ganadora, si cuadró y, si no cuadró, cuántas veces
+# seguidas se ha usado sin volver a probar las demás.
+Recordada = Tuple[str, bool, int]
+
+
+class _MemoriaEstrategias:
+    """Estrategia ganadora por huella (y si cuadró), acotada a las huellas usadas más recientemente."""
+
+    def __init__(self, tamano: int):
+        self.tamano = tamano
+        self._datos: "OrderedDict[Hashable, Recordada]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, huella: Hashable) -> Optional[Recordada]:
+        with self._lock:
+            recordada = self._datos.get(huella)
+            if recordada is not None:
+                self._datos.move_to_end(huella)
+        metricas.CACHE.inc(cache="estrategias", resultado="acierto" if recordada else "fallo")
+        return recordada
+
+    def guardar(self, huella: Hashable, nombre: str, cuadro: bool, usos: int = 0) -> None:
+        with self._lock:
+            self._datos[huella] = (nombre, cuadro, usos)
+            self._datos.move_to_end(huella)
+            while len(self._datos) > self.tamano:
+                self._datos.popitem(last=False)
+
+    def instantanea(self) -> Dict[Hashable, Recordada]:
+        with self._lock:
+            return dict(self._datos)
+
+    def fusionar(self, valores: Dict[Hashable, Recordada]) -> None:
+        for huella, recordada in valores.items():
+            self.guardar(huella, *recordada)
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._datos.clear()
+
+
+_MEMORIA = _MemoriaEstrategias(HUELLAS_EN_MEMORIA)
+instantanea = _MEMORIA.instantanea
+fusionar = _MEMORIA.fusionar
+reiniciar = _MEMORIA.reiniciar
+
+
+class SelectorEstrategias:
+    """Las estrategias de extracción de un banco, ordenadas por costo."""
+
+    def __init__(self, banco: str, estrategias: Sequence[Estrategia]):
+        self.banco = banco
+        self.estrategias = sorted(estrategias, key=lambda estrategia: estrategia.costo)
+
+    def orden(self, huella: Hashable) -> Tuple[List[Estrategia], Optional[Recordada]]:
+        """Estrategias en el orden en que se prueban para la huella y lo recordado para ella."""
+        recordada = _MEMORIA.obtener(huella)
+        if recordada is None:
+            return self.estrategias, None
+        primera = [e for e in self.estrategias if e.nombre == recordada[0]]
+        return primera + [e for e in self.estrategias if e.nombre != recordada[0]], recordada
+
+    def extraer(self, huella: Hashable, conciliar: Conciliador, *args: Any) -> Optional[Any]:
+        """
+        Resultado de la primera estrategia (en `orden`) que cuadra según `conciliar`, o el de
+        mayor confianza si ninguna cuadra; None si ninguna aplica. `args` se pasan a cada estrategia.
+        """
+        estrategias, recordada = self.orden(huella)
+        # La última vez ninguna cuadró en esta huella: solo se prueba la ganadora, salvo cada
+        # REVALIDAR_CADA usos.
+        solo_recordada = recordada is not None and not recordada[1] and recordada[2] + 1 < REVALIDAR_CADA
+        mejor: Optional[Tuple[float, str, Any]] = None
+        for estrategia in estrategias:
+            resultado = estrategia.extraer(*args)
+            if resultado is None:
+                self._registrar(estrategia, "no_aplica")
+                continue
+            detalle = conciliar(resultado)
+            if detalle["cuadra"] or conciliacion.sin_datos(detalle):
+                self._registrar(estrategia, "cuadra")
+                _MEMORIA.guardar(huella, estrategia.nombre, True)
+                return resultado
+            self._registrar(estrategia, "descuadra")
+            if mejor is None or detalle["confianza"] > mejor[0]:
+                mejor = (detalle["confianza"], estrategia.nombre, resultado)
+            if solo_recordada and estrategia.nombre == recordada[0]:
+                _MEMORIA.guardar(huella, estrategia.nombre, False, recordada[2] + 1)
+                return resultado
+        if mejor is None:
+            return None
+        _MEMORIA.guardar(huella, mejor[1], False)
+        return mejor[2]
+
+    def _registrar(self, estrategia: Estrategia, resultado: str) -> None:
+        metricas.ESTRATEGIAS.inc(banco=self.banco, estrategia=estrategia.nombre, resultado=resultado)
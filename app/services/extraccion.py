@@ -0,0 +1,241 @@
+# app/services/extraccion.py
+import ctypes
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple, Type
+
+import pdfplumber
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+from pdfplumber.utils import cluster_objects, extract_words
+
+from app.core.config import MOTOR_EXTRACCION, MOTORES_POR_BANCO
+
+# Motores de extracción de texto de los PDFs.
+# Los procesadores piden a un `DocumentoPdf` el número de páginas, el texto de cada página o sus
+# palabras con coordenadas, sin depender de la biblioteca que lo lee:
+#
+# - "pdfplumber": pdfminer, en Python puro. Es el motor con el que se escribieron los procesadores.
+# - "pdfium": PDFium (pypdfium2), nativo; varias veces más rápido en leer los caracteres.
+#
+# Los dos motores entregan caracteres con la misma forma (texto, x0, x1, top, bottom) y las
+# palabras y líneas se arman igual para ambos con el algoritmo de pdfplumber, así que con los
+# mismos caracteres el texto es el mismo. El motor se elige por banco con MOTORES_POR_BANCO (los
+# demás usan MOTOR_EXTRACCION); antes de cambiar el de un banco hay que verificar con
+# benchmarks/verificar_motores.py que sus transacciones salen iguales.
+
+Caracter = Dict[str, object]
+Palabra = Dict[str, object]
+
+# PDFium no es seguro entre hilos: todas las llamadas se serializan.
+_BLOQUEO_PDFIUM = threading.RLock()
+
+
+def agrupar_lineas(palabras: List[Palabra], y_tolerancia: float) -> List[List[Palabra]]:
+    """Palabras agrupadas en líneas por su posición vertical, cada línea de izquierda a derecha."""
+    lineas = cluster_objects(palabras, "top", y_tolerancia)
+    return [sorted(linea, key=lambda p: p["x0"]) for linea in lineas]
+
+
+class DocumentoPdf(ABC):
+    """Un PDF abierto con algún motor. Se usa como context manager."""
+
+    motor = ""
+
+    def __init__(self, ruta_pdf: str):
+        self.ruta_pdf = ruta_pdf
+
+    @abstractmethod
+    def numero_paginas(self) -> int:
+        ...
+
+    @abstractmethod
+    def tamano_pagina(self, indice: int) -> Tuple[float, float]:
+        ...
+
+    @abstractmethod
+    def metadatos(self) -> Dict[str, str]:
+        ...
+
+    @abstractmethod
+    def caracteres_pagina(self, indice: int) -> List[Caracter]:
+        ...
+
+    def palabras_pagina(self, indice: int, x_tolerancia: float = 2, y_tolerancia: float = 2,
+                        franja: Optional[Tuple[float, float]] = None) -> List[Palabra]:
+        """
+        Palabras de la página (text, x0, x1, top, bottom...). Con `franja` = (arriba, abajo) solo
+        se agrupan los caracteres cuyo `top` cae en ella.
+        """
+        caracteres = self.caracteres_pagina(indice)
+        if franja is not None:
+            arriba, abajo = franja
+            caracteres = [c for c in caracteres if arriba <= c["top"] < abajo]
+        return extract_words(caracteres, x_tolerance=x_tolerancia, y_tolerance=y_tolerancia)
+
+    def texto_pagina(self, indice: int, x_tolerancia: float = 2, y_tolerancia: float = 2) -> str:
+        """Texto de la página, una línea por renglón (como page.extract_text de pdfplumber)."""
+        lineas = agrupar_lineas(self.palabras_pagina(indice, x_tolerancia, y_tolerancia), y_tolerancia)
+        return "\n".join(" ".join(palabra["text"] for palabra in linea) for linea in lineas)
+
+    def texto_rapido(self, indice: int) -> str:
+        """
+        Texto de la página tal como lo arma PDFium, sin agrupar palabras por coordenadas: cuesta
+        alrededor de un milisegundo por página con cualquier motor. Los espacios y saltos de
+        línea no coinciden con los de `texto_pagina`; sirve para buscar frases, no para extraer
+        datos (ver app/services/clasificacion.py).
+        """
+        with _BLOQUEO_PDFIUM:
+            pagina = self._documento_pdfium()[indice]
+            textpage = pagina.get_textpage()
+            try:
+                return textpage.get_text_bounded()
+            finally:
+                textpage.close()
+                pagina.close()
+
+    @abstractmethod
+    def _documento_pdfium(self) -> pdfium.PdfDocument:
+        ...
+
+    def cerrar(self) -> None:
+        pass
+
+    def __enter__(self) -> "DocumentoPdf":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+
+class DocumentoPdfplumber(DocumentoPdf):
+    motor = "pdfplumber"
+
+    def __init__(self, ruta_pdf: str):
+        super().__init__(ruta_pdf)
+        self.pdf = pdfplumber.open(ruta_pdf)
+        # Solo para `texto_rapido`; se abre la primera vez que se pide.
+        self._pdfium: Optional[pdfium.PdfDocument] = None
+        # Página cuyo layout está en memoria. pdfplumber guarda los caracteres y objetos de cada
+        # página leída hasta que se cierra el documento; aquí se liberan al pasar a otra página,
+        # así que la memoria no crece con el número de páginas.
+        self._actual: Optional[int] = None
+
+    def numero_paginas(self) -> int:
+        return len(self.pdf.pages)
+
+    def tamano_pagina(self, indice: int) -> Tuple[float, float]:
+        pagina = self.pdf.pages[indice]
+        return pagina.width, pagina.height
+
+    def metadatos(self) -> Dict[str, str]:
+        return {clave: str(valor) for clave, valor in (self.pdf.metadata or {}).items()}
+
+    def _pagina(self, indice: int) -> pdfplumber.page.Page:
+        if self._actual is not None and self._actual != indice:
+            self.pdf.pages[self._actual].close()
+        self._actual = indice
+        return self.pdf.pages[indice]
+
+    def caracteres_pagina(self, indice: int) -> List[Caracter]:
+        return self._pagina(indice).chars
+
+    def texto_pagina(self, indice: int, x_tolerancia: float = 2, y_tolerancia: float = 2) -> str:
+        return self._pagina(indice).extract_text(x_tolerance=x_tolerancia, y_tolerance=y_tolerancia) or ""
+
+    def _documento_pdfium(self) -> pdfium.PdfDocument:
+        if self._pdfium is None:
+            self._pdfium = pdfium.PdfDocument(self.ruta_pdf)
+        return self._pdfium
+
+    def cerrar(self) -> None:
+        self.pdf.close()
+        if self._pdfium is not None:
+            with _BLOQUEO_PDFIUM:
+                self._pdfium.close()
+            self._pdfium = None
+
+
+class DocumentoPdfium(DocumentoPdf):
+    motor = "pdfium"
+
+    def __init__(self, ruta_pdf: str):
+        super().__init__(ruta_pdf)
+        with _BLOQUEO_PDFIUM:
+            self.pdf = pdfium.PdfDocument(ruta_pdf)
+        # Caracteres de la última página leída (los procesadores piden texto y palabras de la
+        # misma página seguidos).
+        self._cache: Tuple[int, List[Caracter]] = (-1, [])
+
+    def numero_paginas(self) -> int:
+        with _BLOQUEO_PDFIUM:
+            return len(self.pdf)
+
+    def tamano_pagina(self, indice: int) -> Tuple[float, float]:
+        with _BLOQUEO_PDFIUM:
+            return self.pdf.get_page_size(indice)
+
+    def metadatos(self) -> Dict[str, str]:
+        with _BLOQUEO_PDFIUM:
+            return {clave: valor for clave, valor in self.pdf.get_metadata_dict(skip_empty=True).items()}
+
+    def caracteres_pagina(self, indice: int) -> List[Caracter]:
+        if self._cache[0] == indice:
+            return self._cache[1]
+        with _BLOQUEO_PDFIUM:
+            pagina = self.pdf[indice]
+            textpage = pagina.get_textpage()
+            try:
+                caracteres = self._leer_caracteres(textpage.raw, pagina.get_height())
+            finally:
+                textpage.close()
+                pagina.close()
+        self._cache = (indice, caracteres)
+        return caracteres
+
+    @staticmethod
+    def _leer_caracteres(textpage, alto: float) -> List[Caracter]:
+        # Caja "holgada" de cada carácter (avance horizontal y altura de la fuente): la misma
+        # geometría que pdfplumber toma de pdfminer. Los espacios y saltos de línea que PDFium
+        # genera no son caracteres del documento; las palabras se separan por distancia.
+        caracteres = []
+        caja = pdfium_c.FS_RECTF()
+        for i in range(pdfium_c.FPDFText_CountChars(textpage)):
+            codigo = pdfium_c.FPDFText_GetUnicode(textpage, i)
+            if codigo == 0:
+                continue
+            texto = chr(codigo)
+            if texto.isspace() or not pdfium_c.FPDFText_GetLooseCharBox(textpage, i, ctypes.byref(caja)):
+                continue
+            top = alto - caja.top
+            caracteres.append({
+                "text": texto, "x0": caja.left, "x1": caja.right,
+                "top": top, "doctop": top, "bottom": alto - caja.bottom, "upright": True,
+            })
+        return caracteres
+
+    def _documento_pdfium(self) -> pdfium.PdfDocument:
+        return self.pdf
+
+    def cerrar(self) -> None:
+        self._cache = (-1, [])
+        with _BLOQUEO_PDFIUM:
+            self.pdf.close()
+
+
+MOTORES: Dict[str, Type[DocumentoPdf]] = {
+    DocumentoPdfplumber.motor: DocumentoPdfplumber,
+    DocumentoPdfium.motor: DocumentoPdfium,
+}
+
+
+def motor_de(banco: Optional[str] = None) -> str:
+    return MOTORES_POR_BANCO.get(banco, MOTOR_EXTRACCION) if banco else MOTOR_EXTRACCION
+
+
+def abrir(ruta_pdf: str, banco: Optional[str] = None, motor: Optional[str] = None) -> DocumentoPdf:
+    """Abre el PDF con `motor` o, si no se indica, con el que corresponde al banco."""
+    motor = motor or motor_de(banco)
+    if motor not in MOTORES:
+        raise ValueError(f"Motor de extracción desconocido: {motor} (disponibles: {', '.join(MOTORES)})")
+    return MOTORES[motor](ruta_pdf)
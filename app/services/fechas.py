@@ -0,0 +1,109 @@
+# app/services/fechas.py
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# Meses en español (abreviados y completos) tal como aparecen en los estados de cuenta.
+MESES = {
+    "ENE": 1, "FEB": 2, "MAR": 3, "ABR": 4, "MAY": 5, "JUN": 6,
+    "JUL": 7, "AGO": 8, "SEP": 9, "SEPT": 9, "SET": 9, "OCT": 10, "NOV": 11, "DIC": 12,
+    "ENERO": 1, "FEBRERO": 2, "MARZO": 3, "ABRIL": 4, "MAYO": 5, "JUNIO": 6, "JULIO": 7,
+    "AGOSTO": 8, "SEPTIEMBRE": 9, "SETIEMBRE": 9, "OCTUBRE": 10, "NOVIEMBRE": 11, "DICIEMBRE": 12,
+}
+
+# Las fechas se repiten mucho (todas las transacciones de un día, los mismos días en cada
+# estado), así que se interpretan una sola vez por texto (y año o fin de periodo).
+FECHAS_EN_CACHE = 4096
+# Una fecha sin año que quedaría más de medio año después del fin del periodo es del año
+# anterior: un movimiento de diciembre en un periodo que termina en enero.
+_MEDIO_ANIO = timedelta(days=183)
+
+# Día, mes (número o nombre) y año opcional, con '-', '/', espacios o "DE" como separadores.
+# Cubre DD-MMM-YY (Banorte), DD-MMM-YYYY (Santander), DD/MMM (BBVA), DD MMM (Banamex,
+# BanBajío, Scotiabank), DD/MM/YYYY (BBVA) y "31 DE ENERO DE 2024" (Banamex).
+_PATRON_DIA_MES = re.compile(
+    r"^\s*(\d{1,2})\s*(?:[-/]|\s+DE\s+|\s+)\s*([A-Z]+|\d{1,2})"
+    r"(?:\s*(?:[-/]|\s+DE\s+|\s+)\s*(\d{4}|\d{2}))?\s*$",
+    re.IGNORECASE,
+)
+# MMM DD (Scotiabank usa ambos órdenes).
+_PATRON_MES_DIA = re.compile(r"^\s*([A-Z]{3,})\s+(\d{1,2})\s*$", re.IGNORECASE)
+_PATRON_SEPARADOR_PERIODO = re.compile(r"\s+AL\s+|(?<=\d)/(?=\d{1,2}[-\s])", re.IGNORECASE)
+
+
+def _mes(texto: str) -> Optional[int]:
+    if texto.isdigit():
+        mes = int(texto)
+        return mes if 1 <= mes <= 12 else None
+    return MESES.get(texto.upper())
+
+
+def _construir(anio: Optional[int], mes: Optional[int], dia: int) -> Optional[date]:
+    if anio is None or mes is None:
+        return None
+    try:
+        return date(anio, mes, dia)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=FECHAS_EN_CACHE)
+def interpretar_fecha(texto: str, anio: Optional[int] = None) -> Optional[date]:
+    """
+    Interpreta una fecha en cualquiera de los formatos de los bancos soportados.
+    Si la fecha no trae año se usa `anio`; si tampoco hay, devuelve None.
+    """
+    if not texto:
+        return None
+    texto = texto.strip()
+    if texto.upper().startswith("DEL "):
+        texto = texto[4:]
+
+    match = _PATRON_DIA_MES.match(texto)
+    if match:
+        dia, mes, anio_texto = match.groups()
+        if anio_texto:
+            anio = int(anio_texto) + (2000 if len(anio_texto) == 2 else 0)
+        return _construir(anio, _mes(mes), int(dia))
+
+    match = _PATRON_MES_DIA.match(texto)
+    if match:
+        return _construir(anio, _mes(match.group(1)), int(match.group(2)))
+    return None
+
+
+@lru_cache(maxsize=FECHAS_EN_CACHE)
+def fecha_en_periodo(texto: str, fin: Optional[date]) -> Optional[date]:
+    """
+    Interpreta la fecha de un movimiento de un estado cuyo periodo termina en `fin`. Si la fecha
+    no trae año toma el de `fin`, o el anterior si con ese quedaría más de medio año después
+    (p. ej. "28 DIC" en un periodo que termina el 14 de enero).
+    """
+    fecha = interpretar_fecha(texto)
+    if fecha is not None or fin is None:
+        return fecha
+    fecha = interpretar_fecha(texto, fin.year)
+    if fecha is not None and fecha - fin > _MEDIO_ANIO:
+        fecha = interpretar_fecha(texto, fin.year - 1)
+    return fecha
+
+
+def interpretar_periodo(periodo: Optional[str]) -> Tuple[Optional[date], Optional[date]]:
+    """
+    Devuelve las fechas de inicio y fin de un periodo como "DEL 01/01/2024 AL 31/01/2024",
+    "01-ENE-24/31-ENE-24" o "01 DE ENERO AL 31 DE ENERO DE 2024". Si el inicio no trae año,
+    toma el del fin (ver `fecha_en_periodo`).
+    """
+    if not periodo:
+        return None, None
+    partes = _PATRON_SEPARADOR_PERIODO.split(periodo.strip(), maxsplit=1)
+    if len(partes) != 2:
+        return None, None
+    fin = interpretar_fecha(partes[1])
+    inicio = fecha_en_periodo(partes[0], fin)
+    return inicio, fin
+
+
+def a_iso(fecha: Optional[date]) -> Optional[str]:
+    return fecha.isoformat() if fecha else None
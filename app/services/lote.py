@@ -0,0 +1,390 @@
+# app/services/lote.py
+import multiprocessing
+import os
+import signal
+import tempfile
+import time
+import zipfile
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+import orjson
+
+from app.core.config import LOTE_CONFIRMACION_S, LOTE_DOCUMENTOS_POR_BLOQUE, LOTE_TRABAJADORES
+from app.core.registro import configurar_registro
+from app.core.respuestas import serializar
+from app.services import aislamiento, analizador, esquema_v2, memoria
+from app.services.metricas import CronometroEtapas
+
+# pyarrow es opcional: sin él solo se escribe el NDJSON.
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - depende del entorno
+    pyarrow = None
+
+# Conversión masiva de estados de cuenta archivados, sin pasar por la API (ver app/cli/lote.py).
+# Se recorre un directorio (recursivamente) o un ZIP y cada PDF se analiza en un pool de procesos
+# con el mismo flujo que la API (identificación, procesador y conciliación, con el plazo de
+# app/services/aislamiento.py), sin límites de uso ni Supabase. Cada documento se escribe como
+# una línea de `resultados.ndjson` (el esquema v2, o el motivo por el que no se pudo analizar) y,
+# si se pide, sus transacciones como filas de Parquet en `transacciones/parte-NNNNN.parquet`.
+#
+# Los resultados se confirman por bloques: se agregan al NDJSON (con fsync), se escribe la parte
+# Parquet del bloque (a un temporal que se renombra) y solo entonces se anota el bloque en
+# `punto_control.ndjson` con sus documentos y el tamaño del NDJSON hasta ahí. Al reanudar se
+# trunca el NDJSON a ese tamaño y se borran las partes que no se anotaron, así que un corte a
+# mitad de un bloque no duplica ni pierde documentos: solo se repiten los de ese bloque.
+
+ARCHIVO_RESULTADOS = "resultados.ndjson"
+ARCHIVO_PUNTO_CONTROL = "punto_control.ndjson"
+DIRECTORIO_PARTES = "transacciones"
+
+# Columnas de las partes Parquet: una fila por transacción, con el documento y la cuenta.
+COLUMNAS_PARQUET = (
+    "archivo", "banco", "numero_cuenta", "cuenta", "fila", "fecha", "descripcion",
+    "retiro", "deposito", "saldo", "tipo_movimiento", "categoria", "referencia",
+)
+
+if "forkserver" in multiprocessing.get_all_start_methods():
+    _CONTEXTO = multiprocessing.get_context("forkserver")
+else:  # Windows
+    _CONTEXTO = multiprocessing.get_context("spawn")
+
+
+def esquema_parquet() -> "pyarrow.Schema":
+    return pyarrow.schema([
+        ("archivo", pyarrow.string()),
+        ("banco", pyarrow.string()),
+        ("numero_cuenta", pyarrow.string()),
+        ("cuenta", pyarrow.int32()),
+        ("fila", pyarrow.int32()),
+        ("fecha", pyarrow.date32()),
+        ("descripcion", pyarrow.string()),
+        # Montos en centavos, igual que en el esquema v2.
+        ("retiro", pyarrow.int64()),
+        ("deposito", pyarrow.int64()),
+        ("saldo", pyarrow.int64()),
+        ("tipo_movimiento", pyarrow.string()),
+        ("categoria", pyarrow.string()),
+        ("referencia", pyarrow.string()),
+    ])
+
+
+def es_pdf(nombre: str) -> bool:
+    return nombre.lower().endswith(".pdf")
+
+
+def buscar_documentos(origen: str) -> List[str]:
+    """
+    Nombres de los PDFs de un directorio (rutas relativas, recursivamente) o de un ZIP
+    (nombres de sus miembros), ordenados.
+    """
+    if os.path.isdir(origen):
+        documentos = []
+        for directorio, _, archivos in os.walk(origen):
+            documentos += [
+                os.path.relpath(os.path.join(directorio, archivo), origen) for archivo in archivos if es_pdf(archivo)
+            ]
+        return sorted(documentos)
+    if zipfile.is_zipfile(origen):
+        with zipfile.ZipFile(origen) as comprimido:
+            return sorted(info.filename for info in comprimido.infolist() if not info.is_dir() and es_pdf(info.filename))
+    raise ValueError(f"{origen} no es un directorio ni un archivo ZIP.")
+
+
+@contextmanager
+def _ruta_local(origen: str, documento: str) -> Iterator[str]:
+    """Ruta en disco del documento; los de un ZIP se extraen a un directorio temporal."""
+    if os.path.isdir(origen):
+        yield os.path.join(origen, documento)
+        return
+    with tempfile.TemporaryDirectory(prefix="lote_") as directorio:
+        # Con el nombre original, que los procesadores usan como `nombre_archivo`.
+        ruta = os.path.join(directorio, os.path.basename(documento))
+        with zipfile.ZipFile(origen) as comprimido, comprimido.open(documento) as miembro, open(ruta, "wb") as destino:
+            while True:
+                bloque = miembro.read(2**20)
+                if not bloque:
+                    break
+                destino.write(bloque)
+        yield ruta
+
+
+def filas_parquet(documento: str, resultado: Dict[str, Any]) -> Dict[str, list]:
+    """Columnas de las transacciones de un resultado v2, con `COLUMNAS_PARQUET`."""
+    columnas: Dict[str, list] = {nombre: [] for nombre in COLUMNAS_PARQUET}
+    for numero, cuenta in enumerate(resultado["cuentas"]):
+        transacciones = cuenta.get("transacciones") or []
+        columnas["archivo"] += [documento] * len(transacciones)
+        columnas["banco"] += [resultado["banco"]] * len(transacciones)
+        columnas["numero_cuenta"] += [cuenta["numero_cuenta"]] * len(transacciones)
+        columnas["cuenta"] += [numero] * len(transacciones)
+        columnas["fila"] += range(len(transacciones))
+        columnas["fecha"] += [t["fecha"] and date.fromisoformat(t["fecha"]) for t in transacciones]
+        for campo in ("descripcion", "retiro", "deposito", "saldo", "tipo_movimiento", "categoria", "referencia"):
+            columnas[campo] += [t.get(campo) for t in transacciones]
+    return columnas
+
+
+def _iniciar_trabajador() -> None:
+    # Ctrl+C lo atiende el proceso principal, que deja terminar los documentos en curso.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    configurar_registro()
+
+
+def crear_pool(trabajadores: int) -> ProcessPoolExecutor:
+    """Pool de procesos para `analizar_documento_lote`; con 0 trabajadores, uno por CPU."""
+    return ProcessPoolExecutor(
+        trabajadores or os.cpu_count() or 1, mp_context=_CONTEXTO, initializer=_iniciar_trabajador
+    )
+
+
+def analizar_documento_lote(
+    origen: str,
+    documento: str,
+    plazo_s: Optional[float] = None,
+    con_filas: bool = False,
+    huella: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Analiza un documento del lote (se ejecuta en un proceso del pool) y devuelve su línea de
+    NDJSON ya serializada, sus filas de Parquet si `con_filas` y lo necesario para el progreso.
+    Los errores del análisis quedan en la línea, no se propagan.
+
+    Con `huella` (el hash del contenido) la línea la incluye y el documento se anota en el punto
+    de control por su huella en lugar de por su nombre (ver app/services/vigilancia.py).
+    """
+    inicio = time.perf_counter()
+    cronometro = CronometroEtapas(monitor=memoria.MonitorMemoria())
+    estado, detalle, resultado, filas, transacciones = "ok", None, None, None, 0
+    try:
+        with _ruta_local(origen, documento) as ruta, cronometro.monitor:
+            datos = aislamiento.analizar_con_plazo(ruta, cronometro, plazo_s)
+        transacciones = analizador.contar_transacciones(datos)
+        resultado = esquema_v2.convertir_a_v2(datos)
+        if con_filas:
+            filas = filas_parquet(documento, resultado)
+    except analizador.ErrorAnalisis as e:
+        estado, detalle = e.resultado, e.detalle
+    except memoria.PresupuestoMemoriaExcedido as e:
+        estado, detalle = "memoria", str(e)
+    except Exception as e:
+        estado, detalle = "error", f"{type(e).__name__}: {e}"
+
+    linea = {"archivo": documento}
+    if huella:
+        linea["sha256"] = huella
+    linea.update({
+        "estado": estado,
+        "banco": cronometro.banco,
+        "tipo_cuenta": cronometro.tipo_cuenta,
+        "duracion_s": round(time.perf_counter() - inicio, 3),
+    })
+    if resultado is not None:
+        linea["resultado"] = resultado
+    else:
+        linea["detalle"] = detalle
+    return {
+        "archivo": documento,
+        "clave": huella or documento,
+        "estado": estado,
+        "transacciones": transacciones,
+        "linea": serializar(linea) + b"\n",
+        "filas": filas,
+    }
+
+
+class PuntoControl:
+    """Bloques confirmados de una conversión: documentos terminados, tamaño del NDJSON y partes Parquet."""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self.terminados: Set[str] = set()
+        self.bytes_resultados = 0
+        self.partes: List[str] = []
+        if not os.path.exists(ruta):
+            return
+        valido = 0
+        with open(ruta, "rb") as archivo:
+            for linea in archivo:
+                try:
+                    bloque = orjson.loads(linea) if linea.endswith(b"\n") else None
+                except orjson.JSONDecodeError:
+                    bloque = None
+                if bloque is None:
+                    # Línea incompleta de un corte a mitad de escritura: el bloque no se confirmó.
+                    break
+                self.terminados.update(bloque["documentos"])
+                self.bytes_resultados = bloque["bytes_resultados"]
+                if bloque["parte"]:
+                    self.partes.append(bloque["parte"])
+                valido += len(linea)
+        if valido < os.path.getsize(ruta):
+            os.truncate(ruta, valido)
+
+    def anotar(self, documentos: List[str], bytes_resultados: int, parte: Optional[str]) -> None:
+        bloque = {"documentos": documentos, "bytes_resultados": bytes_resultados, "parte": parte}
+        with open(self.ruta, "ab") as archivo:
+            archivo.write(orjson.dumps(bloque) + b"\n")
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        self.terminados.update(documentos)
+        self.bytes_resultados = bytes_resultados
+        if parte:
+            self.partes.append(parte)
+
+
+class SalidaLote:
+    """El NDJSON, las partes Parquet y el punto de control de una conversión (ver el comentario del módulo)."""
+
+    def __init__(self, directorio: str, parquet: bool = False):
+        if parquet and pyarrow is None:
+            raise RuntimeError("Para escribir Parquet se necesita pyarrow (pip install pyarrow).")
+        os.makedirs(directorio, exist_ok=True)
+        self.directorio = directorio
+        self.parquet = parquet
+        self.punto_control = PuntoControl(os.path.join(directorio, ARCHIVO_PUNTO_CONTROL))
+
+        ruta_resultados = os.path.join(directorio, ARCHIVO_RESULTADOS)
+        self._resultados = open(ruta_resultados, "ab")
+        tamano = self._resultados.seek(0, os.SEEK_END)
+        if tamano < self.punto_control.bytes_resultados:
+            self._resultados.close()
+            raise ValueError(f"{ruta_resultados} es más corto que lo anotado en el punto de control.")
+        # Lo escrito después del último bloque anotado es de un bloque que no se confirmó.
+        self._resultados.truncate(self.punto_control.bytes_resultados)
+
+        self._directorio_partes = os.path.join(directorio, DIRECTORIO_PARTES)
+        if os.path.isdir(self._directorio_partes):
+            for nombre in os.listdir(self._directorio_partes):
+                if nombre not in self.punto_control.partes:
+                    os.remove(os.path.join(self._directorio_partes, nombre))
+        elif parquet:
+            os.makedirs(self._directorio_partes)
+
+    def confirmar(self, resultados: List[Dict[str, Any]]) -> None:
+        """Escribe un bloque de resultados de `analizar_documento_lote` y lo anota en el punto de control."""
+        if not resultados:
+            return
+        for resultado in resultados:
+            self._resultados.write(resultado["linea"])
+        self._resultados.flush()
+        os.fsync(self._resultados.fileno())
+        parte = self._escribir_parte([resultado["filas"] for resultado in resultados if resultado["filas"]])
+        self.punto_control.anotar([resultado["clave"] for resultado in resultados], self._resultados.tell(), parte)
+
+    def _escribir_parte(self, filas: List[Dict[str, list]]) -> Optional[str]:
+        if not self.parquet or not any(columnas["archivo"] for columnas in filas):
+            return None
+        columnas = {nombre: [valor for bloque in filas for valor in bloque[nombre]] for nombre in COLUMNAS_PARQUET}
+        nombre = f"parte-{len(self.punto_control.partes) + 1:05d}.parquet"
+        ruta = os.path.join(self._directorio_partes, nombre)
+        pyarrow.parquet.write_table(
+            pyarrow.Table.from_pydict(columnas, schema=esquema_parquet()), ruta + ".tmp", compression="zstd"
+        )
+        with open(ruta + ".tmp", "rb") as archivo:
+            os.fsync(archivo.fileno())
+        os.replace(ruta + ".tmp", ruta)
+        return nombre
+
+    def cerrar(self) -> None:
+        self._resultados.close()
+
+
+class Progreso:
+    """Avance de una conversión, para reportar y para el resumen final."""
+
+    def __init__(self, total: int, previos: int):
+        self.total = total
+        self.previos = previos
+        self.terminados = 0
+        self.transacciones = 0
+        self.por_estado: Counter = Counter()
+        self.inicio = time.monotonic()
+
+    def registrar(self, resultado: Dict[str, Any]) -> None:
+        self.terminados += 1
+        self.transacciones += resultado["transacciones"]
+        self.por_estado[resultado["estado"]] += 1
+
+    @property
+    def transcurrido_s(self) -> float:
+        return time.monotonic() - self.inicio
+
+    @property
+    def documentos_por_s(self) -> float:
+        return self.terminados / max(self.transcurrido_s, 1e-9)
+
+    @property
+    def transacciones_por_s(self) -> float:
+        return self.transacciones / max(self.transcurrido_s, 1e-9)
+
+    @property
+    def restante_s(self) -> Optional[float]:
+        if not self.terminados:
+            return None
+        return (self.total - self.terminados) / self.documentos_por_s
+
+
+def convertir_lote(
+    origen: str,
+    directorio_salida: str,
+    trabajadores: int = LOTE_TRABAJADORES,
+    plazo_s: Optional[float] = None,
+    parquet: bool = False,
+    documentos_por_bloque: int = LOTE_DOCUMENTOS_POR_BLOQUE,
+    confirmacion_s: float = LOTE_CONFIRMACION_S,
+    al_progresar: Optional[Callable[[Progreso], None]] = None,
+    intervalo_progreso_s: float = 5.0,
+) -> Progreso:
+    """
+    Convierte los PDFs de `origen` (directorio o ZIP) que no estén ya en el punto de control de
+    `directorio_salida`. `al_progresar` se llama cada `intervalo_progreso_s` y al terminar.
+    Con `trabajadores` 0 se usa un proceso por CPU; `plazo_s` es el de cada documento (ver
+    aislamiento.analizar_con_plazo).
+    """
+    salida = SalidaLote(directorio_salida, parquet)
+    documentos = buscar_documentos(origen)
+    pendientes = [documento for documento in documentos if documento not in salida.punto_control.terminados]
+    progreso = Progreso(total=len(pendientes), previos=len(documentos) - len(pendientes))
+    por_enviar = iter(pendientes)
+    trabajadores = trabajadores or os.cpu_count() or 1
+    pool = crear_pool(trabajadores)
+    en_curso: Set[Future] = set()
+    bloque: List[Dict[str, Any]] = []
+    ultima_confirmacion = ultimo_reporte = time.monotonic()
+    try:
+        while True:
+            # Dos documentos por trabajador en vuelo: ninguno espera y no se encola todo el lote.
+            while len(en_curso) < 2 * trabajadores:
+                documento = next(por_enviar, None)
+                if documento is None:
+                    break
+                en_curso.add(pool.submit(analizar_documento_lote, origen, documento, plazo_s, parquet))
+            if not en_curso:
+                break
+            listos, en_curso = wait(en_curso, timeout=min(intervalo_progreso_s, confirmacion_s), return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                resultado = futuro.result()
+                bloque.append(resultado)
+                progreso.registrar(resultado)
+
+            ahora = time.monotonic()
+            if len(bloque) >= documentos_por_bloque or (bloque and ahora - ultima_confirmacion >= confirmacion_s):
+                salida.confirmar(bloque)
+                bloque, ultima_confirmacion = [], ahora
+            if al_progresar and ahora - ultimo_reporte >= intervalo_progreso_s:
+                al_progresar(progreso)
+                ultimo_reporte = ahora
+    finally:
+        # Lo que ya terminó se confirma aunque la conversión se interrumpa.
+        pool.shutdown(cancel_futures=True)
+        salida.confirmar(bloque)
+        salida.cerrar()
+    if al_progresar:
+        al_progresar(progreso)
+    return progreso
@@ -0,0 +1,121 @@
+# app/services/memoria.py
+import os
+import sys
+import threading
+import tracemalloc
+from typing import Optional
+
+from app.core.config import MEMORIA_INTERVALO_S, MEMORIA_PRESUPUESTO_MB, MEMORIA_TRACEMALLOC
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Medición del pico de memoria de cada análisis y presupuesto por petición.
+# Los objetos de layout de pdfminer de un estado de cuenta largo pueden ocupar cientos de MB;
+# con varios análisis a la vez un worker puede morir por falta de memoria. Mientras dura el
+# análisis se muestrea el RSS del proceso en un hilo aparte y, si el crecimiento supera el
+# presupuesto, el análisis se aborta en el siguiente punto de control (fin de cada etapa y
+# cada página de la extracción) antes de que el sistema mate al proceso.
+#
+# El RSS es del proceso completo: con análisis concurrentes en el mismo worker, el pico de
+# uno incluye lo que crecieron los demás. Es una cota conservadora, que es lo que se busca.
+
+_TAMANO_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+if MEMORIA_TRACEMALLOC and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+def rss_actual() -> int:
+    """Memoria residente del proceso en bytes."""
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * _TAMANO_PAGINA
+    except (OSError, IndexError, ValueError):
+        # Sin /proc (macOS) solo se conoce el máximo histórico del proceso; en Windows, nada.
+        if resource is None:
+            return 0
+        maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maximo if sys.platform == "darwin" else maximo * 1024
+
+
+class PresupuestoMemoriaExcedido(Exception):
+    def __init__(self, pico_bytes: int, presupuesto_bytes: int):
+        super().__init__(
+            f"El análisis usó {pico_bytes // 2**20} MB y el presupuesto es de {presupuesto_bytes // 2**20} MB."
+        )
+        self.pico_bytes = pico_bytes
+        self.presupuesto_bytes = presupuesto_bytes
+
+    def __reduce__(self):
+        return type(self), (self.pico_bytes, self.presupuesto_bytes)
+
+
+class MonitorMemoria:
+    """
+    Mide el crecimiento máximo del RSS (y opcionalmente el pico de tracemalloc) mientras
+    dura el bloque `with`. `verificar()` lanza `PresupuestoMemoriaExcedido` si se superó
+    el presupuesto; fuera del bloque no hace nada (antes de entrar no hay base contra la cual
+    medir el crecimiento).
+    """
+
+    def __init__(self, presupuesto_mb: int = MEMORIA_PRESUPUESTO_MB, intervalo_s: float = MEMORIA_INTERVALO_S):
+        self.presupuesto_bytes = presupuesto_mb * 2**20
+        self.intervalo_s = intervalo_s
+        self.base = 0
+        self.pico = 0
+        self.pico_python: Optional[int] = None
+        self.excedido = False
+        self._activo = False
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    @property
+    def pico_bytes(self) -> int:
+        """Crecimiento máximo del RSS sobre el valor al iniciar."""
+        return max(0, self.pico - self.base)
+
+    def _actualizar(self) -> None:
+        rss = rss_actual()
+        if rss > self.pico:
+            self.pico = rss
+        if self.presupuesto_bytes and self.pico_bytes > self.presupuesto_bytes:
+            self.excedido = True
+
+    def _muestrear(self) -> None:
+        while not self._detener.wait(self.intervalo_s):
+            self._actualizar()
+
+    def incluir_pico(self, pico_bytes: int) -> None:
+        """Incluye el crecimiento medido en otro proceso (el hijo que hizo el análisis)."""
+        self.pico = max(self.pico, self.base + pico_bytes)
+
+    def verificar(self) -> None:
+        """Punto de control: aborta el análisis si ya se superó el presupuesto."""
+        if not self._activo:
+            return
+        self._actualizar()
+        if self.excedido:
+            raise PresupuestoMemoriaExcedido(self.pico_bytes, self.presupuesto_bytes)
+
+    def __enter__(self) -> "MonitorMemoria":
+        self.base = self.pico = rss_actual()
+        self.excedido = False
+        self._detener.clear()
+        self._activo = True
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self._hilo = threading.Thread(target=self._muestrear, name="monitor-memoria", daemon=True)
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._activo = False
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+        self._actualizar()
+        if tracemalloc.is_tracing():
+            self.pico_python = tracemalloc.get_traced_memory()[1]
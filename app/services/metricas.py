@@ -0,0 +1,273 @@
+# app/services/metricas.py
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Métricas del servicio en formato de texto de Prometheus, sin dependencias externas.
+# Cada proceso (worker) lleva sus propios valores en memoria; se exponen en GET /metrics.
+
+# Límites de los histogramas de duración, en segundos.
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Límites de los histogramas de memoria, en bytes (1 MB a 2 GB).
+BUCKETS_BYTES = tuple(2**20 * mb for mb in (1, 4, 16, 32, 64, 128, 256, 512, 1024, 2048))
+
+REGISTRO: List["_Metrica"] = []
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatear_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+class _Metrica(ABC):
+    """Base de las métricas: nombre, ayuda y valores por combinación de etiquetas."""
+    tipo = ""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        REGISTRO.append(self)
+
+    def _clave(self, etiquetas: Dict[str, object]) -> Tuple[str, ...]:
+        desconocidas = set(etiquetas) - set(self.etiquetas)
+        if desconocidas:
+            raise ValueError(f"Etiquetas desconocidas para {self.nombre}: {sorted(desconocidas)}")
+        return tuple(str(etiquetas.get(nombre, "")) for nombre in self.etiquetas)
+
+    def _etiquetas_texto(self, clave: Tuple[str, ...], extra: str = "") -> str:
+        partes = [f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(self.etiquetas, clave)]
+        if extra:
+            partes.append(extra)
+        return "{" + ",".join(partes) + "}" if partes else ""
+
+    @abstractmethod
+    def _lineas(self) -> List[str]:
+        ...
+
+    @abstractmethod
+    def _sumar(self, clave: Tuple[str, ...], valor: object) -> None:
+        ...
+
+    def exponer(self) -> str:
+        with self._lock:
+            lineas = self._lineas()
+        encabezado = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+        return "\n".join(encabezado + lineas)
+
+
+class Contador(_Metrica):
+    """Valor que solo aumenta (peticiones, páginas, fallos...)."""
+    tipo = "counter"
+
+    def inc(self, cantidad: float = 1, **etiquetas: object) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + cantidad
+
+    def valor(self, **etiquetas: object) -> float:
+        return self._valores.get(self._clave(etiquetas), 0)
+
+    def _sumar(self, clave: Tuple[str, ...], valor: float) -> None:
+        self._valores[clave] = self._valores.get(clave, 0) + valor
+
+    def _lineas(self) -> List[str]:
+        return [
+            f"{self.nombre}{self._etiquetas_texto(clave)} {_formatear_numero(valor)}"
+            for clave, valor in sorted(self._valores.items())
+        ]
+
+
+class Medidor(Contador):
+    """Valor que sube y baja (trabajo en curso)."""
+    tipo = "gauge"
+
+    def dec(self, cantidad: float = 1, **etiquetas: object) -> None:
+        self.inc(-cantidad, **etiquetas)
+
+    @contextmanager
+    def rastrear(self, **etiquetas: object) -> Iterator[None]:
+        """Incrementa el medidor mientras dura el bloque."""
+        self.inc(1, **etiquetas)
+        try:
+            yield
+        finally:
+            self.dec(1, **etiquetas)
+
+
+class Histograma(_Metrica):
+    """Distribución de valores observados (duraciones) en buckets acumulativos."""
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                 buckets: Sequence[float] = BUCKETS_SEGUNDOS):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observar(self, valor: float, **etiquetas: object) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            conteos, suma = self._valores.get(clave, ([0] * len(self.buckets), 0.0))
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    conteos[i] += 1
+            self._valores[clave] = (conteos, suma + valor)
+
+    def _sumar(self, clave: Tuple[str, ...], valor: Tuple[List[int], float]) -> None:
+        conteos, suma = self._valores.get(clave, ([0] * len(self.buckets), 0.0))
+        self._valores[clave] = ([a + b for a, b in zip(conteos, valor[0])], suma + valor[1])
+
+    def _lineas(self) -> List[str]:
+        lineas = []
+        for clave, (conteos, suma) in sorted(self._valores.items()):
+            for limite, conteo in zip(self.buckets, conteos):
+                le = f'le="{_formatear_numero(limite)}"'
+                lineas.append(f"{self.nombre}_bucket{self._etiquetas_texto(clave, le)} {conteo}")
+            lineas.append(f"{self.nombre}_sum{self._etiquetas_texto(clave)} {_formatear_numero(suma)}")
+            lineas.append(f"{self.nombre}_count{self._etiquetas_texto(clave)} {conteos[-1]}")
+        return lineas
+
+
+def exponer() -> str:
+    """Todas las métricas registradas en el formato de texto de Prometheus (versión 0.0.4)."""
+    return "\n".join(metrica.exponer() for metrica in REGISTRO) + "\n"
+
+
+# Un análisis que corre en un proceso hijo (app/services/aislamiento.py) acumula sus métricas
+# allí: el hijo empieza de cero con `reiniciar()` y al terminar envía su `instantanea()`, que el
+# proceso de la API suma a las suyas con `fusionar()`.
+def reiniciar() -> None:
+    for metrica in REGISTRO:
+        with metrica._lock:
+            metrica._valores.clear()
+
+
+def instantanea() -> Dict[str, Dict[Tuple[str, ...], object]]:
+    return {metrica.nombre: dict(metrica._valores) for metrica in REGISTRO if metrica._valores}
+
+
+def fusionar(valores: Dict[str, Dict[Tuple[str, ...], object]]) -> None:
+    por_nombre = {metrica.nombre: metrica for metrica in REGISTRO}
+    for nombre, valores_metrica in valores.items():
+        metrica = por_nombre.get(nombre)
+        if metrica is None:
+            continue
+        with metrica._lock:
+            for clave, valor in valores_metrica.items():
+                metrica._sumar(clave, valor)
+
+
+# --- Métricas del análisis de estados de cuenta ---
+DURACION_ETAPA = Histograma(
+    "whobank_etapa_duracion_segundos",
+    "Duración de cada etapa del análisis de un estado de cuenta.",
+    ("etapa", "banco", "tipo_cuenta"),
+)
+ANALISIS = Contador(
+    "whobank_analisis_total",
+    "Análisis de estados de cuenta por resultado (ok, no_soportado, ilegible, memoria, plazo, error).",
+    ("banco", "tipo_cuenta", "resultado"),
+)
+PAGINAS = Contador("whobank_paginas_total", "Páginas de PDF leídas.", ("banco",))
+PAGINAS_CLASIFICADAS = Contador(
+    "whobank_paginas_clasificadas_total",
+    "Páginas por clase en la clasificación previa (resumen, movimientos, relleno); el relleno no se extrae.",
+    ("banco", "clase"),
+)
+TRANSACCIONES = Contador(
+    "whobank_transacciones_total",
+    "Transacciones extraídas de los estados de cuenta.",
+    ("banco", "tipo_cuenta"),
+)
+CONCILIACION = Contador(
+    "whobank_conciliacion_total",
+    "Cuentas conciliadas por resultado (cuadra, descuadra, sin_datos); ver app/services/conciliacion.py.",
+    ("banco", "resultado"),
+)
+FILAS_DESCUADRADAS = Contador(
+    "whobank_filas_descuadradas_total",
+    "Filas cuyo saldo no sigue de la fila anterior en la conciliación.",
+    ("banco",),
+)
+ESTRATEGIAS = Contador(
+    "whobank_estrategias_total",
+    "Intentos de cada estrategia de extracción por resultado (cuadra, descuadra, no_aplica).",
+    ("banco", "estrategia", "resultado"),
+)
+CACHE = Contador(
+    "whobank_cache_consultas_total",
+    "Consultas a caches internos por resultado (acierto, fallo).",
+    ("cache", "resultado"),
+)
+MEMORIA_PICO = Histograma(
+    "whobank_memoria_pico_bytes",
+    "Pico de memoria de cada análisis: crecimiento del RSS (fuente=rss) o pico de tracemalloc (fuente=tracemalloc).",
+    ("banco", "tipo_cuenta", "fuente"),
+    buckets=BUCKETS_BYTES,
+)
+EN_CURSO = Medidor("whobank_analisis_en_curso", "Análisis que se están procesando en este momento.")
+ADMISION = Contador(
+    "whobank_admision_total",
+    "Decisiones del control de admisión por carril (admitido, cola_llena, espera_agotada).",
+    ("carril", "resultado"),
+)
+ADMISION_ESPERA = Histograma(
+    "whobank_admision_espera_segundos",
+    "Tiempo que esperó turno cada documento admitido.",
+    ("carril",),
+)
+ADMISION_COLA = Medidor("whobank_admision_cola", "Documentos esperando turno en cada carril.", ("carril",))
+
+DESCONOCIDO = "desconocido"
+
+
+class CronometroEtapas:
+    """
+    Mide las etapas de un análisis. El banco y el tipo de cuenta solo se conocen después de
+    identificar el documento, así que las duraciones se acumulan y se registran al final.
+
+    Si tiene un `monitor` de memoria (app/services/memoria.py), al terminar cada etapa se
+    verifica el presupuesto y al final se registra el pico junto con las duraciones.
+    """
+
+    def __init__(self, monitor: Optional[Any] = None):
+        self.banco = DESCONOCIDO
+        self.tipo_cuenta = DESCONOCIDO
+        self.duraciones: Dict[str, float] = {}
+        self.monitor = monitor
+        self._inicio = time.perf_counter()
+
+    @contextmanager
+    def etapa(self, nombre: str) -> Iterator[None]:
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.duraciones[nombre] = self.duraciones.get(nombre, 0.0) + time.perf_counter() - inicio
+        self.punto_control()
+
+    def punto_control(self) -> None:
+        """Lanza `PresupuestoMemoriaExcedido` si el análisis ya superó su presupuesto de memoria."""
+        if self.monitor is not None:
+            self.monitor.verificar()
+
+    def registrar(self, resultado: str) -> None:
+        """Registra las duraciones acumuladas y el resultado del análisis."""
+        etiquetas = {"banco": self.banco, "tipo_cuenta": self.tipo_cuenta}
+        for etapa, duracion in self.duraciones.items():
+            DURACION_ETAPA.observar(duracion, etapa=etapa, **etiquetas)
+        DURACION_ETAPA.observar(time.perf_counter() - self._inicio, etapa="total", **etiquetas)
+        ANALISIS.inc(resultado=resultado, **etiquetas)
+        if self.monitor is not None:
+            MEMORIA_PICO.observar(self.monitor.pico_bytes, fuente="rss", **etiquetas)
+            if self.monitor.pico_python is not None:
+                MEMORIA_PICO.observar(self.monitor.pico_python, fuente="tracemalloc", **etiquetas)
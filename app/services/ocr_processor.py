@@ -1,10 +1,13 @@
 # app/services/ocr_processor.py
 # app/services/ocr_processor.py
 
+import logging
 import pytesseract
 from pdf2image import convert_from_path
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
 def extraer_texto_con_ocr(ruta_pdf: str) -> Optional[str]:
     """
     Usa OCR para extraer texto de un PDF basado en imágenes.
@@ -25,5 +28,5 @@ def extraer_texto_con_ocr(ruta_pdf: str) -> Optional[str]:
             
         return texto_completo
     except Exception as e:
-        print(f"Error durante el procesamiento OCR: {e}")
+        logger.exception("Error durante el procesamiento OCR")
         return None
\ No newline at end of file
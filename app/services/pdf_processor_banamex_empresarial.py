@@ -1,6 +1,7 @@
-import pdfplumber
 import re
 from typing import List, Dict, Optional
+from app.services import clasificacion, extraccion
+from app.services.tabla_transacciones import TablaTransacciones
 
 # --- NUEVA FUNCIÓN: Extraer info de la cuenta ---
 def extraer_info_cuenta_empresarial(texto_pagina_uno: str) -> Dict:
@@ -109,8 +110,8 @@ def categorizar_transaccion_empresarial(descripcion: str) -> str:
         return "Depósito en Efectivo"
     return "Operación Bancaria"
 
-# --- Procesar bloque de concepto individual (Sin cambios) ---
-def procesar_bloque_concepto_empresarial(fecha: str, concepto_lineas: List[str]) -> Optional[Dict]:
+# --- Procesar bloque de concepto individual y agregarlo a la tabla ---
+def procesar_bloque_concepto_empresarial(fecha: str, concepto_lineas: List[str], tabla: TablaTransacciones) -> bool:
     texto_completo = " ".join(concepto_lineas).replace('-\n', '').strip()
     numeros = re.findall(r'[\d,]+\.\d{2}', texto_completo)
     descripcion = re.sub(r'(\s+[\d,]+\.\d{2}\s*)+$', '', texto_completo).strip()
@@ -127,43 +128,45 @@ def procesar_bloque_concepto_empresarial(fecha: str, concepto_lineas: List[str])
     elif "TRASPASO REF" in texto_completo.upper(): tipo_movimiento, retiro = "gasto", monto_transaccion
     elif "PAGO RECIBIDO" in texto_completo.upper() or "DEPOSITO EFECTIVO" in texto_completo.upper(): tipo_movimiento, deposito = "ingreso", monto_transaccion
     else: tipo_movimiento = "informativo"
-    if monto_transaccion == 0.0 and "SALDO ANTERIOR" not in desc_upper: return None
-    return {"fecha": fecha, "descripcion": descripcion, "retiro": retiro, "deposito": deposito, "saldo": saldo, "tipo_movimiento": tipo_movimiento, "categoria": "Informativo" if tipo_movimiento == "informativo" else categorizar_transaccion_empresarial(descripcion)}
+    if monto_transaccion == 0.0 and "SALDO ANTERIOR" not in desc_upper: return False
+    tabla.agregar(fecha=fecha, descripcion=descripcion, retiro=retiro, deposito=deposito, saldo=saldo, tipo_movimiento=tipo_movimiento, categoria="Informativo" if tipo_movimiento == "informativo" else categorizar_transaccion_empresarial(descripcion))
+    return True
 
-# --- Extraer detalle de operaciones (Sin cambios) ---
-def extraer_detalle_operaciones_empresarial(texto_limpio_total: str) -> List[Dict]:
-    transacciones = []
+# --- Extraer detalle de operaciones ---
+def extraer_detalle_operaciones_empresarial(texto_limpio_total: str) -> TablaTransacciones:
+    transacciones = TablaTransacciones()
     patron_inicio_transaccion = re.compile(r"^(\d{2}\s[A-Z]{3})\s+(.*)")
     fecha_actual, concepto_acumulado = None, []
     lines = texto_limpio_total.split('\n')
 
     if lines and "SALDO ANTERIOR" in lines[0]:
         saldo_anterior_line = lines.pop(0)
-        transaccion = procesar_bloque_concepto_empresarial("", [saldo_anterior_line])
-        if transaccion:
-            transaccion['descripcion'] = 'SALDO ANTERIOR'
-            transacciones.append(transaccion)
+        if procesar_bloque_concepto_empresarial("", [saldo_anterior_line], transacciones):
+            transacciones.actualizar(-1, descripcion='SALDO ANTERIOR')
     for linea in lines:
         if not linea.strip(): continue
         match = patron_inicio_transaccion.match(linea)
         if match:
             if fecha_actual and concepto_acumulado:
-                transaccion = procesar_bloque_concepto_empresarial(fecha_actual, concepto_acumulado)
-                if transaccion: transacciones.append(transaccion)
+                procesar_bloque_concepto_empresarial(fecha_actual, concepto_acumulado, transacciones)
             fecha_actual, concepto_acumulado = match.group(1), [match.group(2)]
         elif fecha_actual:
             concepto_acumulado.append(linea.strip())
     if fecha_actual and concepto_acumulado:
-        transaccion = procesar_bloque_concepto_empresarial(fecha_actual, concepto_acumulado)
-        if transaccion: transacciones.append(transaccion)
+        procesar_bloque_concepto_empresarial(fecha_actual, concepto_acumulado, transacciones)
     return transacciones
 
+# Clasificación previa de páginas (ver app/services/clasificacion.py): los datos de la cuenta
+# salen de la primera página y las operaciones solo de las páginas con su detalle.
+PERFIL_PAGINAS = clasificacion.PerfilPaginas("banamex", movimientos=("DETALLE DE OPERACIONES",))
+
 # --- Función Principal (Empresarial) ---
 def procesar_estado_de_cuenta_empresarial(ruta_pdf: str) -> Optional[dict]:
-    with pdfplumber.open(ruta_pdf) as pdf:
-        if not pdf.pages: return None
+    with extraccion.abrir(ruta_pdf, "banamex") as documento:
+        paginas = documento.numero_paginas()
+        if not paginas: return None
 
-        pagina_uno_texto = pdf.pages[0].extract_text(x_tolerance=2, y_tolerance=2) or ""
+        pagina_uno_texto = documento.texto_pagina(0)
         
         # Extracción de datos
         info_cuenta = extraer_info_cuenta_empresarial(pagina_uno_texto)
@@ -172,8 +175,11 @@ def procesar_estado_de_cuenta_empresarial(ruta_pdf: str) -> Optional[dict]:
         fecha_corte = extraer_fecha_corte(pagina_uno_texto)
         
         texto_limpio_operaciones = ""
-        for pagina in pdf.pages:
-            texto_pagina_crudo = pagina.extract_text(x_tolerance=2, y_tolerance=2)
+        etiquetas = clasificacion.clasificar(documento, PERFIL_PAGINAS)
+        for indice in range(paginas):
+            if etiquetas[indice] == clasificacion.RELLENO:
+                continue
+            texto_pagina_crudo = pagina_uno_texto if indice == 0 else documento.texto_pagina(indice)
             if texto_pagina_crudo:
                 texto_limpio_operaciones += limpiar_texto_pagina_operaciones(texto_pagina_crudo) + "\n"
 
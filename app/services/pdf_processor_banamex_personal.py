@@ -1,6 +1,7 @@
-import pdfplumber
 import re
 from typing import List, Dict, Optional
+from app.services import clasificacion, extraccion
+from app.services.tabla_transacciones import TablaTransacciones
 
 # --- NUEVA FUNCIÓN: Extraer info de la cuenta ---
 def extraer_info_cuenta(texto_pagina_uno: str) -> Dict:
@@ -96,8 +97,8 @@ def categorizar_transaccion(descripcion: str) -> str:
 
 PALABRAS_INFORMATIVOS = ["SALDO ANTERIOR", "EXENCION", "EXENTAS", "EXENTAR", "DISPOSICIONES EN CAJERO EXENTAS"]
 
-# --- Procesar bloque de concepto individual (Sin cambios) ---
-def procesar_bloque_concepto(fecha: str, concepto_lineas: List[str]) -> Optional[Dict]:
+# --- Procesar bloque de concepto individual y agregarlo a la tabla ---
+def procesar_bloque_concepto(fecha: str, concepto_lineas: List[str], tabla: TablaTransacciones) -> None:
     texto_completo = " ".join(concepto_lineas).replace('-\n', '').strip()
     numeros = re.findall(r'[\d,]+\.\d{2}', texto_completo)
     retiro, deposito = 0.0, 0.0
@@ -109,11 +110,11 @@ def procesar_bloque_concepto(fecha: str, concepto_lineas: List[str]) -> Optional
     elif "PAGO RECIBIDO" in desc_upper: deposito, tipo_movimiento = (float(numeros[-2].replace(',', '')) if len(numeros) >= 2 else 0.0), "ingreso"
     else: retiro, tipo_movimiento = (float(numeros[-2].replace(',', '')) if len(numeros) >= 2 else 0.0), "gasto"
     if retiro == 0 and deposito == 0 and "SALDO ANTERIOR" not in desc_upper: tipo_movimiento = "informativo"
-    return {"fecha": fecha, "descripcion": descripcion, "retiro": retiro, "deposito": deposito, "saldo": saldo, "tipo_movimiento": tipo_movimiento, "categoria": "Informativo" if tipo_movimiento == "informativo" else categorizar_transaccion(descripcion)}
+    tabla.agregar(fecha=fecha, descripcion=descripcion, retiro=retiro, deposito=deposito, saldo=saldo, tipo_movimiento=tipo_movimiento, categoria="Informativo" if tipo_movimiento == "informativo" else categorizar_transaccion(descripcion))
 
-# --- Extraer detalle de operaciones (Sin cambios) ---
-def extraer_detalle_operaciones(texto_limpio_total: str) -> List[Dict]:
-    transacciones, patron_inicio_transaccion = [], re.compile(r"^(\d{2}\s[A-Z]{3})\s+(.*)")
+# --- Extraer detalle de operaciones ---
+def extraer_detalle_operaciones(texto_limpio_total: str) -> TablaTransacciones:
+    transacciones, patron_inicio_transaccion = TablaTransacciones(), re.compile(r"^(\d{2}\s[A-Z]{3})\s+(.*)")
     fecha_actual, concepto_acumulado = None, []
     
     for linea in texto_limpio_total.split('\n'):
@@ -121,22 +122,25 @@ def extraer_detalle_operaciones(texto_limpio_total: str) -> List[Dict]:
         match = patron_inicio_transaccion.match(linea)
         if match:
             if fecha_actual and concepto_acumulado:
-                transaccion = procesar_bloque_concepto(fecha_actual, concepto_acumulado)
-                if transaccion: transacciones.append(transaccion)
+                procesar_bloque_concepto(fecha_actual, concepto_acumulado, transacciones)
             fecha_actual, concepto_acumulado = match.group(1), [match.group(2)]
         elif fecha_actual:
             concepto_acumulado.append(linea.strip())
     if fecha_actual and concepto_acumulado:
-        transaccion = procesar_bloque_concepto(fecha_actual, concepto_acumulado)
-        if transaccion: transacciones.append(transaccion)
+        procesar_bloque_concepto(fecha_actual, concepto_acumulado, transacciones)
     return transacciones
 
+# Clasificación previa de páginas (ver app/services/clasificacion.py): los datos de la cuenta
+# salen de la primera página y las operaciones solo de las páginas con su detalle.
+PERFIL_PAGINAS = clasificacion.PerfilPaginas("banamex", movimientos=("DETALLE DE OPERACIONES",))
+
 # --- Función principal ---
 def procesar_estado_de_cuenta(ruta_pdf: str) -> Optional[dict]:
-    with pdfplumber.open(ruta_pdf) as pdf:
-        if not pdf.pages: return None
+    with extraccion.abrir(ruta_pdf, "banamex") as documento:
+        paginas = documento.numero_paginas()
+        if not paginas: return None
 
-        pagina_uno_texto = pdf.pages[0].extract_text(x_tolerance=2, y_tolerance=2) or ""
+        pagina_uno_texto = documento.texto_pagina(0)
         
         # Extracción de datos
         info_cuenta = extraer_info_cuenta(pagina_uno_texto)
@@ -145,8 +149,11 @@ def procesar_estado_de_cuenta(ruta_pdf: str) -> Optional[dict]:
         fecha_corte = extraer_fecha_corte(pagina_uno_texto)
 
         texto_limpio_operaciones = ""
-        for pagina in pdf.pages:
-            texto_pagina_crudo = pagina.extract_text(x_tolerance=2, y_tolerance=2)
+        etiquetas = clasificacion.clasificar(documento, PERFIL_PAGINAS)
+        for indice in range(paginas):
+            if etiquetas[indice] == clasificacion.RELLENO:
+                continue
+            texto_pagina_crudo = pagina_uno_texto if indice == 0 else documento.texto_pagina(indice)
             if texto_pagina_crudo:
                 texto_limpio_operaciones += limpiar_texto_pagina_operaciones(texto_pagina_crudo) + "\n"
 
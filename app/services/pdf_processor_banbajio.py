@@ -1,34 +1,31 @@
-import pdfplumber
+import logging
 import re
 from typing import List, Dict, Optional
+from app.core.registro import FILA
+from app.services import clasificacion, extraccion
+from app.services.bloques import MONTO, extraer_bloque
+from app.services.tabla_transacciones import TablaTransacciones
+
+logger = logging.getLogger(__name__)
 
 # --- SECCIÓN 1: EXTRACCIÓN DE RESÚMENES (Sin cambios, ya funciona) ---
-def extraer_resumen_cuenta_pesos(texto_seccion: str) -> Dict:
-    """
-    Extrae los datos del resumen para la cuenta en pesos utilizando un patrón de bloque
-    que captura los cuatro valores principales de forma contextual.
-    """
-    # Patrón de bloque que busca la secuencia de encabezados y luego captura los 4 valores que le siguen.
-    pattern = re.compile(
-        r"SALDO ANTERIOR"
-        r".*?\(\+\)\s*DEPOSITOS"
-        r".*?\(\-\)\s*CARGOS"
-        r".*?SALDO ACTUAL"
-        r".*?\$\s*([\d,]+\.\d{2})"  # Grupo 1: Saldo Anterior
-        r".*?\$\s*([\d,]+\.\d{2})"  # Grupo 2: Depositos
-        r".*?\$\s*([\d,]+\.\d{2})"  # Grupo 3: Cargos
-        r".*?\$\s*([\d,]+\.\d{2})", # Grupo 4: Saldo Actual
-        re.DOTALL
-    )
-    match = pattern.search(texto_seccion)
+# Encabezados del resumen de cada cuenta, seguidos de sus cuatro valores (saldo anterior,
+# depósitos, cargos y saldo actual); se buscan acotados al bloque (ver app/services/bloques.py).
+ENCABEZADOS_RESUMEN = [
+    re.compile(r"SALDO ANTERIOR"),
+    re.compile(r"\(\+\)\s*DEPOSITOS"),
+    re.compile(r"\(\-\)\s*CARGOS"),
+    re.compile(r"SALDO ACTUAL"),
+]
+PATRONES_RESUMEN_PESOS = ENCABEZADOS_RESUMEN + [re.compile(r"\$\s*" + MONTO)] * 4
+PATRONES_RESUMEN_DOLARES = ENCABEZADOS_RESUMEN + [re.compile(MONTO + r"\s*USD")] * 4
 
-    if match:
-        saldo_anterior = float(match.group(1).replace(',', ''))
-        total_depositos = float(match.group(2).replace(',', ''))
-        total_cargos = float(match.group(3).replace(',', ''))
-        saldo_actual = float(match.group(4).replace(',', ''))
+def _resumen_cuenta(texto_seccion: str, patrones: List[re.Pattern]) -> Dict:
+    valores = extraer_bloque(texto_seccion, patrones)
+    if valores:
+        saldo_anterior, total_depositos, total_cargos, saldo_actual = (float(v.replace(',', '')) for v in valores)
     else:
-        # Si el patrón de bloque falla, devolvemos ceros para asegurar que no haya datos erróneos.
+        # Si el bloque no se encuentra completo, devolvemos ceros para asegurar que no haya datos erróneos.
         saldo_anterior = 0.0
         total_depositos = 0.0
         total_cargos = 0.0
@@ -41,42 +38,19 @@ def extraer_resumen_cuenta_pesos(texto_seccion: str) -> Dict:
         "saldo_actual": saldo_actual
     }
 
-def extraer_resumen_cuenta_dolares(texto_seccion: str) -> Dict:
+def extraer_resumen_cuenta_pesos(texto_seccion: str) -> Dict:
     """
-    Extrae los datos del resumen para la cuenta en dólares utilizando un patrón de bloque
-    que busca la etiqueta 'USD'.
+    Extrae los datos del resumen para la cuenta en pesos: la secuencia de encabezados
+    y los cuatro valores en pesos que le siguen, dentro del mismo bloque.
     """
-    # Patrón análogo para la cuenta en dólares.
-    pattern = re.compile(
-        r"SALDO ANTERIOR"
-        r".*?\(\+\)\s*DEPOSITOS"
-        r".*?\(\-\)\s*CARGOS"
-        r".*?SALDO ACTUAL"
-        r".*?\s*([\d,]+\.\d{2})\s*USD"  # Grupo 1: Saldo Anterior
-        r".*?\s*([\d,]+\.\d{2})\s*USD"  # Grupo 2: Depositos
-        r".*?\s*([\d,]+\.\d{2})\s*USD"  # Grupo 3: Cargos
-        r".*?\s*([\d,]+\.\d{2})\s*USD", # Grupo 4: Saldo Actual
-        re.DOTALL
-    )
-    match = pattern.search(texto_seccion)
-
-    if match:
-        saldo_anterior = float(match.group(1).replace(',', ''))
-        total_depositos = float(match.group(2).replace(',', ''))
-        total_cargos = float(match.group(3).replace(',', ''))
-        saldo_actual = float(match.group(4).replace(',', ''))
-    else:
-        saldo_anterior = 0.0
-        total_depositos = 0.0
-        total_cargos = 0.0
-        saldo_actual = 0.0
+    return _resumen_cuenta(texto_seccion, PATRONES_RESUMEN_PESOS)
 
-    return {
-        "saldo_anterior": saldo_anterior,
-        "total_depositos": total_depositos,
-        "total_cargos": total_cargos,
-        "saldo_actual": saldo_actual
-    }
+def extraer_resumen_cuenta_dolares(texto_seccion: str) -> Dict:
+    """
+    Extrae los datos del resumen para la cuenta en dólares: los mismos encabezados,
+    con los valores marcados con 'USD'.
+    """
+    return _resumen_cuenta(texto_seccion, PATRONES_RESUMEN_DOLARES)
 
 def categorizar_transaccion_banbajio(descripcion: str) -> str:
     """
@@ -118,13 +92,13 @@ def es_movimiento_retiro(descripcion: str) -> bool:
             return True
     return False
 
-def extraer_transacciones(texto_cuenta: str, moneda: str, fecha_inicio_periodo: Optional[str]) -> List[Dict]:
+def extraer_transacciones(texto_cuenta: str, moneda: str, fecha_inicio_periodo: Optional[str]) -> TablaTransacciones:
     """
     Función genérica para extraer transacciones de una sección de cuenta.
     Versión corregida que maneja mejor la estructura de las transacciones.
     Incluye el SALDO INICIAL como primera transacción, usando la fecha de inicio del periodo.
     """
-    transacciones = []
+    transacciones = TablaTransacciones()
     
     # Buscar el inicio de las transacciones y el saldo inicial
     inicio_transacciones = texto_cuenta.find("SALDO INICIAL")
@@ -141,15 +115,13 @@ def extraer_transacciones(texto_cuenta: str, moneda: str, fecha_inicio_periodo:
         fecha_para_saldo = fecha_inicio_periodo if fecha_inicio_periodo else "SALDO INICIAL"
         
         # Agregar el saldo inicial como primera transacción con la fecha correcta
-        transacciones.append({
-            "fecha": "", # Se utiliza la fecha del periodo
-            "descripcion": "Saldo inicial de la cuenta",
-            "retiro": 0.0,
-            "deposito": 0.0,
-            "saldo": saldo_inicial,
-            "tipo_movimiento": "saldo_inicial",
-            "categoria": "Saldo Inicial"
-        })
+        transacciones.agregar(
+            fecha="", # Se utiliza la fecha del periodo
+            descripcion="Saldo inicial de la cuenta",
+            saldo=saldo_inicial,
+            tipo_movimiento="saldo_inicial",
+            categoria="Saldo Inicial"
+        )
     
     texto_transacciones = texto_cuenta[inicio_transacciones:]
     
@@ -177,9 +149,7 @@ def extraer_transacciones(texto_cuenta: str, moneda: str, fecha_inicio_periodo:
             # Construir la transacción completa
             transaccion_completa = construir_transaccion_completa(lineas, i, moneda)
             if transaccion_completa:
-                transaccion_procesada = procesar_transaccion_mejorada(fecha, transaccion_completa, moneda)
-                if transaccion_procesada:
-                    transacciones.append(transaccion_procesada)
+                procesar_transaccion_mejorada(fecha, transaccion_completa, moneda, transacciones)
             
             # Avanzar hasta la siguiente fecha o final
             i = encontrar_siguiente_transaccion(lineas, i + 1)
@@ -188,6 +158,10 @@ def extraer_transacciones(texto_cuenta: str, moneda: str, fecha_inicio_periodo:
     
     return transacciones
 
+# Pie de página ("PAGINA 3"). Las páginas se unen sin salto de línea, así que el pie puede quedar
+# pegado al encabezado de la página siguiente.
+PIE_PAGINA = re.compile(r'^PAGINA\s+\d+', re.IGNORECASE)
+
 def construir_transaccion_completa(lineas: List[str], inicio: int, moneda: str) -> Optional[str]:
     """
     Construye la transacción completa desde la línea inicial hasta encontrar
@@ -203,11 +177,11 @@ def construir_transaccion_completa(lineas: List[str], inicio: int, moneda: str)
         if i > inicio and re.match(r'^\d{1,2}\s+[A-Z]{3}', linea):
             break
         
-        # Si encontramos indicadores de fin de sección, paramos
+        # Si encontramos indicadores de fin de sección o el pie de página, paramos
         if any(indicador in linea.upper() for indicador in [
             "SALDO TOTAL", "TOTAL DE MOVIMIENTOS", "RESUMEN DE", 
             "DETALLE DE LA CUENTA", "ESTADO DE CUENTA"
-        ]):
+        ]) or PIE_PAGINA.match(linea):
             break
         
         # Agregar la línea si no está vacía
@@ -230,10 +204,12 @@ def encontrar_siguiente_transaccion(lineas: List[str], inicio: int) -> int:
     
     return len(lineas)
 
-def procesar_transaccion_mejorada(fecha: str, transaccion_completa: str, moneda: str) -> Optional[Dict]:
+def procesar_transaccion_mejorada(fecha: str, transaccion_completa: str, moneda: str,
+                                  tabla: TablaTransacciones) -> bool:
     """
-    Procesa una transacción completa de manera mejorada.
+    Procesa una transacción completa de manera mejorada y la agrega a la tabla.
     Extrae correctamente la descripción, número de referencia y valores monetarios.
+    Devuelve si la transacción se pudo agregar.
     """
     try:
         # Buscar los valores monetarios según la moneda
@@ -247,7 +223,7 @@ def procesar_transaccion_mejorada(fecha: str, transaccion_completa: str, moneda:
         valores_monetarios = re.findall(patron_monetario, transaccion_completa)
         
         if len(valores_monetarios) < 2:
-            return None
+            return False
         
         # Los últimos dos valores son: [depósito/retiro, saldo_final]
         # Si hay tres valores: [monto_transaccion, otro_valor, saldo_final]
@@ -276,19 +252,21 @@ def procesar_transaccion_mejorada(fecha: str, transaccion_completa: str, moneda:
         # Concatenar número de referencia con descripción si existe
         descripcion_final = f"{ref_numero} {descripcion_completa}" if ref_numero else descripcion_completa
         
-        return {
-            "fecha": fecha,
-            "descripcion": descripcion_final.strip(),
-            "retiro": retiro,
-            "deposito": deposito,
-            "saldo": saldo,
-            "tipo_movimiento": tipo_movimiento,
-            "categoria": categorizar_transaccion_banbajio(descripcion_final)
-        }
+        tabla.agregar(
+            fecha=fecha,
+            descripcion=descripcion_final.strip(),
+            retiro=retiro,
+            deposito=deposito,
+            saldo=saldo,
+            tipo_movimiento=tipo_movimiento,
+            categoria=categorizar_transaccion_banbajio(descripcion_final),
+            referencia=ref_numero
+        )
+        return True
         
     except (ValueError, IndexError, AttributeError) as e:
-        print(f"Error procesando transacción: {e}")
-        return None
+        logger.debug("Error procesando transacción del %s: %s", fecha, e, extra=FILA)
+        return False
 
 def extraer_referencia_y_descripcion(fecha: str, transaccion_completa: str, moneda: str) -> tuple:
     """
@@ -362,14 +340,26 @@ def limpiar_texto_ocr(texto: str) -> str:
     
     return texto_limpio
 
+# Clasificación previa de páginas (ver app/services/clasificacion.py). El resumen de la cuenta
+# en dólares puede quedar en una página sin movimientos, después de los de pesos.
+PERFIL_PAGINAS = clasificacion.PerfilPaginas(
+    "banbajio",
+    movimientos=("DETALLE DE LA CUENTA", ("FECHA", "DESCRIPCION", "DEPOSITOS", "RETIROS", "SALDO")),
+    resumen=("CUENTA CONECTA BANBAJIO", "CUENTA DE CHEQUES EN DOLARES", ("SALDO ANTERIOR", "SALDO ACTUAL")),
+)
+
 def procesar_estado_de_cuenta_banbajio_empresarial(ruta_pdf: str) -> Optional[dict]:
     """
     Procesa un estado de cuenta de BanBajío empresarial dividiendo el texto por cuentas.
     """
     cuentas_analizadas = []
-    with pdfplumber.open(ruta_pdf) as pdf:
-        if not pdf.pages: return None
-        texto_completo_crudo = "".join(page.extract_text(x_tolerance=2, y_tolerance=2) or "" for page in pdf.pages)
+    with extraccion.abrir(ruta_pdf, "banbajio") as documento:
+        paginas = documento.numero_paginas()
+        if not paginas: return None
+        etiquetas = clasificacion.clasificar(documento, PERFIL_PAGINAS)
+        texto_completo_crudo = "".join(
+            documento.texto_pagina(indice) for indice in range(paginas) if etiquetas[indice] != clasificacion.RELLENO
+        )
 
     # Limpiamos todo el texto del PDF una sola vez.
     texto_completo = limpiar_texto_ocr(texto_completo_crudo)
@@ -1,9 +1,14 @@
-import pdfplumber
+import logging
 import re
-from typing import List, Dict, Optional
-from datetime import datetime
-# Se importan los modelos desde el nuevo archivo de esquemas
-from app.schemas.analysisBanorte import Transaccion, CuentaAnalisis, AnalisisPDF
+from typing import Dict, List, Optional
+from datetime import date
+# Las transacciones se acumulan en la tabla columnar; el esquema de la API
+# (app/schemas/analysisBanorte.py) se produce una sola vez en el router.
+from app.core.registro import FILA
+from app.services import clasificacion, columnas, conciliacion, estrategias, extraccion, fechas
+from app.services.tabla_transacciones import TablaTransacciones
+
+logger = logging.getLogger(__name__)
 
 
 # --- SECCIÓN DE FUNCIONES DE EXTRACCIÓN PARA BANORTE ---
@@ -67,13 +72,12 @@ def categorizar_transaccion_banorte(descripcion: str) -> str:
     else:
         return "Otro"
 
-def extraer_transacciones_banorte_texto(page: pdfplumber.page.Page) -> List[Transaccion]:
+def extraer_transacciones_banorte_texto(texto_pagina: str) -> TablaTransacciones:
     """
     Método mejorado para extraer transacciones que valida los montos
     aritméticamente para evitar asignaciones incorrectas.
     """
-    transacciones_obj = []
-    texto_pagina = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
+    transacciones_obj = TablaTransacciones()
     
     if "DETALLE DE MOVIMIENTOS" not in texto_pagina:
         return transacciones_obj
@@ -134,7 +138,7 @@ def extraer_transacciones_banorte_texto(page: pdfplumber.page.Page) -> List[Tran
 
         elif len(montos_encontrados) == 2:
             # Obtenemos el saldo de la última transacción registrada para el cálculo
-            last_saldo = transacciones_obj[-1].saldo if transacciones_obj else 0.0
+            last_saldo = transacciones_obj.ultimo_saldo()
             
             monto1 = limpiar_valor_monetario(montos_encontrados[0])
             monto2 = limpiar_valor_monetario(montos_encontrados[1])
@@ -177,7 +181,7 @@ def extraer_transacciones_banorte_texto(page: pdfplumber.page.Page) -> List[Tran
         else:
             tipo_movimiento = "otro"
             
-        transacciones_obj.append(Transaccion(
+        transacciones_obj.agregar(
             fecha=fecha,
             descripcion=descripcion,
             retiro=retiro,
@@ -185,156 +189,127 @@ def extraer_transacciones_banorte_texto(page: pdfplumber.page.Page) -> List[Tran
             saldo=saldo,
             tipo_movimiento=tipo_movimiento,
             categoria=categorizar_transaccion_banorte(descripcion)
-        ))
+        )
         
         i = j
     
     return transacciones_obj
 
-def extraer_transacciones_banorte_tabla(page: pdfplumber.page.Page) -> List[Transaccion]:
+# Tabla de movimientos de Banorte: sus columnas de montos y las palabras que las nombran.
+FORMATO_TABLA = columnas.FormatoTabla(
+    "banorte",
+    claves_encabezado=("FECHA", "DESCRIPCIÓN", "SALDO"),
+    columnas=[("deposito", ("DEPOSITO",)), ("retiro", ("RETIRO",)), ("saldo", ("SALDO",))],
+    requeridas=("deposito", "retiro", "saldo"),
+)
+
+# Clasificación previa de páginas (ver app/services/clasificacion.py).
+PERFIL_PAGINAS = clasificacion.PerfilPaginas(
+    "banorte",
+    movimientos=("DETALLE DE MOVIMIENTOS", FORMATO_TABLA.claves_encabezado),
+    resumen=("SALDO INICIAL DEL PERIODO", "TOTAL DE DEPÓSITOS", "TOTAL DE RETIROS", "FECHA DE CORTE"),
+)
+
+def extraer_transacciones_banorte_columnas(lineas: List[columnas.Linea]) -> Optional[TablaTransacciones]:
     """
-    Extrae las transacciones usando coordenadas y posiciones específicas de Banorte.
+    Extrae las transacciones de las líneas de una página por coordenadas (ver
+    app/services/columnas.py): cada monto se asigna a depósito, retiro o saldo según la columna
+    en la que está. Devuelve None si la página no tiene un encabezado de tabla del que se
+    puedan aprender las columnas.
     """
-    transacciones_obj = []
-    
-    try:
-        # Extraer texto con posiciones para mejor análisis
-        texto_con_posiciones = page.extract_text_lines()
-        
-        # Buscar la tabla de movimientos
-        inicio_tabla = -1
-        for i, linea_info in enumerate(texto_con_posiciones):
-            texto = linea_info.get('text', '')
-            if "FECHA" in texto and "DESCRIPCIÓN" in texto and "SALDO" in texto:
-                inicio_tabla = i + 1
-                break
-        
-        if inicio_tabla == -1:
-            return []
-        
-        # Procesar líneas de la tabla
-        transaccion_actual = None
-        
-        for linea_info in texto_con_posiciones[inicio_tabla:]:
-            texto_linea = linea_info.get('text', '').strip()
-            
-            if not texto_linea or "OTROS" in texto_linea:
-                break
-            
-            # Verificar si es una nueva transacción (empieza con fecha)
-            match_fecha = re.match(r'^(\d{2}-\w{3}-\d{2})\s*(.+)', texto_linea)
-            
-            if match_fecha:
-                # Finalizar transacción anterior si existe
-                if transaccion_actual:
-                    transacciones_obj.append(transaccion_actual)
-                
-                # Iniciar nueva transacción
-                fecha = match_fecha.group(1)
-                resto_texto = match_fecha.group(2)
-                
-                # Extraer montos de la línea usando posiciones
-                montos = re.findall(r'([\d,]+\.\d{2})', resto_texto)
-                
-                # Determinar valores según estructura de columnas
-                deposito = 0.0
-                retiro = 0.0
-                saldo = 0.0
-                
-                if len(montos) == 1:
-                    # Solo saldo (caso SALDO ANTERIOR)
-                    saldo = limpiar_valor_monetario(montos[0])
-                elif len(montos) == 2:
-                    # Puede ser: deposito+saldo o retiro+saldo
-                    primer_valor = limpiar_valor_monetario(montos[0])
-                    saldo = limpiar_valor_monetario(montos[1])
-                    
-                    # Determinar si es depósito o retiro por posición en la línea
-                    # Buscar posición aproximada del primer monto
-                    pos_primer_monto = resto_texto.find(montos[0])
-                    texto_antes_monto = resto_texto[:pos_primer_monto].strip()
-                    
-                    if "DEPOSITO" in texto_antes_monto.upper():
-                        deposito = primer_valor
-                    else:
-                        retiro = primer_valor
-                elif len(montos) >= 3:
-                    # deposito, retiro, saldo
-                    deposito = limpiar_valor_monetario(montos[0])
-                    retiro = limpiar_valor_monetario(montos[1])
-                    saldo = limpiar_valor_monetario(montos[2])
-                
-                # Extraer descripción (quitar montos)
-                descripcion = resto_texto
-                for monto in montos:
-                    descripcion = descripcion.replace(monto, '')
-                descripcion = ' '.join(descripcion.split())  # Limpiar espacios
-                
-                # Determinar tipo de movimiento
-                if "SALDO ANTERIOR" in descripcion.upper():
-                    tipo_movimiento = "saldo_anterior"
-                elif deposito > 0:
-                    tipo_movimiento = "ingreso"
-                elif retiro > 0:
-                    tipo_movimiento = "gasto"
-                else:
-                    tipo_movimiento = "otro"
-                
-                transaccion_actual = Transaccion(
-                    fecha=fecha,
-                    descripcion=descripcion,
-                    retiro=retiro,
-                    deposito=deposito,
-                    saldo=saldo,
-                    tipo_movimiento=tipo_movimiento,
-                    categoria=categorizar_transaccion_banorte(descripcion)
-                )
-            
-            elif transaccion_actual:
-                # Línea de continuación de descripción
-                # Quitar posibles montos que puedan estar duplicados
-                texto_limpio = texto_linea
-                montos_linea = re.findall(r'([\d,]+\.\d{2})', texto_linea)
-                
-                # Si hay montos nuevos, actualizar la transacción
-                if montos_linea and not any(re.search(re.escape(m), transaccion_actual.descripcion) for m in montos_linea):
-                    # Actualizar montos si es necesario
-                    if len(montos_linea) >= 2 and transaccion_actual.saldo == 0:
-                        if "DEPOSITO" in transaccion_actual.descripcion.upper():
-                            transaccion_actual.deposito = limpiar_valor_monetario(montos_linea[0])
-                        else:
-                            transaccion_actual.retiro = limpiar_valor_monetario(montos_linea[0])
-                        transaccion_actual.saldo = limpiar_valor_monetario(montos_linea[-1])
-                
-                # Agregar a descripción (sin montos)
-                for monto in montos_linea:
-                    texto_limpio = texto_limpio.replace(monto, '')
-                
-                if texto_limpio.strip():
-                    transaccion_actual.descripcion += " " + texto_limpio.strip()
-        
-        # Agregar última transacción
-        if transaccion_actual:
-            transacciones_obj.append(transaccion_actual)
-            
-    except Exception as e:
-        print(f"Error en extracción por tabla: {e}")
-        return []
-    
+    inicio = next((i for i, linea in enumerate(lineas) if FORMATO_TABLA.es_encabezado(linea)), None)
+    if inicio is None:
+        return None
+    disposicion = columnas.disposicion(lineas[inicio], FORMATO_TABLA)
+    if disposicion is None:
+        return None
+
+    transacciones_obj = TablaTransacciones()
+    # Transacción en curso: fecha, partes de la descripción y montos por columna.
+    actual = None
+
+    def cerrar():
+        if actual is None:
+            return
+        fecha, partes, montos = actual
+        descripcion = ' '.join(' '.join(partes).split())
+        deposito = columnas.valor_monto(montos["deposito"]) if "deposito" in montos else 0.0
+        retiro = columnas.valor_monto(montos["retiro"]) if "retiro" in montos else 0.0
+        saldo = columnas.valor_monto(montos["saldo"]) if "saldo" in montos else 0.0
+
+        if "SALDO ANTERIOR" in descripcion.upper():
+            tipo_movimiento = "saldo_anterior"
+        elif deposito > 0:
+            tipo_movimiento = "ingreso"
+        elif retiro > 0:
+            tipo_movimiento = "gasto"
+        else:
+            tipo_movimiento = "otro"
+
+        transacciones_obj.agregar(
+            fecha=fecha,
+            descripcion=descripcion,
+            retiro=retiro,
+            deposito=deposito,
+            saldo=saldo,
+            tipo_movimiento=tipo_movimiento,
+            categoria=categorizar_transaccion_banorte(descripcion)
+        )
+
+    for linea in lineas[inicio + 1:]:
+        fila = disposicion.separar(linea)
+        texto = fila.texto.strip()
+
+        if "OTROS" in texto:
+            cerrar()
+            actual = None
+            continue
+
+        match_fecha = re.match(r'^(\d{2}-\w{3}-\d{2})\s*(.*)', texto)
+        if match_fecha:
+            cerrar()
+            actual = (match_fecha.group(1), [match_fecha.group(2)], dict(fila.montos))
+        elif actual is not None:
+            # Línea de continuación: más descripción y, si la primera línea no los tenía, montos.
+            if texto:
+                actual[1].append(texto)
+            for columna, monto in fila.montos.items():
+                actual[2].setdefault(columna, monto)
+    cerrar()
+
     return transacciones_obj
 
-def extraer_transacciones_banorte(page: pdfplumber.page.Page) -> List[Transaccion]:
+def _por_columnas(documento: extraccion.DocumentoPdf, indice: int, lineas: List[columnas.Linea]) -> Optional[TablaTransacciones]:
+    return extraer_transacciones_banorte_columnas(lineas)
+
+def _por_texto(documento: extraccion.DocumentoPdf, indice: int, lineas: List[columnas.Linea]) -> Optional[TablaTransacciones]:
+    return extraer_transacciones_banorte_texto(documento.texto_pagina(indice)) or None
+
+# Estrategias de extracción de una página (ver app/services/estrategias.py). Por columnas se
+# reutilizan las líneas ya extraídas; por texto hay que volver a leer la página. Cada una
+# devuelve None si no aplica: sin encabezado de columnas, o sin movimientos en el texto.
+ESTRATEGIAS = estrategias.SelectorEstrategias("banorte", [
+    estrategias.Estrategia("columnas", 1, _por_columnas),
+    estrategias.Estrategia("texto", 2, _por_texto),
+])
+
+def extraer_transacciones_banorte(documento: extraccion.DocumentoPdf, indice: int,
+                                  lineas: Optional[List[columnas.Linea]] = None,
+                                  saldo_previo: Optional[float] = None) -> TablaTransacciones:
     """
-    Función principal que intenta primero extracción por texto y luego por tabla.
+    Función principal: extracción por columnas o por texto, la que cuadre primero (ver
+    ESTRATEGIAS). Las transacciones de la página se validan encadenando sus saldos desde
+    `saldo_previo`, el último saldo de las páginas anteriores. `lineas` son las de
+    columnas.lineas_de_pagina si ya se extrajeron.
     """
-    # Intentar primero con extracción de texto (más confiable para Banorte)
-    transacciones = extraer_transacciones_banorte_texto(page)
-    
-    # Si no se encontraron transacciones, usar método de tabla
-    if not transacciones:
-        transacciones = extraer_transacciones_banorte_tabla(page)
-    
-    return transacciones
+    if lineas is None:
+        lineas = columnas.lineas_de_pagina(documento, indice)
+    huella = columnas.huella_pagina(documento, indice, FORMATO_TABLA)
+    saldo_inicial = conciliacion.a_centavos(saldo_previo)
+    transacciones = ESTRATEGIAS.extraer(
+        huella, lambda tabla: conciliacion.conciliar(tabla, saldo_inicial), documento, indice, lineas
+    )
+    return TablaTransacciones() if transacciones is None else transacciones
 
 # --- ORQUESTADOR PRINCIPAL ---
 
@@ -343,86 +318,81 @@ def procesar_estado_de_cuenta_banorte(ruta_pdf: str) -> Optional[dict]:
     Procesa un estado de cuenta de Banorte, extrae la información clave y la estructura.
     """
     try:
-        with pdfplumber.open(ruta_pdf) as pdf:
-            if not pdf.pages: 
+        with extraccion.abrir(ruta_pdf, "banorte") as documento:
+            paginas = documento.numero_paginas()
+            if not paginas:
                 return None
             
-            # Extraer texto completo para datos generales y resumen
-            texto_completo = "\n".join(
-                page.extract_text(x_tolerance=2, y_tolerance=2) or "" 
-                for page in pdf.pages
-            )
+            # Las palabras de cada página se extraen una vez: de ellas salen el texto (datos
+            # generales y resumen) y la tabla de movimientos por columnas. Las páginas hasta la
+            # primera con movimientos se leen completas; de las siguientes solo se usan las líneas
+            # de la tabla (ver columnas.lineas_tabla). Las páginas de relleno (anexos) no se extraen.
+            # Cada página se procesa en cuanto se extrae; de las leídas completas se guarda el
+            # texto, que es donde están los datos generales y el resumen.
+            etiquetas = clasificacion.clasificar(documento, PERFIL_PAGINAS)
+            textos_completos = []
+            transacciones_totales = TablaTransacciones()
+            en_movimientos = False
+            for indice in range(paginas):
+                if etiquetas[indice] == clasificacion.RELLENO:
+                    continue
+                if en_movimientos:
+                    lineas, en_tabla = columnas.lineas_tabla(documento, indice, FORMATO_TABLA)
+                else:
+                    lineas, en_tabla = columnas.lineas_de_pagina(documento, indice), False
+                texto_pagina = columnas.texto_de_lineas(lineas)
+                if not en_tabla:
+                    textos_completos.append(texto_pagina)
+                # Solo procesar páginas con movimientos
+                if en_tabla or "DETALLE DE MOVIMIENTOS" in texto_pagina:
+                    en_movimientos = True
+                    saldo_previo = transacciones_totales.saldo(-1) if len(transacciones_totales) else None
+                    transacciones_pagina = extraer_transacciones_banorte(documento, indice, lineas, saldo_previo)
+                    transacciones_totales.extender(transacciones_pagina)
+                    logger.debug("Encontradas %d transacciones en página %d", len(transacciones_pagina), indice + 1)
+            texto_completo = "\n".join(textos_completos)
             
             datos_generales = extraer_datos_generales_banorte(texto_completo)
             resumen = extraer_resumen_banorte(texto_completo)
             
-            # Extraer transacciones de todas las páginas
-            transacciones_totales = []
-            for i, page in enumerate(pdf.pages):
-                texto_pagina = page.extract_text() or ""
-                
-                # Solo procesar páginas con movimientos
-                if "DETALLE DE MOVIMIENTOS" in texto_pagina:
-                    print(f"Procesando transacciones en página {i+1}")
-                    transacciones_pagina = extraer_transacciones_banorte(page)
-                    transacciones_totales.extend(transacciones_pagina)
-                    print(f"Encontradas {len(transacciones_pagina)} transacciones en página {i+1}")
-            
-            # Ordenar transacciones por fecha (SALDO ANTERIOR primero)
-            def fecha_a_datetime(fecha_str):
-                try:
-                    # Convertir formato DD-MMM-YY a datetime
-                    meses = {
-                        'ENE': 1, 'FEB': 2, 'MAR': 3, 'ABR': 4, 'MAY': 5, 'JUN': 6,
-                        'JUL': 7, 'AGO': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DIC': 12
-                    }
-                    parts = fecha_str.split('-')
-                    dia = int(parts[0])
-                    mes = meses.get(parts[1], 1)
-                    año = 2000 + int(parts[2])  # Asumir años 20XX
-                    return datetime(año, mes, dia)
-                except:
-                    return datetime.min
-            
-            # Separar saldo anterior del resto
-            saldo_anterior = [t for t in transacciones_totales if t.tipo_movimiento == "saldo_anterior"]
-            otras_transacciones = [t for t in transacciones_totales if t.tipo_movimiento != "saldo_anterior"]
-            
-            # Ordenar otras transacciones por fecha
-            otras_transacciones.sort(key=lambda t: fecha_a_datetime(t.fecha))
+            # Ordenar transacciones por fecha: saldo anterior primero, luego el resto
+            # cronológicamente (orden estable). Las fechas traen año (DD-MMM-YY).
+            tipos = transacciones_totales.tipos_movimiento
+            fechas_tabla = transacciones_totales.fechas
+            transacciones_totales.ordenar(
+                lambda i: (tipos[i] != "saldo_anterior", fechas.interpretar_fecha(fechas_tabla[i]) or date.min)
+            )
             
-            # Combinar: saldo anterior primero, luego el resto cronológicamente
-            transacciones_ordenadas = saldo_anterior + otras_transacciones
+            logger.debug("Total de transacciones extraídas: %d", len(transacciones_totales))
             
-            print(f"Total de transacciones extraídas: {len(transacciones_ordenadas)}")
+            # Debug: muestra de las transacciones encontradas (muestreada, ver app/core/registro.py)
+            if logger.isEnabledFor(logging.DEBUG):
+                t = transacciones_totales
+                for i in range(len(t)):
+                    logger.debug("%d. %s - %s... - D:%s R:%s S:%s", i + 1, t.fechas[i], t.descripciones[i][:50],
+                                 t.depositos[i], t.retiros[i], t.saldo(i), extra=FILA)
             
-            # Debug: mostrar transacciones encontradas
-            for i, t in enumerate(transacciones_ordenadas):
-                print(f"{i+1}. {t.fecha} - {t.descripcion[:50]}... - D:{t.deposito} R:{t.retiro} S:{t.saldo}")
-            
-            # Crear objeto cuenta
-            cuenta = CuentaAnalisis(
-                nombre_cuenta=datos_generales["nombre_cuenta"], 
-                numero_cuenta=datos_generales["numero_cuenta"],
-                moneda=datos_generales["moneda"], 
-                saldo_anterior_resumen=resumen["saldo_anterior"],
-                saldo_actual_resumen=resumen["saldo_actual"], 
-                total_ingresos=resumen["total_depositos"],
-                total_gastos=resumen["total_retiros"], 
-                transacciones=transacciones_ordenadas
-            )
+            # Crear cuenta
+            cuenta = {
+                "nombre_cuenta": datos_generales["nombre_cuenta"], 
+                "numero_cuenta": datos_generales["numero_cuenta"],
+                "moneda": datos_generales["moneda"], 
+                "saldo_anterior_resumen": resumen["saldo_anterior"],
+                "saldo_actual_resumen": resumen["saldo_actual"], 
+                "total_ingresos": resumen["total_depositos"],
+                "total_gastos": resumen["total_retiros"], 
+                "transacciones": transacciones_totales
+            }
             
             # Crear respuesta final
-            respuesta = AnalisisPDF(
-                nombre_archivo=ruta_pdf.split('/')[-1], 
-                banco="banorte", 
-                periodo=datos_generales["periodo"],
-                fecha_corte=datos_generales["fecha_corte"], 
-                cuentas=[cuenta]
-            )
-
-            return respuesta.model_dump()
+            return {
+                "nombre_archivo": ruta_pdf.split('/')[-1], 
+                "banco": "banorte", 
+                "fecha_corte": datos_generales["fecha_corte"], 
+                "periodo": datos_generales["periodo"],
+                "cuentas": [cuenta]
+            }
             
     except Exception as e:
-        print(f"Error procesando PDF: {e}")
+        logger.exception("Error procesando PDF de Banorte")
         return None
\ No newline at end of file
@@ -1,7 +1,8 @@
-import pdfplumber
 import re
-from typing import List, Dict, Optional
-from app.schemas.analysis_bbva import AnalisisBbvaPDF, CuentaAnalisis
+from typing import List, Dict, Optional, Tuple
+from app.services import clasificacion, columnas, conciliacion, estrategias, extraccion
+from app.services.bloques import MONTO, extraer_bloque
+from app.services.tabla_transacciones import TablaTransacciones
 
 # --- SECCIÓN 1: EXTRACCIÓN DE DATOS PRINCIPALES ---
 def extraer_datos_encabezado(texto: str) -> Dict:
@@ -18,34 +19,26 @@ def extraer_datos_encabezado(texto: str) -> Dict:
         "nombre_cuenta": tipo_cuenta_match.group(1).strip() if tipo_cuenta_match else "No Identificada"
     }
 
+# Partes del bloque "Comportamiento", en orden; se buscan acotadas al bloque (ver app/services/bloques.py).
+PATRONES_COMPORTAMIENTO = [
+    re.compile(r"Saldo de Operación Inicial\s+" + MONTO, re.IGNORECASE),              # Saldo Inicial
+    re.compile(r"Depósitos\s*/\s*Abonos\s*\(\+\)\s+\d+\s+" + MONTO, re.IGNORECASE),  # Total Depósitos/Ingresos
+    re.compile(r"Retiros\s*/\s*Cargos\s*\(\-\)\s+\d+\s+" + MONTO, re.IGNORECASE),    # Total Retiros/Gastos
+    re.compile(r"Saldo Final\s*\(\+\)\s+" + MONTO, re.IGNORECASE),                 # Saldo Final
+]
+
 def extraer_resumen_comportamiento(texto: str) -> Dict:
     """
-    Extrae los valores del bloque "Comportamiento" de BBVA utilizando un patrón de bloque
-    contextual, haciéndolo más robusto a variaciones de formato.
+    Extrae los valores del bloque "Comportamiento" de BBVA: a partir de su encabezado busca
+    en secuencia los cuatro valores clave, sin salir del bloque.
     """
-    # Patrón de bloque que busca los encabezados en secuencia y luego captura los 4 valores clave.
-    # Es insensible a mayúsculas/minúsculas y maneja saltos de línea.
-    patron_bloque = re.compile(
-        r"Saldo de Operación Inicial\s+([\d,]+\.\d{2})"  # Grupo 1: Saldo Inicial
-        r".*?"                                           # Cualquier texto intermedio
-        r"Depósitos\s*/\s*Abonos\s*\(\+\)\s+\d+\s+([\d,]+\.\d{2})"  # Grupo 2: Total Depósitos/Ingresos
-        r".*?"                                           # Cualquier texto intermedio
-        r"Retiros\s*/\s*Cargos\s*\(\-\)\s+\d+\s+([\d,]+\.\d{2})"    # Grupo 3: Total Retiros/Gastos
-        r".*?"                                           # Cualquier texto intermedio
-        r"Saldo Final\s*\(\+\)\s+([\d,]+\.\d{2})",       # Grupo 4: Saldo Final
-        re.DOTALL | re.IGNORECASE
-    )
+    valores = extraer_bloque(texto, PATRONES_COMPORTAMIENTO)
 
-    match = patron_bloque.search(texto)
-
-    if match:
-        # Si el bloque se encuentra, extraemos los valores de los grupos capturados.
-        saldo_inicial = float(match.group(1).replace(',', ''))
-        total_ingresos = float(match.group(2).replace(',', ''))
-        total_gastos = float(match.group(3).replace(',', ''))
-        saldo_final = float(match.group(4).replace(',', ''))
+    if valores:
+        # Si el bloque se encuentra, convertimos los valores capturados.
+        saldo_inicial, total_ingresos, total_gastos, saldo_final = (float(v.replace(',', '')) for v in valores)
     else:
-        # Si el patrón de bloque no encuentra coincidencias, devolvemos ceros para evitar errores.
+        # Si el bloque no se encuentra completo, devolvemos ceros para evitar errores.
         # Esto indica que la estructura del PDF es inesperada y necesita revisión.
         saldo_inicial = 0.0
         total_ingresos = 0.0
@@ -114,16 +107,20 @@ def es_linea_institucional(linea: str) -> bool:
     ]
     return any(f in linea_upper for f in frases)
 
-def procesar_bloque_transaccion_bbva(fecha: str, bloque_lineas: List[str]) -> Optional[Dict]:
+# Palabras de las líneas de encabezado de la tabla, que no son parte de ninguna descripción.
+ENCABEZADOS_TABLA = ['FECHA', 'OPER', 'LIQ', 'COD.', 'DESCRIPCIÓN', 'REFERENCIA', 'CARGOS', 'ABONOS', 'OPERACIÓN', 'LIQUIDACIÓN']
+
+def procesar_bloque_transaccion_bbva(fecha: str, bloque_lineas: List[str], tabla: TablaTransacciones) -> bool:
+    """Procesa un bloque de líneas de una transacción y lo agrega a la tabla. Devuelve si se agregó."""
     if not bloque_lineas:
-        return None
+        return False
 
     primera_linea = bloque_lineas[0].strip()
 
     # Intenta encontrar el código de la transacción al inicio de la línea.
     codigo_match = re.match(r'^([A-Z0-9]+)\s+(.*)', primera_linea)
     if not codigo_match:
-        return None
+        return False
 
     codigo = codigo_match.group(1)
     resto_primera_linea = codigo_match.group(2)
@@ -131,7 +128,7 @@ def procesar_bloque_transaccion_bbva(fecha: str, bloque_lineas: List[str]) -> Op
     # Extraer todos los montos de la primera línea para procesarlos.
     montos_en_linea = re.findall(r'([\d,]+\.\d{2})', primera_linea)
     if not montos_en_linea:
-        return None # Si no hay montos, no podemos procesar la transacción.
+        return False # Si no hay montos, no podemos procesar la transacción.
 
     # Construir la descripción completa a partir de todas las líneas del bloque.
     pos_primer_monto = primera_linea.find(montos_en_linea[0])
@@ -212,23 +209,25 @@ def procesar_bloque_transaccion_bbva(fecha: str, bloque_lineas: List[str]) -> Op
         if posible_saldo != monto_transaccion:
             saldo = posible_saldo
 
-    return {
-        "fecha": fecha,
-        "descripcion": descripcion,
-        "retiro": retiro,
-        "deposito": deposito,
-        "saldo": saldo,
-        "tipo_movimiento": "gasto" if retiro > 0 else "ingreso",
-        "categoria": categorizar_transaccion_bbva(descripcion, "gasto" if retiro > 0 else "ingreso"),
-        "codigo": codigo
-    }
+    tipo_movimiento = "gasto" if retiro > 0 else "ingreso"
+    tabla.agregar(
+        fecha=fecha,
+        descripcion=descripcion,
+        retiro=retiro,
+        deposito=deposito,
+        saldo=saldo,
+        tipo_movimiento=tipo_movimiento,
+        categoria=categorizar_transaccion_bbva(descripcion, tipo_movimiento),
+        referencia=codigo
+    )
+    return True
 
-def extraer_detalle_movimientos(texto_completo: str) -> List[Dict]:
-    transacciones = []
+def extraer_detalle_movimientos(texto_completo: str) -> TablaTransacciones:
+    transacciones = TablaTransacciones()
 
     inicio_movimientos = texto_completo.find("Detalle de Movimientos Realizados")
     if inicio_movimientos == -1:
-        return []
+        return transacciones
 
     fin_movimientos = texto_completo.find("Total de Movimientos", inicio_movimientos)
     if fin_movimientos == -1:
@@ -250,9 +249,7 @@ def extraer_detalle_movimientos(texto_completo: str) -> List[Dict]:
         match = patron_fecha.match(linea)
         if match:
             if fecha_actual and bloque_actual:
-                transaccion = procesar_bloque_transaccion_bbva(fecha_actual, bloque_actual)
-                if transaccion:
-                    transacciones.append(transaccion)
+                procesar_bloque_transaccion_bbva(fecha_actual, bloque_actual, transacciones)
 
             fecha_actual = match.group(1)
             codigo = match.group(3)
@@ -261,27 +258,189 @@ def extraer_detalle_movimientos(texto_completo: str) -> List[Dict]:
         elif fecha_actual and linea:
             if es_linea_institucional(linea):
                 continue
-            if not any(header in linea.upper() for header in ['FECHA', 'OPER', 'LIQ', 'COD.', 'DESCRIPCIÓN', 'REFERENCIA', 'CARGOS', 'ABONOS', 'OPERACIÓN', 'LIQUIDACIÓN']):
+            if not any(header in linea.upper() for header in ENCABEZADOS_TABLA):
                 bloque_actual.append(linea)
 
     if fecha_actual and bloque_actual:
-        transaccion = procesar_bloque_transaccion_bbva(fecha_actual, bloque_actual)
-        if transaccion:
-            transacciones.append(transaccion)
+        procesar_bloque_transaccion_bbva(fecha_actual, bloque_actual, transacciones)
 
     return transacciones
 
+# Tabla de movimientos de BBVA: columnas de montos (cargos, abonos y los dos saldos) y las
+# palabras que las nombran en el encabezado.
+FORMATO_TABLA = columnas.FormatoTabla(
+    "bbva",
+    claves_encabezado=("FECHA", "CARGOS", "ABONOS"),
+    columnas=[
+        ("cargo", ("CARGOS",)),
+        ("abono", ("ABONOS",)),
+        ("saldo_operacion", ("SALDO", "OPERACIÓN")),
+        ("saldo_liquidacion", ("LIQ",)),
+    ],
+    requeridas=("cargo", "abono"),
+    frases_pie=("ESTIMADO CLIENTE", "WWW.BBVA.MX", "LA GAT REAL", "AV. PASEO DE LA REFORMA"),
+)
+
+# Clasificación previa de páginas (ver app/services/clasificacion.py). El encabezado y el
+# resumen se leen de las páginas anteriores al detalle, que nunca son relleno.
+PERFIL_PAGINAS = clasificacion.PerfilPaginas(
+    "bbva",
+    movimientos=("Detalle de Movimientos Realizados", "Total de Movimientos", FORMATO_TABLA.claves_encabezado),
+)
+
+def agregar_fila_bbva(fecha: str, codigo: str, descripcion_partes: List[str], fila: columnas.Fila,
+                      tabla: TablaTransacciones) -> bool:
+    """Agrega una transacción leída por columnas. Devuelve si se agregó (necesita cargo o abono)."""
+    retiro = fila.monto("cargo") or 0.0
+    deposito = fila.monto("abono") or 0.0
+    if not retiro and not deposito:
+        return False
+
+    # El saldo de liquidación si está, si no el de operación.
+    saldo = fila.monto("saldo_liquidacion")
+    if saldo is None:
+        saldo = fila.monto("saldo_operacion")
+
+    descripcion = " ".join(filter(None, descripcion_partes))
+    tipo_movimiento = "gasto" if retiro > 0 else "ingreso"
+    tabla.agregar(
+        fecha=fecha,
+        descripcion=descripcion,
+        retiro=retiro,
+        deposito=deposito,
+        saldo=saldo,
+        tipo_movimiento=tipo_movimiento,
+        categoria=categorizar_transaccion_bbva(descripcion, tipo_movimiento),
+        referencia=codigo
+    )
+    return True
+
+class LectorMovimientosBBVA:
+    """
+    Extrae el detalle de movimientos por coordenadas (ver app/services/columnas.py): cargo o
+    abono según la columna del monto, no según el código de la transacción. Las páginas se leen
+    una por una con `leer_pagina` y entre ellas solo se conserva el estado de la lectura (si ya
+    empezó o terminó el detalle, las columnas aprendidas y la transacción en curso), así que las
+    líneas de cada página se pueden descartar en cuanto se leen.
+    """
+
+    PATRON_INICIO = re.compile(r'^(\d{2}/[A-Z]{3})\s+(\d{2}/[A-Z]{3})\s+([A-Z0-9]+)\s*(.*)')
+
+    def __init__(self):
+        self.transacciones = TablaTransacciones()
+        self.en_detalle = False
+        self.terminado = False
+        self.disposicion: Optional[columnas.Disposicion] = None
+        # Transacción en curso: fecha, código, partes de la descripción y fila con sus montos.
+        self._actual = None
+
+    def _cerrar(self) -> None:
+        if self._actual is not None:
+            agregar_fila_bbva(*self._actual, self.transacciones)
+            self._actual = None
+
+    def leer_pagina(self, lineas: List[columnas.Linea]) -> None:
+        for linea in lineas:
+            if self.terminado:
+                return
+            texto_completo_linea = columnas.texto_linea(linea)
+            if not self.en_detalle:
+                self.en_detalle = "Detalle de Movimientos Realizados" in texto_completo_linea
+                continue
+            if "Total de Movimientos" in texto_completo_linea:
+                self._cerrar()
+                self.terminado = True
+                return
+            if FORMATO_TABLA.es_encabezado(linea):
+                self.disposicion = columnas.disposicion(linea, FORMATO_TABLA) or self.disposicion
+                continue
+            if self.disposicion is None:
+                continue
+
+            fila = self.disposicion.separar(linea)
+            texto = fila.texto.strip()
+            match = self.PATRON_INICIO.match(texto)
+            if match:
+                self._cerrar()
+                codigo = match.group(3)
+                self._actual = (match.group(1), codigo, [f"{codigo} {match.group(4)}".strip()], fila)
+            elif self._actual is not None and texto:
+                if es_linea_institucional(texto) or any(h in texto.upper() for h in ENCABEZADOS_TABLA):
+                    continue
+                self._actual[2].append(texto)
+                for columna, monto in fila.montos.items():
+                    self._actual[3].montos.setdefault(columna, monto)
+
+    def resultado(self) -> Optional[TablaTransacciones]:
+        """Las transacciones leídas, o None si no hubo un encabezado del que aprender las columnas."""
+        self._cerrar()
+        return self.transacciones if self.disposicion is not None else None
+
+def leer_por_columnas(documento: extraccion.DocumentoPdf, etiquetas: List[str]) -> Optional[Tuple[str, TablaTransacciones]]:
+    """
+    Texto del encabezado y resumen y transacciones leídas por coordenadas (LectorMovimientosBBVA);
+    None si la tabla no tiene un encabezado reconocible.
+
+    Las palabras de cada página se extraen una vez (con la tolerancia vertical por omisión de
+    extract_text). Hasta la página donde empieza el detalle se leen completas y su texto sirve
+    para el encabezado y el resumen; de las siguientes solo se usan las líneas de la tabla (ver
+    columnas.lineas_tabla). Las páginas de relleno (anexos) no se extraen. Cada página se lee en
+    cuanto se extrae y después solo queda el estado del lector.
+    """
+    texto_resumen = ""
+    lector = LectorMovimientosBBVA()
+    en_detalle = False
+    for indice in range(documento.numero_paginas()):
+        if lector.terminado:
+            break
+        if etiquetas[indice] == clasificacion.RELLENO:
+            continue
+        if en_detalle:
+            lineas, _ = columnas.lineas_tabla(documento, indice, FORMATO_TABLA, y_tolerancia=3)
+        else:
+            lineas = columnas.lineas_de_pagina(documento, indice, y_tolerancia=3)
+            texto_pagina = columnas.texto_de_lineas(lineas)
+            texto_resumen += texto_pagina + "\n"
+            en_detalle = "Detalle de Movimientos Realizados" in texto_pagina
+        lector.leer_pagina(lineas)
+    transacciones = lector.resultado()
+    return None if transacciones is None else (texto_resumen, transacciones)
+
+def leer_por_texto(documento: extraccion.DocumentoPdf, etiquetas: List[str]) -> Tuple[str, TablaTransacciones]:
+    """
+    Texto del encabezado y resumen y transacciones extraídas del texto de todas las páginas
+    (extraer_detalle_movimientos), para tablas sin un encabezado de columnas reconocible.
+    """
+    textos = [columnas.texto_de_lineas(columnas.lineas_de_pagina(documento, indice, y_tolerancia=3))
+              for indice in range(documento.numero_paginas()) if etiquetas[indice] != clasificacion.RELLENO]
+    inicio = next((i for i, texto in enumerate(textos) if "Detalle de Movimientos Realizados" in texto), len(textos) - 1)
+    texto_resumen = "".join(texto + "\n" for texto in textos[:inicio + 1])
+    return texto_resumen, extraer_detalle_movimientos("".join(texto + "\n" for texto in textos))
+
+def conciliar_lectura(lectura: Tuple[str, TablaTransacciones]) -> Dict:
+    """Concilia las transacciones de una lectura con el resumen de su propio texto."""
+    texto_resumen, transacciones = lectura
+    resumen = extraer_resumen_comportamiento(texto_resumen)
+    return conciliacion.conciliar(transacciones, **conciliacion.totales_resumen(resumen))
+
+# Estrategias de lectura del documento (ver app/services/estrategias.py). Por texto se extraen
+# completas todas las páginas; en un formato cuya tabla no se puede leer por columnas se
+# recuerda y ya no se paga primero la lectura por columnas.
+ESTRATEGIAS = estrategias.SelectorEstrategias("bbva", [
+    estrategias.Estrategia("columnas", 1, leer_por_columnas),
+    estrategias.Estrategia("texto", 2, leer_por_texto),
+])
+
 # --- SECCIÓN 3: FUNCIÓN PRINCIPAL INTEGRADORA ---
 
 def procesar_estado_de_cuenta_bbva(ruta_pdf: str) -> dict:
     """Función principal que orquesta la extracción de datos de un PDF de BBVA."""
-    texto_completo_paginas = ""
-    with pdfplumber.open(ruta_pdf) as pdf:
-        if not pdf.pages:
+    with extraccion.abrir(ruta_pdf, "bbva") as documento:
+        if not documento.numero_paginas():
             raise ValueError("El PDF está vacío o no se puede leer.")
-        # Unir el texto de todas las páginas para un análisis completo
-        for page in pdf.pages:
-            texto_completo_paginas += page.extract_text(x_tolerance=2) + "\n"
+        etiquetas = clasificacion.clasificar(documento, PERFIL_PAGINAS)
+        huella = columnas.huella_pagina(documento, 0, FORMATO_TABLA)
+        texto_completo_paginas, transacciones = ESTRATEGIAS.extraer(huella, conciliar_lectura, documento, etiquetas)
 
     if not texto_completo_paginas:
         raise ValueError("No se pudo extraer texto del PDF.")
@@ -290,28 +449,23 @@ def procesar_estado_de_cuenta_bbva(ruta_pdf: str) -> dict:
     datos_encabezado = extraer_datos_encabezado(texto_completo_paginas)
     resumen_comportamiento = extraer_resumen_comportamiento(texto_completo_paginas)
 
-    # 2. Extraer el detalle de transacciones de todo el documento
-    transacciones = extraer_detalle_movimientos(texto_completo_paginas)
-
-    # 3. Construir el objeto de la cuenta
-    cuenta_analizada = CuentaAnalisis(
-        nombre_cuenta=datos_encabezado["nombre_cuenta"],
-        numero_cuenta=datos_encabezado["numero_cuenta"],
-        moneda="PESOS",
-        saldo_anterior_resumen=resumen_comportamiento["saldo_anterior_resumen"],
-        saldo_actual_resumen=resumen_comportamiento["saldo_actual_resumen"],
-        total_ingresos=resumen_comportamiento["total_ingresos"],
-        total_gastos=resumen_comportamiento["total_gastos"],
-        transacciones=transacciones
-    )
-
-    # 4. Ensamblar la respuesta final
-    resultado_final = AnalisisBbvaPDF(
-        nombre_archivo=ruta_pdf.split('/')[-1],
-        banco="bbva",
-        fecha_corte=datos_encabezado["fecha_corte"],
-        periodo=datos_encabezado["periodo"],
-        cuentas=[cuenta_analizada]
-    )
+    # 2. Construir la cuenta (mismos campos que app/schemas/analysis_bbva.CuentaAnalisis)
+    cuenta_analizada = {
+        "nombre_cuenta": datos_encabezado["nombre_cuenta"],
+        "numero_cuenta": datos_encabezado["numero_cuenta"],
+        "moneda": "PESOS",
+        "saldo_anterior_resumen": resumen_comportamiento["saldo_anterior_resumen"],
+        "saldo_actual_resumen": resumen_comportamiento["saldo_actual_resumen"],
+        "total_ingresos": resumen_comportamiento["total_ingresos"],
+        "total_gastos": resumen_comportamiento["total_gastos"],
+        "transacciones": transacciones
+    }
 
-    return resultado_final.dict()
\ No newline at end of file
+    # 3. Ensamblar la respuesta final
+    return {
+        "nombre_archivo": ruta_pdf.split('/')[-1],
+        "banco": "bbva",
+        "fecha_corte": datos_encabezado["fecha_corte"],
+        "periodo": datos_encabezado["periodo"],
+        "cuentas": [cuenta_analizada]
+    }
\ No newline at end of file
@@ -1,9 +1,9 @@
 # pdf_processor_santander.py
 import pdfplumber
 import re
-from typing import List, Dict, Optional
-from app.schemas.analysisSantander import AnalisisSantanderPDF, CuentaAnalisis, Transaccion
+from typing import Dict, Optional
 from app.services.ocr_processor import extraer_texto_con_ocr
+from app.services.tabla_transacciones import TablaTransacciones, CAMPOS_SANTANDER
 
 def extraer_periodo(texto_completo: str) -> str:
     """
@@ -30,11 +30,11 @@ def extraer_resumen_cuenta_cheques(texto_completo: str) -> Dict[str, float]:
         "saldo_final": float(saldo_final_match.group(1).replace(",", "")) if saldo_final_match else 0.0,
     }
 
-def extraer_transacciones_tabla(texto_seccion: str) -> List[Transaccion]:
+def extraer_transacciones_tabla(texto_seccion: str) -> TablaTransacciones:
     """
     Extrae las transacciones de una tabla en el estado de cuenta.
     """
-    transacciones = []
+    transacciones = TablaTransacciones(CAMPOS_SANTANDER)
     lineas = texto_seccion.strip().split('\n')
     
     # Expresión regular para capturar las columnas de la tabla de transacciones
@@ -58,20 +58,18 @@ def extraer_transacciones_tabla(texto_seccion: str) -> List[Transaccion]:
             retiro = float(retiro_str.replace(",", "")) if retiro_str else 0.0
             saldo = float(saldo_str.replace(",", ""))
 
-            transacciones.append(
-                Transaccion(
-                    fecha=fecha,
-                    folio=folio,
-                    descripcion=descripcion.strip(),
-                    deposito=deposito,
-                    retiro=retiro,
-                    saldo=saldo,
-                )
+            transacciones.agregar(
+                fecha=fecha,
+                descripcion=descripcion.strip(),
+                deposito=deposito,
+                retiro=retiro,
+                saldo=saldo,
+                referencia=folio,
             )
             
     return transacciones
 
-def procesar_estado_de_cuenta_santander(ruta_pdf: str) -> Optional[AnalisisSantanderPDF]:
+def procesar_estado_de_cuenta_santander(ruta_pdf: str) -> Optional[dict]:
     """
     Procesa un estado de cuenta de Santander usando OCR.
     """
@@ -82,7 +80,7 @@ def procesar_estado_de_cuenta_santander(ruta_pdf: str) -> Optional[AnalisisSanta
         # Si el OCR falla, no se puede continuar.
         return None
 
-    texto_completo = texto_completo_ocr.replace('º', 'o').replace('—', '-')
+    texto_completo = texto_completo.replace('º', 'o').replace('—', '-')
 
     periodo = extraer_periodo(texto_completo)
     cuentas = []
@@ -98,16 +96,14 @@ def procesar_estado_de_cuenta_santander(ruta_pdf: str) -> Optional[AnalisisSanta
         resumen_cheques = extraer_resumen_cuenta_cheques(texto_completo)
         transacciones_cheques = extraer_transacciones_tabla(texto_cheques)
         
-        cuentas.append(
-            CuentaAnalisis(
-                nombre_cuenta="Cuenta de cheques",
-                saldo_inicial=resumen_cheques["saldo_inicial"],
-                depositos=resumen_cheques["depositos"],
-                retiros=resumen_cheques["retiros"],
-                saldo_final=resumen_cheques["saldo_final"],
-                transacciones=transacciones_cheques,
-            )
-        )
+        cuentas.append({
+            "nombre_cuenta": "Cuenta de cheques",
+            "saldo_inicial": resumen_cheques["saldo_inicial"],
+            "depositos": resumen_cheques["depositos"],
+            "retiros": resumen_cheques["retiros"],
+            "saldo_final": resumen_cheques["saldo_final"],
+            "transacciones": transacciones_cheques,
+        })
 
     # --- Análisis de la Cuenta DineroCreciente ---
     seccion_creciente_match = re.search(r"Detalles de movimientos Dinero Creciente Santander(.+?)Información fiscal", texto_completo, re.DOTALL)
@@ -115,19 +111,20 @@ def procesar_estado_de_cuenta_santander(ruta_pdf: str) -> Optional[AnalisisSanta
         texto_creciente = seccion_creciente_match.group(1)
         transacciones_creciente = extraer_transacciones_tabla(texto_creciente)
 
-        cuentas.append(
-            CuentaAnalisis(
-                nombre_cuenta="DineroCreciente",
-                saldo_inicial=0.0,
-                depositos=0.0,
-                retiros=0.0,
-                saldo_final=0.0,
-                transacciones=transacciones_creciente,
-            )
-        )
+        cuentas.append({
+            "nombre_cuenta": "DineroCreciente",
+            "saldo_inicial": 0.0,
+            "depositos": 0.0,
+            "retiros": 0.0,
+            "saldo_final": 0.0,
+            "transacciones": transacciones_creciente,
+        })
     
-    return AnalisisSantanderPDF(
-        nombre_archivo=ruta_pdf.split('/')[-1],
-        periodo=periodo,
-        cuentas=cuentas,
-    )
\ No newline at end of file
+    # Mismos campos que app/schemas/analysisSantander.AnalisisSantanderPDF
+    return {
+        "nombre_archivo": ruta_pdf.split('/')[-1],
+        "banco": "Santander",
+        "fecha_corte": None,
+        "periodo": periodo,
+        "cuentas": cuentas,
+    }
\ No newline at end of file
@@ -1,7 +1,10 @@
-import pdfplumber
+import logging
 import re
-from typing import List, Dict, Optional
-from app.schemas.analysisScotiabank import AnalisisScotiabankPDF, CuentaAnalisis, Transaccion
+from typing import Dict, Optional
+from app.services import clasificacion, extraccion
+from app.services.tabla_transacciones import TablaTransacciones, CAMPOS_SCOTIABANK
+
+logger = logging.getLogger(__name__)
 
 
 def limpiar_valor_monetario(valor: Optional[str]) -> float:
@@ -39,8 +42,7 @@ def extraer_resumen_saldos(texto: str) -> Dict[str, float]:
     }
 
 
-def extraer_transacciones(page, saldo_inicial_resumen: float) -> List[Transaccion]:
-    texto_pagina = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
+def extraer_transacciones(texto_pagina: str, saldo_inicial_resumen: float) -> TablaTransacciones:
     lineas = texto_pagina.split('\n')
 
     STOP_WORDS = [
@@ -59,7 +61,7 @@ def extraer_transacciones(page, saldo_inicial_resumen: float) -> List[Transaccio
             fin_tabla = i
             break
     
-    if inicio_tabla == -1: return []
+    if inicio_tabla == -1: return TablaTransacciones(CAMPOS_SCOTIABANK)
 
     lineas_tabla = [l.strip() for l in lineas[inicio_tabla:fin_tabla] if l.strip()]
 
@@ -81,7 +83,7 @@ def extraer_transacciones(page, saldo_inicial_resumen: float) -> List[Transaccio
         transacciones_agrupadas.append(transaccion_actual_lineas)
 
     saldo_anterior = -1
-    lista_transacciones_obj = []
+    lista_transacciones_obj = TablaTransacciones(CAMPOS_SCOTIABANK)
 
     for tx_lineas in transacciones_agrupadas:
         if not tx_lineas: continue
@@ -125,60 +127,82 @@ def extraer_transacciones(page, saldo_inicial_resumen: float) -> List[Transaccio
         
         concepto_final = re.sub(r'\s+', ' ', concepto_limpio).strip()
 
-        lista_transacciones_obj.append(Transaccion(
+        # En Scotiabank la descripción es el concepto; el esquema expone ambos campos.
+        lista_transacciones_obj.agregar(
             fecha=fecha,
-            concepto=concepto_final,
+            descripcion=concepto_final,
             deposito=deposito,
             retiro=retiro,
             saldo=saldo
-        ))
+        )
 
     return lista_transacciones_obj
 
-def procesar_estado_de_cuenta_scotiabank(ruta_pdf: str) -> Optional[AnalisisScotiabankPDF]:
-    try:
-        with pdfplumber.open(ruta_pdf) as pdf:
-            texto_completo = "\n".join(page.extract_text(x_tolerance=2, y_tolerance=2) or "" for page in pdf.pages)
-            
-            encabezado = extraer_encabezado(texto_completo)
-            resumen = extraer_resumen_saldos(texto_completo)
+# Clasificación previa de páginas (ver app/services/clasificacion.py).
+PERFIL_PAGINAS = clasificacion.PerfilPaginas(
+    "scotiabank",
+    movimientos=("Detalle de tus movimientos", "Concepto"),
+    resumen=("Saldo inicial", "Saldo final", "(+) Depósitos", "(-) Retiros", "CLABE", "Fecha de corte"),
+)
 
-            transacciones_totales = []
-            # Tomamos el saldo final de la primera página como punto de partida para el cálculo de saldo_anterior
-            # ya que el saldo inicial del resumen es de todo el periodo.
-            # Esta es una heurística y podría necesitar ajuste si el formato cambia.
-            # Una mejor aproximación podría ser buscar el saldo de la transacción justo antes de la tabla.
-            saldo_inicial_calculo = resumen.get("saldo_inicial", 0.0)
-
-            for idx, page in enumerate(pdf.pages):
-                texto_pagina = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
-                if "Detalle de tus movimientos" not in texto_pagina and "Concepto" not in texto_pagina:
+def procesar_estado_de_cuenta_scotiabank(ruta_pdf: str) -> Optional[dict]:
+    try:
+        with extraccion.abrir(ruta_pdf, "scotiabank") as documento:
+            # El texto de cada página se extrae una sola vez y sus transacciones se leen en ese
+            # momento. Del texto solo se guarda el de las páginas hasta la primera con movimientos
+            # y el de las páginas sin movimientos: ahí están el encabezado y el resumen. Las
+            # páginas de relleno (anexos) no se extraen.
+            etiquetas = clasificacion.clasificar(documento, PERFIL_PAGINAS)
+            textos_resumen = []
+            transacciones_totales = TablaTransacciones(CAMPOS_SCOTIABANK)
+            en_movimientos = False
+            for idx in range(documento.numero_paginas()):
+                if etiquetas[idx] == clasificacion.RELLENO:
                     continue
-                
-                txs = extraer_transacciones(page, saldo_inicial_calculo)
+                texto_pagina = documento.texto_pagina(idx)
+                con_movimientos = "Detalle de tus movimientos" in texto_pagina or "Concepto" in texto_pagina
+                if not (en_movimientos and con_movimientos):
+                    textos_resumen.append(texto_pagina)
+                if not con_movimientos:
+                    continue
+                en_movimientos = True
+
+                # Los saldos de cada página se calculan a partir de sus propias filas; el saldo
+                # inicial del resumen es de todo el periodo y no sirve como punto de partida.
+                txs = extraer_transacciones(texto_pagina, 0.0)
                 
                 if txs:
-                    print(f"Página {idx+1}: encontradas {len(txs)} transacciones")
-                transacciones_totales.extend(txs)
-
-            cuenta = CuentaAnalisis(
-                numero_cuenta=encabezado.get("clabe", ""),
-                saldo_inicial=resumen["saldo_inicial"],
-                depositos=resumen["depositos"],
-                retiros=resumen["retiros"],
-                saldo_final=resumen["saldo_final"],
-                transacciones=transacciones_totales
-            )
-
-            return AnalisisScotiabankPDF(
-                nombre_archivo=ruta_pdf.split('/')[-1],
-                banco="Scotiabank",
-                periodo=encabezado["periodo"],
-                fecha_corte=encabezado["fecha_corte"],
-                cuenta_clabe=encabezado["clabe"],
-                cuentas=[cuenta],
-            )
+                    logger.debug("Página %d: encontradas %d transacciones", idx + 1, len(txs))
+                transacciones_totales.extender(txs)
+
+            texto_completo = "\n".join(textos_resumen)
+            encabezado = extraer_encabezado(texto_completo)
+            resumen = extraer_resumen_saldos(texto_completo)
+
+            # Mismos campos (y alias) que app/schemas/analysisScotiabank.CuentaAnalisis
+            cuenta = {
+                "numero_cuenta": encabezado.get("clabe", ""),
+                "nombre_cuenta": "CUENTA UNICA PYME",
+                "moneda": "PESOS",
+                "saldo_inicial": resumen["saldo_inicial"],
+                "saldo_anterior_resumen": resumen["saldo_inicial"],
+                "depositos": resumen["depositos"],
+                "total_ingresos": resumen["depositos"],
+                "retiros": resumen["retiros"],
+                "total_gastos": resumen["retiros"],
+                "saldo_final": resumen["saldo_final"],
+                "saldo_actual_resumen": resumen["saldo_final"],
+                "transacciones": transacciones_totales
+            }
+
+            return {
+                "nombre_archivo": ruta_pdf.split('/')[-1],
+                "banco": "Scotiabank",
+                "periodo": encabezado["periodo"],
+                "fecha_corte": encabezado["fecha_corte"],
+                "cuenta_clabe": encabezado["clabe"],
+                "cuentas": [cuenta],
+            }
     except Exception as e:
-        print("Error procesando Scotiabank:", e)
-        import traceback; traceback.print_exc()
+        logger.exception("Error procesando Scotiabank")
         return None
\ No newline at end of file
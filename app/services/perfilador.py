@@ -0,0 +1,43 @@
+# app/services/perfilador.py
+import cProfile
+import os
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import ADMIN_USER_IDS, PROFILING_DIR
+
+# Perfilado opcional de un análisis con cProfile, solo para administradores. Permite
+# perfilar el PDF real de un cliente en producción sin tener que copiarlo a otro lado:
+# el perfil se guarda en PROFILING_DIR como <id>.pstats y el id viaja en la cabecera
+# X-Profile-Id de la respuesta. Si no se pide, no se crea nada (costo cero).
+
+CABECERA_ID_PERFIL = "X-Profile-Id"
+
+
+def es_administrador(usuario: Optional[Dict[str, Any]]) -> bool:
+    return bool(usuario) and usuario["id"] in ADMIN_USER_IDS
+
+
+class Perfil:
+    """Perfil de una sola petición, identificado por un id de correlación."""
+
+    def __init__(self, directorio: str = PROFILING_DIR):
+        self.id = uuid.uuid4().hex
+        self.ruta = os.path.join(directorio, f"{self.id}.pstats")
+
+    def ejecutar(self, funcion: Callable[..., Any], *args: Any) -> Any:
+        """
+        Ejecuta `funcion` bajo cProfile en el hilo actual y guarda el perfil, también si
+        la función falla (los documentos que fallan suelen ser los que interesa perfilar).
+        """
+        perfilador = cProfile.Profile()
+        perfilador.enable()
+        try:
+            return funcion(*args)
+        finally:
+            perfilador.disable()
+            os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+            perfilador.dump_stats(self.ruta)
+
+    def cabeceras(self) -> Dict[str, str]:
+        return {CABECERA_ID_PERFIL: self.id}
@@ -1,9 +1,12 @@
 # app/services/rate_limiter.py
+import logging
 from fastapi import Request, HTTPException
 from datetime import datetime, timedelta, timezone
 from app.services.supabase_client import supabase
 from typing import Dict
 
+logger = logging.getLogger(__name__)
+
 # --- Para usuarios anónimos (en memoria) ---
 anonymous_usage: dict[str, datetime] = {}
 
@@ -66,5 +69,5 @@ def check_registered_user_limit(user: Dict): # CAMBIO: de 'async def' a 'def'
         # Esto significa que el perfil no existe.
         if "PGRST116" in str(e):
              raise HTTPException(status_code=404, detail=f"Crítico: No se encontró un perfil para el usuario ID: {user_id}")
-        print(f"Error inesperado en check_registered_user_limit: {e}")
+        logger.exception("Error inesperado en check_registered_user_limit")
         raise HTTPException(status_code=500, detail=f"Error al gestionar el límite de usuario: {e}")
\ No newline at end of file
@@ -0,0 +1,194 @@
+# app/services/tabla_transacciones.py
+import math
+import sys
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# --- Formatos de salida por esquema ---
+# Cada tupla define qué campos (y en qué orden) produce una transacción en la respuesta
+# de la API. Deben coincidir con los modelos `Transaccion` de app/schemas.
+CAMPOS_TRANSACCION = ("fecha", "descripcion", "retiro", "deposito", "saldo", "tipo_movimiento", "categoria")
+CAMPOS_SCOTIABANK = ("fecha", "descripcion", "concepto", "deposito", "retiro", "saldo")
+CAMPOS_SANTANDER = ("fecha", "folio", "descripcion", "deposito", "retiro", "saldo")
+
+# Campos del esquema que en realidad son otra columna de la tabla.
+ALIAS_COLUMNAS = {"concepto": "descripcion", "folio": "referencia"}
+
+# Todos los campos de transacción que puede pedir un cliente en el formato v1.
+CAMPOS_V1 = frozenset(CAMPOS_TRANSACCION) | frozenset(CAMPOS_SCOTIABANK) | frozenset(CAMPOS_SANTANDER)
+
+# Los saldos ausentes se guardan como NaN para que la columna siga siendo un array('d').
+SIN_SALDO = math.nan
+
+
+class TablaTransacciones:
+    """
+    Representación interna y columnar de las transacciones de una cuenta.
+
+    Los montos y saldos viven en arrays de tipo double y las fechas, tipos de movimiento
+    y categorías se internan, así que miles de movimientos no crean un objeto por fila.
+    La conversión al formato de la API ocurre una sola vez, al final (ver `convertir_resultado`).
+    """
+    __slots__ = ("campos", "fechas", "descripciones", "retiros", "depositos", "saldos",
+                 "tipos_movimiento", "categorias", "referencias")
+
+    def __init__(self, campos: Sequence[str] = CAMPOS_TRANSACCION):
+        self.campos = tuple(campos)
+        self.fechas: List[str] = []
+        self.descripciones: List[str] = []
+        self.retiros = array("d")
+        self.depositos = array("d")
+        self.saldos = array("d")
+        self.tipos_movimiento: List[str] = []
+        self.categorias: List[str] = []
+        self.referencias: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.fechas)
+
+    def agregar(
+        self,
+        fecha: str,
+        descripcion: str,
+        retiro: float = 0.0,
+        deposito: float = 0.0,
+        saldo: Optional[float] = None,
+        tipo_movimiento: str = "",
+        categoria: str = "",
+        referencia: str = "",
+    ) -> None:
+        """Agrega una transacción al final de la tabla."""
+        self.fechas.append(sys.intern(fecha))
+        self.descripciones.append(descripcion)
+        self.retiros.append(retiro)
+        self.depositos.append(deposito)
+        self.saldos.append(SIN_SALDO if saldo is None else saldo)
+        self.tipos_movimiento.append(sys.intern(tipo_movimiento))
+        self.categorias.append(sys.intern(categoria))
+        self.referencias.append(referencia)
+
+    def extender(self, otra: "TablaTransacciones") -> None:
+        """Agrega al final todas las filas de otra tabla."""
+        self.fechas.extend(otra.fechas)
+        self.descripciones.extend(otra.descripciones)
+        self.retiros.extend(otra.retiros)
+        self.depositos.extend(otra.depositos)
+        self.saldos.extend(otra.saldos)
+        self.tipos_movimiento.extend(otra.tipos_movimiento)
+        self.categorias.extend(otra.categorias)
+        self.referencias.extend(otra.referencias)
+
+    def actualizar(self, indice: int, **campos: Any) -> None:
+        """Modifica los campos de una fila ya agregada (acepta índices negativos)."""
+        for campo, valor in campos.items():
+            if campo == "fecha":
+                self.fechas[indice] = sys.intern(valor)
+            elif campo == "descripcion":
+                self.descripciones[indice] = valor
+            elif campo == "retiro":
+                self.retiros[indice] = valor
+            elif campo == "deposito":
+                self.depositos[indice] = valor
+            elif campo == "saldo":
+                self.saldos[indice] = SIN_SALDO if valor is None else valor
+            elif campo == "tipo_movimiento":
+                self.tipos_movimiento[indice] = sys.intern(valor)
+            elif campo == "categoria":
+                self.categorias[indice] = sys.intern(valor)
+            elif campo == "referencia":
+                self.referencias[indice] = valor
+            else:
+                raise KeyError(campo)
+
+    def saldo(self, indice: int) -> Optional[float]:
+        valor = self.saldos[indice]
+        return None if math.isnan(valor) else valor
+
+    def ultimo_saldo(self, por_defecto: float = 0.0) -> float:
+        """Saldo de la última fila, o `por_defecto` si la tabla está vacía o no tiene saldo."""
+        if not self.fechas:
+            return por_defecto
+        valor = self.saldo(-1)
+        return por_defecto if valor is None else valor
+
+    def ordenar(self, clave: Callable[[int], Any]) -> None:
+        """Reordena las filas (de forma estable) según una clave calculada por índice."""
+        orden = sorted(range(len(self)), key=clave)
+        self.fechas = [self.fechas[i] for i in orden]
+        self.descripciones = [self.descripciones[i] for i in orden]
+        self.retiros = array("d", (self.retiros[i] for i in orden))
+        self.depositos = array("d", (self.depositos[i] for i in orden))
+        self.saldos = array("d", (self.saldos[i] for i in orden))
+        self.tipos_movimiento = [self.tipos_movimiento[i] for i in orden]
+        self.categorias = [self.categorias[i] for i in orden]
+        self.referencias = [self.referencias[i] for i in orden]
+
+    def columna(self, campo: str, inicio: int = 0, fin: Optional[int] = None) -> Sequence[Any]:
+        """
+        Devuelve la columna de un campo del esquema (o la ventana [inicio:fin]),
+        con los saldos ausentes como None.
+        """
+        campo = ALIAS_COLUMNAS.get(campo, campo)
+        if campo == "fecha":
+            return self.fechas[inicio:fin]
+        if campo == "descripcion":
+            return self.descripciones[inicio:fin]
+        if campo == "retiro":
+            return self.retiros[inicio:fin]
+        if campo == "deposito":
+            return self.depositos[inicio:fin]
+        if campo == "saldo":
+            return [None if math.isnan(s) else s for s in self.saldos[inicio:fin]]
+        if campo == "tipo_movimiento":
+            return self.tipos_movimiento[inicio:fin]
+        if campo == "categoria":
+            return self.categorias[inicio:fin]
+        if campo == "referencia":
+            return self.referencias[inicio:fin]
+        raise KeyError(campo)
+
+    def a_dicts(self, campos: Optional[Sequence[str]] = None, inicio: int = 0,
+                fin: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Convierte la tabla a la lista de transacciones que espera la API. Con `campos`
+        solo se incluyen esos campos (los que no existan en este esquema se ignoran) y con
+        `inicio`/`fin` solo esa ventana de filas; ninguna otra fila se materializa.
+        """
+        if campos is None:
+            seleccion = self.campos
+        else:
+            seleccion = tuple(campo for campo in self.campos if campo in campos)
+        columnas = [self.columna(campo, inicio, fin) for campo in seleccion]
+        return [dict(zip(seleccion, fila)) for fila in zip(*columnas)]
+
+
+def convertir_resultado(
+    resultado: Dict[str, Any],
+    campos: Optional[Sequence[str]] = None,
+    inicio: int = 0,
+    limite: Optional[int] = None,
+    solo_resumen: bool = False,
+) -> Dict[str, Any]:
+    """
+    Convierte el resultado de un procesador al formato de la API, reemplazando
+    cada `TablaTransacciones` por su lista de transacciones.
+
+    `campos`, `inicio`/`limite` y `solo_resumen` proyectan la salida antes de serializarla.
+    Al paginar o pedir solo el resumen, cada cuenta indica su `total_transacciones`.
+    """
+    paginado = solo_resumen or inicio > 0 or limite is not None
+    fin = None if limite is None else inicio + limite
+    cuentas = []
+    for cuenta in resultado.get("cuentas", []):
+        transacciones = cuenta.get("transacciones")
+        # La conciliación (app/services/conciliacion.py) solo se expone en el esquema v2.
+        cuenta = {clave: valor for clave, valor in cuenta.items() if clave != "conciliacion"}
+        if isinstance(transacciones, TablaTransacciones):
+            if solo_resumen:
+                del cuenta["transacciones"]
+            else:
+                cuenta["transacciones"] = transacciones.a_dicts(campos, inicio, fin)
+            if paginado:
+                cuenta["total_transacciones"] = len(transacciones)
+        cuentas.append(cuenta)
+    return {**resultado, "cuentas": cuentas}
@@ -0,0 +1,270 @@
+# app/services/vigilancia.py
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, BinaryIO, Dict, Iterable, Optional, Set, Tuple
+
+import orjson
+import watchfiles
+
+from app.core.config import (
+    LOTE_TRABAJADORES,
+    VIGILANCIA_ESTABILIDAD_S,
+    VIGILANCIA_REINTENTOS,
+    VIGILANCIA_REVISION_S,
+)
+from app.services import lote
+
+logger = logging.getLogger(__name__)
+
+# Ingesta continua de una carpeta, p. ej. sincronizada por SFTP (ver app/cli/vigilar.py).
+# Los PDFs que aparecen o cambian en la carpeta (o en sus subcarpetas) se detectan con watchfiles.
+# Cuando el tamaño y la fecha de modificación de uno dejan de cambiar durante
+# VIGILANCIA_ESTABILIDAD_S (la sincronización puede escribirlo en varias partes) se calcula su
+# SHA-256 y, si esa huella no está en el manifiesto ni en proceso, se analiza en el pool de
+# procesos de app/services/lote.py. Un archivo repetido, renombrado o movido de subcarpeta no se
+# vuelve a analizar; uno cuyo contenido cambia, sí.
+#
+# Los avisos del sistema no incluyen los archivos escritos en una subcarpeta recién creada antes
+# de que se empiece a vigilar, así que cada subcarpeta nueva se revisa completa, y toda la
+# carpeta cada VIGILANCIA_REVISION_S por si se perdió algún aviso. Revisar solo cuesta un `stat`
+# por archivo: la huella se vuelve a calcular únicamente si cambió su tamaño o su fecha. Para
+# que eso valga también al volver a arrancar, cada huella calculada se anota con la ruta, el
+# tamaño y la fecha del archivo en `archivos.ndjson`, junto al manifiesto; al arrancar solo se
+# usan las anotaciones cuya huella ya está en el manifiesto (lo demás se vuelve a calcular).
+#
+# Si el análisis falla por algo pasajero (ESTADOS_TRANSITORIOS: memoria agotada, plazo o un
+# error inesperado) el resultado no se escribe ni se anota: el PDF se vuelve a analizar en la
+# siguiente revisión completa, hasta VIGILANCIA_REINTENTOS veces por arranque, y solo entonces
+# se guarda la falla como definitiva.
+#
+# Los resultados se guardan con la misma salida por bloques que la conversión masiva
+# (lote.SalidaLote): `resultados.ndjson` (y Parquet si se pide), y su punto de control, anotado
+# por huella, es el manifiesto. Con `junto` además se escribe `<archivo>.pdf.json` al lado de
+# cada PDF (a un temporal que se renombra) antes de anotarlo. Al arrancar se revisan todos los
+# PDFs de la carpeta contra el manifiesto: lo que llegó con el proceso detenido se analiza, y lo
+# que estaba en proceso cuando se cayó (sin anotar) se analiza de nuevo sin duplicar resultados.
+
+
+ARCHIVO_INDICE = "archivos.ndjson"
+ESTADOS_TRANSITORIOS = frozenset({"memoria", "plazo", "error"})
+
+
+def huella_archivo(ruta: str) -> str:
+    """SHA-256 del contenido del archivo, en hexadecimal."""
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as archivo:
+        while True:
+            bloque = archivo.read(2**20)
+            if not bloque:
+                break
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def _filtro_pdf(cambio: watchfiles.Change, ruta: str) -> bool:
+    return lote.es_pdf(ruta) or os.path.isdir(ruta)
+
+
+class VigilanteCarpeta:
+    """Analiza una sola vez por contenido los PDFs que llegan a una carpeta."""
+
+    def __init__(
+        self,
+        directorio: str,
+        directorio_salida: str,
+        trabajadores: int = LOTE_TRABAJADORES,
+        plazo_s: Optional[float] = None,
+        parquet: bool = False,
+        junto: bool = False,
+        estabilidad_s: float = VIGILANCIA_ESTABILIDAD_S,
+        revision_s: float = VIGILANCIA_REVISION_S,
+        reintentos: int = VIGILANCIA_REINTENTOS,
+    ):
+        self.directorio = os.path.abspath(directorio)
+        self.salida = lote.SalidaLote(directorio_salida, parquet)
+        self.trabajadores = trabajadores or os.cpu_count() or 1
+        self.plazo_s = plazo_s
+        self.parquet = parquet
+        self.junto = junto
+        self.estabilidad_s = estabilidad_s
+        self.revision_s = revision_s
+        self.reintentos = reintentos
+        self.procesados = 0
+        self.omitidos = 0
+        # PDFs que pueden seguir escribiéndose: ruta -> (tamaño, mtime_ns, desde cuándo no cambian).
+        self._candidatos: Dict[str, Tuple[int, int, float]] = {}
+        # (tamaño, mtime_ns) de cada PDF cuando se calculó su huella.
+        self._vistos: Dict[str, Tuple[int, int]] = {}
+        self._ultima_revision = 0.0
+        self._en_proceso: Dict[Future, str] = {}
+        self._huellas_en_proceso: Set[str] = set()
+        # Huella -> análisis fallidos por una causa pasajera.
+        self._fallas: Dict[str, int] = {}
+        self._pool = None
+        self._indice = self._abrir_indice(os.path.join(directorio_salida, ARCHIVO_INDICE))
+
+    def _abrir_indice(self, ruta: str) -> BinaryIO:
+        """
+        Carga en `_vistos` los archivos anotados cuya huella ya está en el manifiesto, reescribe
+        el índice solo con ellos (los borrados o pendientes se descartan) y lo abre para agregar.
+        """
+        anotados: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(ruta):
+            with open(ruta, "rb") as archivo:
+                for linea in archivo:
+                    try:
+                        entrada = orjson.loads(linea)
+                    except orjson.JSONDecodeError:
+                        # Línea incompleta de un corte a mitad de escritura.
+                        continue
+                    anotados[entrada["ruta"]] = entrada
+        terminados = self.salida.punto_control.terminados
+        vigentes = [
+            entrada for entrada in anotados.values()
+            if entrada["sha256"] in terminados and os.path.exists(os.path.join(self.directorio, entrada["ruta"]))
+        ]
+        with open(ruta + ".tmp", "wb") as archivo:
+            for entrada in vigentes:
+                archivo.write(orjson.dumps(entrada) + b"\n")
+        os.replace(ruta + ".tmp", ruta)
+        for entrada in vigentes:
+            self._vistos[os.path.join(self.directorio, entrada["ruta"])] = (entrada["tamano"], entrada["mtime_ns"])
+        return open(ruta, "ab")
+
+    def observar(self, ruta: str) -> None:
+        """Registra un PDF nuevo o modificado; se analiza cuando deje de cambiar."""
+        try:
+            estado = os.stat(ruta)
+        except FileNotFoundError:
+            self._candidatos.pop(ruta, None)
+            return
+        firma = (estado.st_size, estado.st_mtime_ns)
+        if self._vistos.get(ruta) == firma:
+            return
+        previo = self._candidatos.get(ruta)
+        if previo is None or previo[:2] != firma:
+            self._candidatos[ruta] = firma + (time.monotonic(),)
+
+    def revisar(self, directorio: Optional[str] = None) -> None:
+        """Registra los PDFs de la carpeta (o de una subcarpeta) nuevos o modificados desde la última revisión."""
+        directorio = directorio or self.directorio
+        for documento in lote.buscar_documentos(directorio):
+            self.observar(os.path.join(directorio, documento))
+        if directorio == self.directorio:
+            self._ultima_revision = time.monotonic()
+
+    def paso(self, cambios: Iterable[Tuple[watchfiles.Change, str]] = ()) -> None:
+        """Una vuelta: incorpora los cambios, guarda lo terminado y envía al pool lo que ya no cambia."""
+        for cambio, ruta in cambios:
+            if cambio == watchfiles.Change.deleted:
+                self._candidatos.pop(ruta, None)
+                self._vistos.pop(ruta, None)
+            elif os.path.isdir(ruta):
+                self.revisar(ruta)
+            else:
+                self.observar(ruta)
+        if time.monotonic() - self._ultima_revision >= self.revision_s:
+            self.revisar()
+        self._recoger()
+        self._enviar_estables()
+
+    def _enviar_estables(self) -> None:
+        ahora = time.monotonic()
+        for ruta, (tamano, mtime_ns, desde) in list(self._candidatos.items()):
+            self.observar(ruta)
+            if self._candidatos.get(ruta) != (tamano, mtime_ns, desde) or ahora - desde < self.estabilidad_s:
+                continue
+            del self._candidatos[ruta]
+            try:
+                huella = huella_archivo(ruta)
+            except FileNotFoundError:
+                continue
+            self._vistos[ruta] = (tamano, mtime_ns)
+            documento = os.path.relpath(ruta, self.directorio)
+            # Sin fsync: si se pierde, al arrancar solo se vuelve a calcular la huella.
+            self._indice.write(orjson.dumps(
+                {"ruta": documento, "tamano": tamano, "mtime_ns": mtime_ns, "sha256": huella}
+            ) + b"\n")
+            self._indice.flush()
+            if huella in self.salida.punto_control.terminados or huella in self._huellas_en_proceso:
+                self.omitidos += 1
+                logger.debug("PDF ya procesado, se omite", extra={"archivo": documento, "sha256": huella})
+                continue
+            futuro = self._pool.submit(
+                lote.analizar_documento_lote, self.directorio, documento, self.plazo_s, self.parquet, huella
+            )
+            self._en_proceso[futuro] = huella
+            self._huellas_en_proceso.add(huella)
+
+    def _recoger(self) -> None:
+        listos = [futuro for futuro in self._en_proceso if futuro.done() and not futuro.cancelled()]
+        if not listos:
+            return
+        resultados = []
+        for futuro in listos:
+            resultado = futuro.result()
+            huella = self._en_proceso.pop(futuro)
+            self._huellas_en_proceso.discard(huella)
+            if resultado["estado"] in ESTADOS_TRANSITORIOS and self._fallas.get(huella, 0) < self.reintentos:
+                self._fallas[huella] = self._fallas.get(huella, 0) + 1
+                # Se olvida que se vio para que la próxima revisión completa lo vuelva a enviar.
+                self._vistos.pop(os.path.join(self.directorio, resultado["archivo"]), None)
+                logger.warning("Falla pasajera al analizar el PDF, se reintentará", extra={
+                    "archivo": resultado["archivo"], "sha256": huella, "estado": resultado["estado"],
+                    "intento": self._fallas[huella],
+                })
+                continue
+            self._fallas.pop(huella, None)
+            resultados.append(resultado)
+        if not resultados:
+            return
+        if self.junto:
+            for resultado in resultados:
+                self._escribir_junto(resultado)
+        self.salida.confirmar(resultados)
+        for resultado in resultados:
+            logger.info("PDF procesado", extra={
+                "archivo": resultado["archivo"], "sha256": resultado["clave"], "estado": resultado["estado"],
+            })
+        self.procesados += len(resultados)
+
+    def _escribir_junto(self, resultado: Dict[str, Any]) -> None:
+        ruta = os.path.join(self.directorio, resultado["archivo"]) + ".json"
+        with open(ruta + ".tmp", "wb") as archivo:
+            archivo.write(resultado["linea"])
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(ruta + ".tmp", ruta)
+
+    def ejecutar(self, detener: threading.Event, intervalo_s: float = 0.5, sondeo: bool = False) -> None:
+        """
+        Vigila la carpeta hasta que se active `detener`. Con `sondeo` se revisa periódicamente en
+        lugar de esperar avisos del sistema (para carpetas de red que no los emiten).
+        """
+        self._pool = lote.crear_pool(self.trabajadores)
+        try:
+            self.revisar()
+            self.paso()
+            for cambios in watchfiles.watch(
+                self.directorio,
+                watch_filter=_filtro_pdf,
+                stop_event=detener,
+                rust_timeout=int(intervalo_s * 1000),
+                yield_on_timeout=True,
+                raise_interrupt=False,
+                force_polling=sondeo or None,
+            ):
+                self.paso(cambios)
+        finally:
+            # Lo que ya se está analizando se termina y se guarda; lo demás se retoma al arrancar.
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._recoger()
+            self.cerrar()
+
+    def cerrar(self) -> None:
+        self.salida.cerrar()
+        self._indice.close()
@@ -0,0 +1,178 @@
+# benchmarks/bench_extremo_a_extremo.py
+"""
+Benchmark de extremo a extremo del análisis de estados de cuenta con PDFs sintéticos
+de cada formato soportado (ver benchmarks/estados_sinteticos.py).
+
+Para cada banco y tamaño mide cada etapa del flujo (extracción de texto, identificación,
+procesador, conversión y serialización v1/v2), el throughput en páginas y transacciones
+por segundo y el pico de memoria (tracemalloc, en una corrida aparte para no distorsionar
+los tiempos). Los resultados se guardan en JSON junto con el commit, para comparar corridas.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_extremo_a_extremo --transacciones 100 1000 --repeticiones 3
+    python -m benchmarks.bench_extremo_a_extremo --bancos bbva banorte --paginas 50
+    python -m benchmarks.bench_extremo_a_extremo --comparar benchmarks/resultados/e2e-abc1234.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from app.core.respuestas import serializar
+from app.services import analizador, esquema_v2, pdf_processor_santander
+from app.services.tabla_transacciones import convertir_resultado
+from benchmarks.estados_sinteticos import BANCOS_SOPORTADOS, generar_estado
+
+# Procesador de cada formato sintético. Santander todavía no está conectado al endpoint,
+# pero su procesador se mide igual (requiere Tesseract y poppler para el OCR).
+PROCESADORES: Dict[str, Callable[[str], Optional[Dict]]] = {
+    "bbva": analizador.PROCESADORES[("bbva", "empresarial")],
+    "banbajio": analizador.PROCESADORES[("banbajio", "empresarial")],
+    "banorte": analizador.PROCESADORES[("banorte", "preferente")],
+    "banamex_personal": analizador.PROCESADORES[("banamex", "personal")],
+    "banamex_empresarial": analizador.PROCESADORES[("banamex", "empresarial")],
+    "scotiabank": analizador.PROCESADORES[("scotiabank", "pyme_pfae")],
+    "santander": pdf_processor_santander.procesar_estado_de_cuenta_santander,
+}
+
+DIRECTORIO_RESULTADOS = os.path.join(os.path.dirname(__file__), "resultados")
+
+
+def commit_actual() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(__file__), text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def ejecutar_flujo(banco: str, ruta: str) -> Dict:
+    """Ejecuta una vez el flujo completo y devuelve la duración de cada etapa en segundos."""
+    etapas: Dict[str, float] = {}
+
+    def medir(nombre: str, funcion: Callable, *args):
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        etapas[nombre] = time.perf_counter() - inicio
+        return resultado
+
+    texto, paginas = medir("extraccion", analizador.extraer_texto, ruta, None, analizador.PAGINAS_IDENTIFICACION)
+    banco_identificado, _ = medir("identificacion", analizador.identificar_documento, texto)
+    datos = medir("procesador", PROCESADORES[banco], ruta)
+    if not datos:
+        raise RuntimeError(f"el procesador de {banco} no devolvió resultados")
+    transacciones = analizador.contar_transacciones(datos)
+    cuerpo_v1 = medir("serializacion_v1", lambda: serializar(convertir_resultado(datos)))
+    cuerpo_v2 = medir("serializacion_v2", lambda: serializar(esquema_v2.convertir_a_v2(datos)))
+    etapas["total"] = sum(etapas.values())
+    return {
+        "etapas": etapas,
+        "paginas": paginas,
+        "transacciones": transacciones,
+        "banco_identificado": banco_identificado,
+        "bytes_v1": len(cuerpo_v1),
+        "bytes_v2": len(cuerpo_v2),
+    }
+
+
+def medir_caso(banco: str, ruta: str, esperado: Dict, repeticiones: int) -> Dict:
+    corridas = [ejecutar_flujo(banco, ruta) for _ in range(repeticiones)]
+    mejor = min(corridas, key=lambda corrida: corrida["etapas"]["total"])
+
+    # Pico de memoria en una corrida aparte: tracemalloc hace todo varias veces más lento.
+    tracemalloc.start()
+    ejecutar_flujo(banco, ruta)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = mejor["etapas"]["total"]
+    return {
+        "banco": banco,
+        "transacciones_generadas": esperado["transacciones"],
+        "transacciones_extraidas": mejor["transacciones"],
+        "paginas": mejor["paginas"],
+        "identificacion_correcta": (mejor["banco_identificado"] or "") in banco,
+        "etapas_s": mejor["etapas"],
+        "etapas_mediana_s": {
+            etapa: sorted(corrida["etapas"][etapa] for corrida in corridas)[len(corridas) // 2]
+            for etapa in mejor["etapas"]
+        },
+        "paginas_por_s": mejor["paginas"] / total,
+        "transacciones_por_s": mejor["transacciones"] / total,
+        "pico_memoria_mb": pico / 2**20,
+        "bytes_v1": mejor["bytes_v1"],
+        "bytes_v2": mejor["bytes_v2"],
+    }
+
+
+def comparar(anterior: Dict, actual: Dict) -> None:
+    """Imprime la razón de tiempos y memoria contra una corrida anterior (>1 = más lento ahora)."""
+    previos = {(r["banco"], r["transacciones_generadas"], r["paginas"]): r for r in anterior["resultados"]}
+    print(f"\nComparación {anterior['commit']} -> {actual['commit']}")
+    for resultado in actual["resultados"]:
+        previo = previos.get((resultado["banco"], resultado["transacciones_generadas"], resultado["paginas"]))
+        if not previo:
+            continue
+        tiempo = resultado["etapas_s"]["total"] / previo["etapas_s"]["total"]
+        memoria = resultado["pico_memoria_mb"] / previo["pico_memoria_mb"]
+        print(f"  {resultado['banco']:<20} {resultado['transacciones_generadas']:>6} tx  "
+              f"tiempo x{tiempo:.2f}  memoria x{memoria:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bancos", nargs="+", default=list(BANCOS_SOPORTADOS), choices=BANCOS_SOPORTADOS)
+    parser.add_argument("--transacciones", nargs="+", type=int, default=[100, 1000])
+    parser.add_argument("--paginas", type=int, default=0, help="Páginas mínimas (se rellenan con anexos).")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por omisión benchmarks/resultados/e2e-<commit>.json).")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior contra el cual comparar.")
+    args = parser.parse_args()
+
+    resultados: List[Dict] = []
+    with tempfile.TemporaryDirectory() as directorio:
+        for banco in args.bancos:
+            for transacciones in args.transacciones:
+                ruta = os.path.join(directorio, f"{banco}-{transacciones}.pdf")
+                esperado = generar_estado(banco, ruta, transacciones=transacciones, paginas=args.paginas)
+                try:
+                    resultado = medir_caso(banco, ruta, esperado, args.repeticiones)
+                except RuntimeError as e:
+                    # Santander se procesa con OCR (Tesseract + poppler); sin ellos no hay resultado.
+                    print(f"{banco:<20} {transacciones:>6} tx  omitido: {e}")
+                    continue
+                resultados.append(resultado)
+                print(f"{banco:<20} {transacciones:>6} tx {resultado['paginas']:>4} pág  "
+                      f"{resultado['etapas_s']['total']:.3f} s  {resultado['transacciones_por_s']:>8.0f} tx/s  "
+                      f"{resultado['pico_memoria_mb']:>6.1f} MB  "
+                      f"extraídas {resultado['transacciones_extraidas']}/{resultado['transacciones_generadas']}")
+
+    corrida = {
+        "commit": commit_actual(),
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "parametros": {"transacciones": args.transacciones, "paginas": args.paginas, "repeticiones": args.repeticiones},
+        "resultados": resultados,
+    }
+    salida = args.salida or os.path.join(DIRECTORIO_RESULTADOS, f"e2e-{corrida['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(corrida, archivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            comparar(json.load(archivo), corrida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+# benchmarks/bench_parsers.py
+"""
+Micro-benchmarks de las funciones de parseo de texto de los procesadores, sin PDFs de por
+medio: el texto de cada página se extrae una sola vez de estados sintéticos (ver
+benchmarks/estados_sinteticos.py) y luego se mide solo la función de texto, a tamaños
+crecientes.
+
+Para cada función reporta el tiempo por tamaño y la pendiente de escalamiento (regresión
+log-log del tiempo contra el número de transacciones): ~1 es lineal; bastante más de 1
+indica comportamiento super-lineal. Los tiempos se normalizan contra una carga de
+referencia fija medida en la misma máquina, para que la base guardada sirva en otras.
+
+Con --verificar falla (código de salida 1) si alguna función es más lenta que la base
+guardada por encima del umbral, o si su pendiente empeora.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_parsers                      # reporta
+    python -m benchmarks.bench_parsers --guardar-base       # actualiza benchmarks/base_parsers.json
+    python -m benchmarks.bench_parsers --verificar          # compuerta de regresión
+"""
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+import pdfplumber
+
+from app.services import (
+    pdf_processor_banamex_empresarial,
+    pdf_processor_banamex_personal,
+    pdf_processor_banbajio,
+    pdf_processor_bbva,
+)
+from benchmarks.estados_sinteticos import generar_estado
+
+RUTA_BASE = os.path.join(os.path.dirname(__file__), "base_parsers.json")
+TAMANOS = (100, 200, 400, 800)
+UMBRAL_REGRESION = 0.25
+UMBRAL_PENDIENTE = 0.2
+# Por debajo de este tiempo (en la base) la medición es puro ruido y no se compara.
+MINIMO_COMPARABLE_S = 1e-4
+
+
+# --- Preparación del texto de entrada, igual que en cada procesador ---
+
+def _texto_bbva(paginas: List[pdfplumber.page.Page]) -> str:
+    return "".join((pagina.extract_text(x_tolerance=2) or "") + "\n" for pagina in paginas)
+
+
+def _texto_crudo(paginas: List[pdfplumber.page.Page]) -> str:
+    return "".join(pagina.extract_text(x_tolerance=2, y_tolerance=2) or "" for pagina in paginas)
+
+
+def _texto_operaciones(modulo) -> Callable[[List[pdfplumber.page.Page]], str]:
+    def preparar(paginas: List[pdfplumber.page.Page]) -> str:
+        return "".join(
+            modulo.limpiar_texto_pagina_operaciones(texto) + "\n"
+            for texto in (pagina.extract_text(x_tolerance=2, y_tolerance=2) for pagina in paginas)
+            if texto
+        )
+    return preparar
+
+
+def _seccion_pesos_banbajio(paginas: List[pdfplumber.page.Page]) -> str:
+    texto = pdf_processor_banbajio.limpiar_texto_ocr(_texto_crudo(paginas))
+    inicio = texto.find("CUENTA CONECTA BANBAJIO")
+    fin = texto.find("CUENTA DE CHEQUES EN DOLARES")
+    return texto[inicio:fin if fin != -1 else len(texto)]
+
+
+def _movimientos_banbajio(paginas: List[pdfplumber.page.Page]) -> str:
+    seccion = _seccion_pesos_banbajio(paginas)
+    detalle = re.search(r"DETALLE DE LA CUENTA:.*?#(\d+)", seccion)
+    return seccion[detalle.end():] if detalle else ""
+
+
+# Caso: nombre -> (formato sintético, cómo se prepara el texto, función medida sobre ese texto)
+CASOS: Dict[str, Tuple[str, Callable, Callable[[str], object]]] = {
+    "bbva.extraer_detalle_movimientos": ("bbva", _texto_bbva, pdf_processor_bbva.extraer_detalle_movimientos),
+    "bbva.extraer_resumen_comportamiento": ("bbva", _texto_bbva, pdf_processor_bbva.extraer_resumen_comportamiento),
+    "banbajio.limpiar_texto_ocr": ("banbajio", _texto_crudo, pdf_processor_banbajio.limpiar_texto_ocr),
+    "banbajio.extraer_resumen_cuenta_pesos": (
+        "banbajio", _seccion_pesos_banbajio, pdf_processor_banbajio.extraer_resumen_cuenta_pesos,
+    ),
+    "banbajio.extraer_transacciones": (
+        "banbajio", _movimientos_banbajio,
+        lambda texto: pdf_processor_banbajio.extraer_transacciones(texto, "PESOS", "01 DE ENERO DE 2024"),
+    ),
+    "banamex_personal.extraer_detalle_operaciones": (
+        "banamex_personal", _texto_operaciones(pdf_processor_banamex_personal),
+        pdf_processor_banamex_personal.extraer_detalle_operaciones,
+    ),
+    "banamex_empresarial.extraer_detalle_operaciones_empresarial": (
+        "banamex_empresarial", _texto_operaciones(pdf_processor_banamex_empresarial),
+        pdf_processor_banamex_empresarial.extraer_detalle_operaciones_empresarial,
+    ),
+}
+
+
+def calibrar(repeticiones: int = 5) -> float:
+    """Tiempo de una carga fija de regex y cadenas; sirve de unidad para normalizar."""
+    texto = "\n".join(f"{i:02d}/ENE SPEI ENVIADO REF {100000 + i} 1,234.56 98,765.43" for i in range(3000))
+    patron = re.compile(r"(\d{2}/[A-Z]{3})\s+(.+?)\s+([\d,]+\.\d{2})\s+([\d,]+\.\d{2})")
+    mejor = math.inf
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for linea in texto.splitlines():
+            match = patron.match(linea)
+            if match:
+                float(match.group(3).replace(",", ""))
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def textos_de_entrada(formatos: List[str], tamanos: List[int]) -> Dict[Tuple[str, int], Dict]:
+    """Extrae una sola vez el texto de cada estado sintético, preparado para cada caso."""
+    entradas: Dict[Tuple[str, int], Dict] = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        for formato in formatos:
+            for tamano in tamanos:
+                ruta = os.path.join(directorio, f"{formato}-{tamano}.pdf")
+                generar_estado(formato, ruta, transacciones=tamano)
+                with pdfplumber.open(ruta) as pdf:
+                    entradas[(formato, tamano)] = {
+                        preparar: preparar(pdf.pages)
+                        for nombre, (f, preparar, _) in CASOS.items() if f == formato
+                    }
+    return entradas
+
+
+def pendiente_log_log(tamanos: List[int], tiempos: List[float]) -> float:
+    xs = [math.log(t) for t in tamanos]
+    ys = [math.log(max(t, 1e-9)) for t in tiempos]
+    media_x, media_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    covarianza = sum((x - media_x) * (y - media_y) for x, y in zip(xs, ys))
+    varianza = sum((x - media_x) ** 2 for x in xs)
+    return covarianza / varianza if varianza else 0.0
+
+
+def medir(funcion: Callable[[str], object], texto: str, repeticiones: int) -> float:
+    mejor = math.inf
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(texto)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def ejecutar(tamanos: List[int], repeticiones: int, casos: List[str]) -> Dict:
+    unidad = calibrar()
+    formatos = sorted({CASOS[nombre][0] for nombre in casos})
+    entradas = textos_de_entrada(formatos, tamanos)
+
+    resultados = {}
+    for nombre in casos:
+        formato, preparar, funcion = CASOS[nombre]
+        tiempos = [medir(funcion, entradas[(formato, tamano)][preparar], repeticiones) for tamano in tamanos]
+        resultados[nombre] = {
+            "tiempos_s": dict(zip(map(str, tamanos), tiempos)),
+            "normalizados": dict(zip(map(str, tamanos), (t / unidad for t in tiempos))),
+            "pendiente": pendiente_log_log(tamanos, tiempos),
+        }
+    return {"unidad_referencia_s": unidad, "tamanos": tamanos, "funciones": resultados}
+
+
+def verificar(actual: Dict, base: Dict, umbral: float, umbral_pendiente: float) -> List[str]:
+    """Regresiones de `actual` contra `base` (lista vacía si no hay)."""
+    fallas = []
+    for nombre, resultado in actual["funciones"].items():
+        previo = base["funciones"].get(nombre)
+        if not previo:
+            continue
+        if max(previo["tiempos_s"].values()) < MINIMO_COMPARABLE_S:
+            continue
+        for tamano, normalizado in resultado["normalizados"].items():
+            referencia = previo["normalizados"].get(tamano)
+            if previo["tiempos_s"].get(tamano, 0) < MINIMO_COMPARABLE_S:
+                continue
+            if referencia and normalizado > referencia * (1 + umbral):
+                fallas.append(f"{nombre} con {tamano} transacciones: x{normalizado / referencia:.2f} más lento que la base")
+        if resultado["pendiente"] > previo["pendiente"] + umbral_pendiente:
+            fallas.append(f"{nombre}: la pendiente de escalamiento subió de {previo['pendiente']:.2f} a {resultado['pendiente']:.2f}")
+    return fallas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", nargs="+", type=int, default=list(TAMANOS))
+    parser.add_argument("--repeticiones", type=int, default=9)
+    parser.add_argument("--funciones", nargs="+", default=list(CASOS), choices=list(CASOS))
+    parser.add_argument("--base", default=RUTA_BASE)
+    parser.add_argument("--guardar-base", action="store_true", help="Guarda esta corrida como la nueva base.")
+    parser.add_argument("--verificar", action="store_true", help="Falla si hay regresiones contra la base.")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION)
+    args = parser.parse_args()
+
+    actual = ejecutar(sorted(args.tamanos), args.repeticiones, args.funciones)
+
+    print(f"{'función':<62}" + "".join(f"{t:>10}" for t in actual["tamanos"]) + "  pendiente")
+    for nombre, resultado in actual["funciones"].items():
+        tiempos = "".join(f"{t * 1000:>8.2f}ms" for t in resultado["tiempos_s"].values())
+        aviso = "  <- super-lineal" if resultado["pendiente"] > 1.3 else ""
+        print(f"{nombre:<62}{tiempos}  {resultado['pendiente']:>6.2f}{aviso}")
+
+    if args.guardar_base:
+        with open(args.base, "w", encoding="utf-8") as archivo:
+            json.dump(actual, archivo, indent=2, ensure_ascii=False)
+        print(f"\nBase guardada en {args.base}")
+
+    if args.verificar:
+        with open(args.base, encoding="utf-8") as archivo:
+            fallas = verificar(actual, json.load(archivo), args.umbral, UMBRAL_PENDIENTE)
+        for falla in fallas:
+            print(f"REGRESIÓN: {falla}")
+        if fallas:
+            sys.exit(1)
+        print("\nSin regresiones contra la base.")
+
+
+if __name__ == "__main__":
+    main()
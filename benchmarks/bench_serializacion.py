@@ -0,0 +1,111 @@
+# benchmarks/bench_serializacion.py
+"""
+Compara el costo de serializar un resultado de análisis grande por el camino anterior
+(modelos Pydantic + model_dump + jsonable_encoder + json.dumps, lo que hace FastAPI por
+defecto) contra la respuesta directa con orjson de app/core/respuestas.py.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_serializacion --transacciones 10000 --repeticiones 5
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.respuestas import RespuestaAnalisis
+from app.schemas.analysis_bbva import AnalisisBbvaPDF
+from app.services.tabla_transacciones import TablaTransacciones, convertir_resultado
+
+
+def construir_resultado(transacciones: int, semilla: int = 0) -> Dict:
+    """Resultado sintético con la forma que devuelven los procesadores."""
+    rng = random.Random(semilla)
+    tabla = TablaTransacciones()
+    saldo = 100_000.0
+    for i in range(transacciones):
+        monto = round(rng.uniform(10, 5000), 2)
+        es_deposito = rng.random() < 0.5
+        saldo = round(saldo + monto if es_deposito else saldo - monto, 2)
+        tabla.agregar(
+            fecha=f"{1 + i * 30 // transacciones:02d}/ENE",
+            descripcion=f"SPEI {'RECIBIDO' if es_deposito else 'ENVIADO'} REF {100000 + i} BNET",
+            retiro=0.0 if es_deposito else monto,
+            deposito=monto if es_deposito else 0.0,
+            saldo=saldo,
+            tipo_movimiento="ingreso" if es_deposito else "gasto",
+            categoria="Transferencia SPEI Recibida" if es_deposito else "Transferencia SPEI Enviada",
+        )
+    return {
+        "nombre_archivo": "sintetico.pdf",
+        "banco": "bbva",
+        "fecha_corte": "31/01/2024",
+        "periodo": "DEL 01/01/2024 AL 31/01/2024",
+        "cuentas": [{
+            "nombre_cuenta": "MAESTRA PYME BBVA",
+            "numero_cuenta": "0123456789",
+            "moneda": "PESOS",
+            "saldo_anterior_resumen": 100_000.0,
+            "saldo_actual_resumen": saldo,
+            "total_ingresos": round(sum(tabla.depositos), 2),
+            "total_gastos": round(sum(tabla.retiros), 2),
+            "transacciones": tabla,
+        }],
+    }
+
+
+def camino_anterior(resultado: Dict) -> bytes:
+    """Validación Pydantic por fila + model_dump + jsonable_encoder + json.dumps."""
+    modelo = AnalisisBbvaPDF(**convertir_resultado(resultado))
+    contenido = jsonable_encoder(modelo.model_dump())
+    return json.dumps(contenido, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def camino_orjson(resultado: Dict) -> bytes:
+    return RespuestaAnalisis(resultado).body
+
+
+def medir(funcion: Callable[[Dict], bytes], resultado: Dict, repeticiones: int) -> Dict:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        cuerpo = funcion(resultado)
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    funcion(resultado)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "mejor_s": min(tiempos),
+        "mediana_s": sorted(tiempos)[len(tiempos) // 2],
+        "pico_memoria_mb": pico / 1024 / 1024,
+        "bytes": len(cuerpo),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transacciones", type=int, default=10_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    resultado = construir_resultado(args.transacciones)
+    assert json.loads(camino_anterior(resultado)) == json.loads(camino_orjson(resultado))
+
+    anterior = medir(camino_anterior, resultado, args.repeticiones)
+    nuevo = medir(camino_orjson, resultado, args.repeticiones)
+    print(json.dumps({
+        "transacciones": args.transacciones,
+        "anterior": anterior,
+        "orjson": nuevo,
+        "aceleracion": anterior["mejor_s"] / nuevo["mejor_s"],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+# benchmarks/carga.py
+"""
+Generador de carga asíncrono contra la API: cada usuario virtual inicia sesión y repite
+una mezcla de operaciones (subida de un estado de cuenta sintético, panel de usuario,
+historial e inicio de sesión) hasta agotar el tiempo o el número de peticiones.
+
+Reporta por operación la latencia p50/p95/p99, el throughput y los códigos de estado.
+Además mide:
+- Bloqueos del event loop: una sonda pide GET / (que no hace nada) cada 50 ms; si su
+  latencia sube con la carga, algo está bloqueando el loop.
+- Carreras de cuota: con --supabase-url (o --levantar) compara las subidas exitosas de cada
+  usuario contra el límite diario y contra el contador de conversiones del perfil; si no
+  coinciden, dos peticiones concurrentes leyeron el mismo contador.
+
+Con --levantar arranca el Supabase falso (benchmarks/supabase_falso.py) y la API con uvicorn
+como subprocesos, conectados entre sí, y los detiene al terminar.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.carga --levantar --usuarios 20 --duracion 30 --latencia-ms 40
+    python -m benchmarks.carga --url http://127.0.0.1:8000 --supabase-url http://127.0.0.1:54321 \\
+        --mezcla subida=1,panel=3,historial=1,login=1 --banco banorte --transacciones 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.estados_sinteticos import BANCOS_SOPORTADOS, generar_estado
+from benchmarks.supabase_falso import SECRETO_JWT_POR_OMISION, contrasena_usuario, correo_usuario
+
+MEZCLA_POR_OMISION = "subida=1,panel=3,historial=1,login=1"
+OPERACIONES = ("subida", "panel", "historial", "login")
+# Límite diario de conversiones de un usuario registrado (app/services/rate_limiter.py).
+LIMITE_DIARIO = 7
+INTERVALO_SONDA_S = 0.05
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil por rango más cercano (valores ya ordenados)."""
+    if not valores:
+        return float("nan")
+    indice = max(0, min(len(valores) - 1, int(round(p / 100 * len(valores) + 0.5)) - 1))
+    return valores[indice]
+
+
+def leer_mezcla(texto: str) -> Dict[str, float]:
+    mezcla = {}
+    for parte in texto.split(","):
+        operacion, _, peso = parte.partition("=")
+        if operacion.strip() not in OPERACIONES:
+            raise argparse.ArgumentTypeError(f"Operación desconocida: {operacion}. Use {', '.join(OPERACIONES)}.")
+        mezcla[operacion.strip()] = float(peso or 1)
+    return mezcla
+
+
+class Registro:
+    """Latencias y códigos de estado de todas las peticiones de la corrida."""
+
+    def __init__(self):
+        self.latencias: Dict[str, List[float]] = defaultdict(list)
+        self.estados: Dict[str, Counter] = defaultdict(Counter)
+        self.subidas_exitosas: Counter = Counter()
+
+    def anotar(self, operacion: str, latencia: float, estado: int) -> None:
+        self.latencias[operacion].append(latencia)
+        self.estados[operacion][estado] += 1
+
+    def resumen(self, duracion: float) -> Dict[str, Dict]:
+        resumen = {}
+        for operacion, latencias in sorted(self.latencias.items()):
+            ordenadas = sorted(latencias)
+            resumen[operacion] = {
+                "peticiones": len(ordenadas),
+                "por_s": len(ordenadas) / duracion,
+                "p50_ms": percentil(ordenadas, 50) * 1000,
+                "p95_ms": percentil(ordenadas, 95) * 1000,
+                "p99_ms": percentil(ordenadas, 99) * 1000,
+                "max_ms": ordenadas[-1] * 1000,
+                "estados": {str(estado): n for estado, n in sorted(self.estados[operacion].items())},
+            }
+        return resumen
+
+
+async def iniciar_sesion(cliente: httpx.AsyncClient, registro: Registro, numero: int) -> Tuple[Optional[str], Optional[str]]:
+    inicio = time.perf_counter()
+    respuesta = await cliente.post("/auth/login", json={
+        "email": correo_usuario(numero), "password": contrasena_usuario(numero),
+    })
+    registro.anotar("login", time.perf_counter() - inicio, respuesta.status_code)
+    if respuesta.status_code != 200:
+        return None, None
+    datos = respuesta.json()
+    return datos["access_token"], datos["user"]["id"]
+
+
+async def usuario_virtual(cliente: httpx.AsyncClient, registro: Registro, numero: int, mezcla: Dict[str, float],
+                          pdf: bytes, limite: float, peticiones: Optional[int], contador: Iterator[int],
+                          rng: random.Random) -> None:
+    token, id_usuario = await iniciar_sesion(cliente, registro, numero)
+    if not token:
+        return
+    operaciones, pesos = list(mezcla), list(mezcla.values())
+    serie = 0
+    while time.perf_counter() < limite and (peticiones is None or next(contador) < peticiones):
+        operacion = rng.choices(operaciones, pesos)[0]
+        cabeceras = {"Authorization": f"Bearer {token}"}
+        inicio = time.perf_counter()
+        try:
+            if operacion == "subida":
+                serie += 1
+                # Un nombre distinto por subida, como harían usuarios reales.
+                nombre = f"estado-{numero}-{serie}.pdf"
+                respuesta = await cliente.post("/analysis/process-pdf", headers=cabeceras,
+                                               files={"archivo": (nombre, pdf, "application/pdf")})
+                if respuesta.status_code == 200:
+                    registro.subidas_exitosas[id_usuario] += 1
+            elif operacion == "panel":
+                respuesta = await cliente.get("/user/panel-data", headers=cabeceras)
+            elif operacion == "historial":
+                respuesta = await cliente.get("/analysis/history", headers=cabeceras)
+            else:
+                nuevo_token, _ = await iniciar_sesion(cliente, registro, numero)
+                token = nuevo_token or token
+                continue
+            estado = respuesta.status_code
+        except httpx.HTTPError:
+            estado = 0  # Sin respuesta (timeout, conexión rechazada...).
+        registro.anotar(operacion, time.perf_counter() - inicio, estado)
+
+
+async def sonda_event_loop(cliente: httpx.AsyncClient, registro: Registro, detener: asyncio.Event) -> None:
+    while not detener.is_set():
+        inicio = time.perf_counter()
+        try:
+            respuesta = await cliente.get("/")
+            estado = respuesta.status_code
+        except httpx.HTTPError:
+            estado = 0
+        registro.anotar("sonda", time.perf_counter() - inicio, estado)
+        try:
+            await asyncio.wait_for(detener.wait(), INTERVALO_SONDA_S)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def carreras_de_cuota(supabase_url: str, registro: Registro) -> Dict:
+    async with httpx.AsyncClient(base_url=supabase_url) as cliente:
+        estado = (await cliente.get("/__estado")).json()
+    contadores = estado["conversiones_por_usuario"]
+    sobre_limite = {uid: n for uid, n in registro.subidas_exitosas.items() if n > LIMITE_DIARIO}
+    perdidas = {
+        uid: {"subidas": n, "contador": contadores.get(uid, 0)}
+        for uid, n in registro.subidas_exitosas.items() if contadores.get(uid, 0) < n
+    }
+    return {"usuarios_sobre_limite": sobre_limite, "actualizaciones_perdidas": perdidas,
+            "peticiones_a_supabase": estado["peticiones"]}
+
+
+async def ejecutar(args: argparse.Namespace, pdf: bytes) -> Dict:
+    registro = Registro()
+    limites = httpx.Limits(max_connections=args.usuarios + 1)
+    timeout = httpx.Timeout(args.timeout)
+    rng = random.Random(args.semilla)
+    contador = iter(range(sys.maxsize))
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limites, timeout=timeout) as cliente:
+        detener = asyncio.Event()
+        sonda = asyncio.create_task(sonda_event_loop(cliente, registro, detener))
+        inicio = time.perf_counter()
+        await asyncio.gather(*(
+            usuario_virtual(cliente, registro, numero, args.mezcla, pdf, inicio + args.duracion,
+                            args.peticiones, contador, random.Random(rng.random()))
+            for numero in range(args.usuarios)
+        ))
+        duracion = time.perf_counter() - inicio
+        detener.set()
+        await sonda
+
+    resultado = {
+        "parametros": {
+            "usuarios": args.usuarios, "duracion_s": args.duracion, "peticiones": args.peticiones,
+            "mezcla": args.mezcla, "banco": args.banco, "transacciones": args.transacciones,
+            "latencia_supabase_ms": args.latencia_ms,
+        },
+        "duracion_s": duracion,
+        "throughput_por_s": sum(len(l) for op, l in registro.latencias.items() if op != "sonda") / duracion,
+        "operaciones": registro.resumen(duracion),
+    }
+    if args.supabase_url:
+        resultado["cuota"] = await carreras_de_cuota(args.supabase_url, registro)
+    return resultado
+
+
+def imprimir(resultado: Dict) -> None:
+    print(f"{'operación':<10}{'peticiones':>11}{'por s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}  estados")
+    for operacion, datos in resultado["operaciones"].items():
+        estados = " ".join(f"{estado}:{n}" for estado, n in datos["estados"].items())
+        print(f"{operacion:<10}{datos['peticiones']:>11}{datos['por_s']:>8.1f}{datos['p50_ms']:>9.1f}"
+              f"{datos['p95_ms']:>9.1f}{datos['p99_ms']:>9.1f}{datos['max_ms']:>9.1f}  {estados}")
+    print(f"\nThroughput total: {resultado['throughput_por_s']:.1f} peticiones/s en {resultado['duracion_s']:.1f} s")
+    cuota = resultado.get("cuota")
+    if cuota:
+        print(f"Usuarios por encima del límite diario ({LIMITE_DIARIO}): {len(cuota['usuarios_sobre_limite'])}")
+        print(f"Usuarios con incrementos de cuota perdidos: {len(cuota['actualizaciones_perdidas'])}")
+
+
+def _esperar(url: str, proceso: subprocess.Popen, ruta: str = "/", espera_s: float = 30.0) -> None:
+    limite = time.monotonic() + espera_s
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"El proceso de {url} terminó con código {proceso.returncode}")
+        try:
+            httpx.get(url + ruta, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} no respondió en {espera_s:.0f} s")
+
+
+@contextmanager
+def entorno_local(args: argparse.Namespace) -> Iterator[None]:
+    """Arranca el Supabase falso y la API conectada a él; los detiene al salir."""
+    secreto = os.environ.get("SUPABASE_JWT_SECRET") or SECRETO_JWT_POR_OMISION
+    supabase_url = f"http://127.0.0.1:{args.puerto_supabase}"
+    entorno = {
+        **os.environ,
+        "SUPABASE_URL": supabase_url,
+        "SUPABASE_KEY": "clave-anonima-de-pruebas",
+        "SUPABASE_SERVICE_KEY": "clave-de-servicio-de-pruebas",
+        "SUPABASE_JWT_SECRET": secreto,
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+    }
+    procesos = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.supabase_falso", "--puerto", str(args.puerto_supabase),
+             "--usuarios", str(args.usuarios), "--latencia-ms", str(args.latencia_ms),
+             "--variacion-ms", str(args.variacion_ms), "--secreto-jwt", secreto],
+            cwd=RAIZ, env=entorno,
+        ),
+    ]
+    try:
+        _esperar(supabase_url, procesos[0], "/__estado")
+        procesos.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.puerto_api),
+             "--workers", str(args.workers), "--log-level", "warning"],
+            cwd=RAIZ, env=entorno,
+        ))
+        args.url = f"http://127.0.0.1:{args.puerto_api}"
+        args.supabase_url = supabase_url
+        _esperar(args.url, procesos[1])
+        yield
+    finally:
+        for proceso in reversed(procesos):
+            proceso.terminate()
+        for proceso in procesos:
+            try:
+                proceso.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proceso.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="URL base de la API.")
+    parser.add_argument("--supabase-url", help="URL del Supabase falso, para revisar las carreras de cuota.")
+    parser.add_argument("--levantar", action="store_true", help="Arranca el Supabase falso y la API localmente.")
+    parser.add_argument("--puerto-api", type=int, default=8765)
+    parser.add_argument("--puerto-supabase", type=int, default=54321)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--latencia-ms", type=float, default=20.0, help="Latencia de Supabase (solo con --levantar).")
+    parser.add_argument("--variacion-ms", type=float, default=10.0)
+    parser.add_argument("--usuarios", type=int, default=10, help="Usuarios virtuales concurrentes.")
+    parser.add_argument("--duracion", type=float, default=20.0, help="Segundos de carga.")
+    parser.add_argument("--peticiones", type=int, help="Detiene la carga tras este número de peticiones.")
+    parser.add_argument("--mezcla", type=leer_mezcla, default=leer_mezcla(MEZCLA_POR_OMISION))
+    parser.add_argument("--banco", default="bbva", choices=[b for b in BANCOS_SOPORTADOS if b != "santander"])
+    parser.add_argument("--transacciones", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--salida", help="Guarda el resultado en este archivo JSON.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "estado.pdf")
+        generar_estado(args.banco, ruta, transacciones=args.transacciones)
+        with open(ruta, "rb") as archivo:
+            pdf = archivo.read()
+
+    if args.levantar:
+        with entorno_local(args):
+            resultado = asyncio.run(ejecutar(args, pdf))
+    else:
+        resultado = asyncio.run(ejecutar(args, pdf))
+
+    imprimir(resultado)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,463 @@
+# benchmarks/estados_sinteticos.py
+"""
+Generador de estados de cuenta sintéticos en PDF para cada formato que parsean
+los procesadores (BBVA, BanBajío, Banorte, Banamex, Scotiabank y Santander).
+
+Los PDFs se escriben a mano (texto plano con Helvetica, sin dependencias
+externas) colocando cada columna en su coordenada X, de modo que tanto
+`extract_text` como `extract_words` de pdfplumber los lean igual que un
+estado de cuenta real. Los saldos se encadenan correctamente, así que los
+totales del resumen cuadran con los movimientos.
+"""
+import random
+from typing import Dict, List, Tuple
+
+# --- Métricas de Helvetica (por cada 1000 unidades) para alinear montos a la derecha ---
+_ANCHOS_HELVETICA = {c: 556 for c in "0123456789$"}
+_ANCHOS_HELVETICA.update({",": 278, ".": 278, " ": 278, "U": 722, "S": 667, "D": 722, "-": 333})
+
+TAMANO_FUENTE = 8
+ALTO_LINEA = 11
+Y_INICIAL = 770
+Y_MINIMO = 40
+
+MESES = ["ENE", "FEB", "MAR", "ABR", "MAY", "JUN", "JUL", "AGO", "SEP", "OCT", "NOV", "DIC"]
+MESES_LARGOS = ["ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO", "JULIO",
+                "AGOSTO", "SEPTIEMBRE", "OCTUBRE", "NOVIEMBRE", "DICIEMBRE"]
+
+BANCOS_SOPORTADOS = (
+    "bbva", "banbajio", "banorte", "banamex_personal",
+    "banamex_empresarial", "scotiabank", "santander",
+)
+
+LEYENDA_ANEXO = [
+    "INFORMACION IMPORTANTE PARA EL CLIENTE",
+    "Los cargos no reconocidos podran objetarse dentro de los 90 dias naturales siguientes.",
+    "La Unidad Especializada de Atencion a Usuarios atiende aclaraciones y reclamaciones.",
+    "Consulte los terminos y condiciones vigentes del contrato en nuestra pagina de internet.",
+    "Las comisiones se expresan en pesos e incluyen el Impuesto al Valor Agregado.",
+]
+
+Segmento = Tuple[float, str]
+Linea = List[Segmento]
+Pagina = List[Linea]
+
+
+def ancho_texto(texto: str) -> float:
+    """Ancho aproximado de un texto en puntos (suficiente para montos y etiquetas cortas)."""
+    return sum(_ANCHOS_HELVETICA.get(c, 600) for c in texto) * TAMANO_FUENTE / 1000
+
+
+def derecha(x_final: float, texto: str) -> Segmento:
+    """Segmento alineado a la derecha contra `x_final`, como las columnas de montos reales."""
+    return (x_final - ancho_texto(texto), texto)
+
+
+def formato_monto(valor: float, prefijo: str = "", sufijo: str = "") -> str:
+    return f"{prefijo}{valor:,.2f}{sufijo}"
+
+
+# --- SECCIÓN 1: ESCRITURA DEL PDF ---
+
+def _escapar(texto: str) -> bytes:
+    datos = texto.encode("cp1252", errors="replace")
+    return datos.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def escribir_pdf(paginas: List[Pagina], ruta: str) -> None:
+    """Escribe un PDF mínimo con una línea de texto por segmento."""
+    objetos: List[bytes] = []
+    objetos.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objetos.append(b"")  # Se rellena al final con los hijos.
+    objetos.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    ids_paginas = []
+    for pagina in paginas:
+        contenido = [b"BT", b"/F1 %d Tf" % TAMANO_FUENTE]
+        y = Y_INICIAL
+        for linea in pagina:
+            for x, texto in linea:
+                contenido.append(b"1 0 0 1 %.2f %.2f Tm (" % (x, y) + _escapar(texto) + b") Tj")
+            y -= ALTO_LINEA
+        contenido.append(b"ET")
+        flujo = b"\n".join(contenido)
+        objetos.append(b"<< /Length %d >>\nstream\n" % len(flujo) + flujo + b"\nendstream")
+        id_contenido = len(objetos)
+        objetos.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % id_contenido
+        )
+        ids_paginas.append(len(objetos))
+
+    hijos = b" ".join(b"%d 0 R" % i for i in ids_paginas)
+    objetos[1] = b"<< /Type /Pages /Kids [" + hijos + b"] /Count %d >>" % len(ids_paginas)
+
+    salida = bytearray(b"%PDF-1.4\n")
+    desplazamientos = []
+    for numero, objeto in enumerate(objetos, start=1):
+        desplazamientos.append(len(salida))
+        salida += b"%d 0 obj\n" % numero + objeto + b"\nendobj\n"
+    inicio_xref = len(salida)
+    salida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    for desplazamiento in desplazamientos:
+        salida += b"%010d 00000 n \n" % desplazamiento
+    salida += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref)
+
+    with open(ruta, "wb") as archivo:
+        archivo.write(salida)
+
+
+# --- SECCIÓN 2: MOVIMIENTOS SINTÉTICOS ---
+
+CONCEPTOS_DEPOSITO = {
+    "bbva": [("T20", "SPEI RECIBIDO BANORTE"), ("C02", "DEPOSITO EN EFECTIVO"), ("Y45", "DEPOSITO DE TERCERO")],
+    "banorte": ["DEPOSITO DE TERCEROS REF 00{n}", "DEPOSITO EN EFECTIVO SUC {n}"],
+    "scotiabank": ["DEPOSITO TRANSF INTERBANCARIA", "ABONO POR TRASPASO"],
+    "banbajio": ["DEPOSITO SPEI RECIBIDO", "DEPOSITO DE TRANSFERENCIA"],
+    "banamex_personal": ["PAGO RECIBIDO DE CLIENTE {n}"],
+    "banamex_empresarial": ["PAGO RECIBIDO CLIENTE {n}", "DEPOSITO EFECTIVO SUC {n}"],
+    "santander": ["DEPOSITO SPEI CLIENTE {n}"],
+}
+CONCEPTOS_RETIRO = {
+    "bbva": [("T17", "SPEI ENVIADO SANTANDER"), ("S39", "SERV BANCA INTERNET"), ("P14", "CFE SUMINISTRADOR")],
+    "banorte": ["COMPRA ORDEN DE PAGO SPEI {n}", "COMISION POR MANEJO DE CUENTA"],
+    "scotiabank": ["PAGO DE SERVICIO CFE", "CARGO POR CHEQUE PAGADO"],
+    "banbajio": ["ENVIO SPEI A TERCERO", "PAGO DE SERVICIO TELMEX", "COMISION POR TRANSFERENCIA"],
+    "banamex_personal": ["PAGO INTERBANCARIO CFE {n}", "DISPOSICIONES EN CAJERO {n}"],
+    "banamex_empresarial": ["TRASPASO REF {n} PROVEEDOR"],
+    "santander": ["PAGO PROVEEDOR {n}"],
+}
+
+
+def generar_movimientos(banco: str, cantidad: int, saldo_inicial: float, rng: random.Random,
+                        dias_periodo: int = 30) -> List[Dict]:
+    """Genera movimientos con saldos encadenados y fechas crecientes dentro del periodo."""
+    movimientos = []
+    saldo = saldo_inicial
+    for i in range(cantidad):
+        dia = 1 + (i * dias_periodo) // max(cantidad, 1)
+        monto = round(rng.uniform(10, 5000), 2)
+        es_deposito = rng.random() < 0.45 or saldo - monto < 0
+        opciones = CONCEPTOS_DEPOSITO[banco] if es_deposito else CONCEPTOS_RETIRO[banco]
+        concepto = opciones[i % len(opciones)]
+        if isinstance(concepto, tuple):
+            codigo, descripcion = concepto
+        else:
+            codigo, descripcion = "", concepto.format(n=1000 + i)
+        saldo = round(saldo + monto if es_deposito else saldo - monto, 2)
+        movimientos.append({
+            "dia": dia,
+            "codigo": codigo,
+            "descripcion": descripcion,
+            "deposito": monto if es_deposito else 0.0,
+            "retiro": 0.0 if es_deposito else monto,
+            "saldo": saldo,
+            "referencia": f"{100000 + i}",
+        })
+    return movimientos
+
+
+def _totales(saldo_inicial: float, movimientos: List[Dict]) -> Dict[str, float]:
+    return {
+        "saldo_inicial": saldo_inicial,
+        "depositos": round(sum(m["deposito"] for m in movimientos), 2),
+        "retiros": round(sum(m["retiro"] for m in movimientos), 2),
+        "saldo_final": movimientos[-1]["saldo"] if movimientos else saldo_inicial,
+        "num_depositos": sum(1 for m in movimientos if m["deposito"]),
+        "num_retiros": sum(1 for m in movimientos if m["retiro"]),
+    }
+
+
+def _paginar(filas: List[Linea], por_pagina: int) -> List[List[Linea]]:
+    return [filas[i:i + por_pagina] for i in range(0, len(filas), por_pagina)] or [[]]
+
+
+def _anexos(cantidad: int, encabezado: Linea) -> List[Pagina]:
+    paginas = []
+    for _ in range(cantidad):
+        pagina = [encabezado] + [[(40, texto)] for texto in LEYENDA_ANEXO * 8]
+        paginas.append(pagina)
+    return paginas
+
+
+# --- SECCIÓN 3: FORMATOS POR BANCO ---
+
+def _bbva(movimientos, totales, por_pagina):
+    encabezado = [(40, "Estado de Cuenta MAESTRA PYME BBVA"), (400, "No. de Cuenta 0123456789")]
+    columnas = [[(40, "FECHA"), (100, "COD."), (140, "DESCRIPCION"), (330, "CARGOS"),
+                 (400, "ABONOS"), (460, "SALDO"), (530, "LIQ")]]
+    primera = [
+        encabezado,
+        [(40, "Periodo DEL 01/01/2024 AL 31/01/2024")],
+        [(40, "Fecha de Corte 31/01/2024")],
+        [(40, "Comportamiento")],
+        [(40, "Saldo de Operación Inicial"), derecha(400, formato_monto(totales["saldo_inicial"]))],
+        [(40, "Depósitos / Abonos (+)"), (300, str(totales["num_depositos"])), derecha(400, formato_monto(totales["depositos"]))],
+        [(40, "Retiros / Cargos (-)"), (300, str(totales["num_retiros"])), derecha(400, formato_monto(totales["retiros"]))],
+        [(40, "Saldo Final (+)"), derecha(400, formato_monto(totales["saldo_final"]))],
+    ]
+    filas = []
+    for m in movimientos:
+        fecha = f"{m['dia']:02d}/ENE"
+        linea = [(40, f"{fecha} {fecha}"), (100, m["codigo"]), (140, m["descripcion"])]
+        if m["retiro"]:
+            linea.append(derecha(370, formato_monto(m["retiro"])))
+        else:
+            linea.append(derecha(440, formato_monto(m["deposito"])))
+        linea.append(derecha(510, formato_monto(m["saldo"])))
+        linea.append(derecha(580, formato_monto(m["saldo"])))
+        filas.append(linea)
+        filas.append([(140, f"REF. {m['referencia']} BNET")])
+    bloques = _paginar(filas, por_pagina)
+    paginas = []
+    for i, bloque in enumerate(bloques):
+        pagina = (primera if i == 0 else [encabezado, [(450, f"PAGINA {i + 1}")]])[:]
+        if i == 0:
+            pagina.append([(40, "Detalle de Movimientos Realizados")])
+        paginas.append(pagina + columnas + bloque)
+    paginas[-1].append([(40, "Total de Movimientos")])
+    return paginas, encabezado
+
+
+def _banorte(movimientos, totales, por_pagina):
+    encabezado = [(40, "ESTADO DE CUENTA / CUENTA PREFERENTE")]
+    columnas = [[(40, "FECHA"), (100, "DESCRIPCIÓN / ESTABLECIMIENTO"), (330, "MONTO DEL DEPOSITO"),
+                 (420, "MONTO DEL RETIRO"), (540, "SALDO")]]
+    primera = [
+        encabezado,
+        [(40, "Periodo Del 01/Enero/2024 al 31/Enero/2024")],
+        [(40, "Fecha de corte 31/Enero/2024")],
+        [(40, "CUENTA PREFERENTE 0123456789")],
+        [(40, "Moneda NACIONAL")],
+        [(40, "Saldo inicial del periodo $ " + formato_monto(totales["saldo_inicial"]))],
+        [(40, "Total de depósitos $ " + formato_monto(totales["depositos"]))],
+        [(40, "Total de retiros $ " + formato_monto(totales["retiros"]))],
+        [(40, "Saldo actual $ " + formato_monto(totales["saldo_final"]))],
+    ]
+    filas = [[(40, "01-ENE-24"), (100, "SALDO ANTERIOR"), derecha(570, formato_monto(totales["saldo_inicial"]))]]
+    for m in movimientos:
+        linea = [(40, f"{m['dia']:02d}-ENE-24"), (100, m["descripcion"])]
+        if m["deposito"]:
+            linea.append(derecha(400, formato_monto(m["deposito"])))
+        else:
+            linea.append(derecha(490, formato_monto(m["retiro"])))
+        linea.append(derecha(570, formato_monto(m["saldo"])))
+        filas.append(linea)
+    bloques = _paginar(filas, por_pagina)
+    paginas = []
+    for i, bloque in enumerate(bloques):
+        pagina = primera[:] if i == 0 else [encabezado]
+        pagina.append([(40, "DETALLE DE MOVIMIENTOS (PESOS)")])
+        paginas.append(pagina + columnas + bloque)
+    return paginas, encabezado
+
+
+def _scotiabank(movimientos, totales, por_pagina):
+    encabezado = [(40, "Scotiabank"), (200, "CU PYME PFAE PQ")]
+    columnas = [[(40, "Fecha"), (90, "Concepto"), (330, "Depósito"), (420, "Retiro"), (530, "Saldo")]]
+    primera = [
+        encabezado,
+        [(40, "Periodo 01-ENE-24/31-ENE-24")],
+        [(40, "Fecha de corte 31-ENE-24")],
+        [(40, "CLABE 044180001234567890")],
+        [(40, "Saldo inicial = $" + formato_monto(totales["saldo_inicial"]))],
+        [(40, "(+) Depósitos $" + formato_monto(totales["depositos"]))],
+        [(40, "(-) Retiros $" + formato_monto(totales["retiros"]))],
+        [(40, "Saldo final de la cuenta = $" + formato_monto(totales["saldo_final"]))],
+    ]
+    filas = []
+    for m in movimientos:
+        linea = [(40, f"{m['dia']:02d} ENE"), (90, m["descripcion"])]
+        if m["deposito"]:
+            linea.append(derecha(370, formato_monto(m["deposito"], "$")))
+        else:
+            linea.append(derecha(460, formato_monto(m["retiro"], "$")))
+        linea.append(derecha(570, formato_monto(m["saldo"], "$")))
+        filas.append(linea)
+        filas.append([(90, f"ORIGEN: CLAVE {m['referencia']}")])
+    bloques = _paginar(filas, por_pagina)
+    paginas = []
+    for i, bloque in enumerate(bloques):
+        pagina = primera[:] if i == 0 else [encabezado]
+        pagina.append([(40, "Detalle de tus movimientos")])
+        paginas.append(pagina + columnas + bloque + [[(40, "LAS TASAS DE INTERES ESTAN EXPRESADAS EN TERMINOS ANUALES")]])
+    return paginas, encabezado
+
+
+def _banbajio(movimientos, totales, por_pagina, movimientos_usd, totales_usd):
+    encabezado = [(40, "ESTADO DE CUENTA BANCO DEL BAJIO S.A.")]
+    columnas = [[(40, "FECHA"), (80, "NO. REF."), (150, "DESCRIPCION"), (350, "DEPOSITOS"),
+                 (430, "RETIROS"), (530, "SALDO")]]
+    primera = [
+        encabezado,
+        [(40, "PERIODO: 1 DE ENERO AL 31 DE ENERO DE 2024")],
+        [(40, "FECHA DE CORTE 31 ENERO 2024")],
+        [(40, "RESUMEN CUENTA CONECTA BANBAJIO")],
+        [(40, "SALDO ANTERIOR"), (150, "(+) DEPOSITOS"), (260, "(-) CARGOS"), (370, "SALDO ACTUAL")],
+        [(40, formato_monto(totales["saldo_inicial"], "$ ")), (150, formato_monto(totales["depositos"], "$ ")),
+         (260, formato_monto(totales["retiros"], "$ ")), (370, formato_monto(totales["saldo_final"], "$ "))],
+        [(40, "DETALLE DE LA CUENTA: CUENTA CONECTA BANBAJIO #0123456")],
+    ]
+
+    def filas_de(movs, saldo_inicial, sufijo, prefijo):
+        filas = [[(150, "SALDO INICIAL"), derecha(570, formato_monto(saldo_inicial, prefijo, sufijo))]]
+        for m in movs:
+            linea = [(40, f"{m['dia']} ENE"), (80, m["referencia"]), (150, m["descripcion"])]
+            if m["deposito"]:
+                linea.append(derecha(400, formato_monto(m["deposito"], prefijo, sufijo)))
+            else:
+                linea.append(derecha(480, formato_monto(m["retiro"], prefijo, sufijo)))
+            linea.append(derecha(570, formato_monto(m["saldo"], prefijo, sufijo)))
+            filas.append(linea)
+        return filas
+
+    paginas = []
+    for i, bloque in enumerate(_paginar(filas_de(movimientos, totales["saldo_inicial"], "", "$ "), por_pagina)):
+        pagina = primera[:] if i == 0 else [encabezado]
+        paginas.append(pagina + columnas + bloque + [[(450, f"PAGINA {len(paginas) + 1}")]])
+
+    if movimientos_usd is not None:
+        resumen_usd = [
+            encabezado,
+            [(40, "CUENTA DE CHEQUES EN DOLARES")],
+            [(40, "SALDO ANTERIOR"), (150, "(+) DEPOSITOS"), (260, "(-) CARGOS"), (370, "SALDO ACTUAL")],
+            [(40, formato_monto(totales_usd["saldo_inicial"], "", " USD")), (150, formato_monto(totales_usd["depositos"], "", " USD")),
+             (260, formato_monto(totales_usd["retiros"], "", " USD")), (370, formato_monto(totales_usd["saldo_final"], "", " USD"))],
+            [(40, "DETALLE DE LA CUENTA: CUENTA DE CHEQUES EN DOLARES #7654321")],
+        ]
+        for i, bloque in enumerate(_paginar(filas_de(movimientos_usd, totales_usd["saldo_inicial"], " USD", ""), por_pagina)):
+            pagina = resumen_usd[:] if i == 0 else [encabezado]
+            paginas.append(pagina + columnas + bloque + [[(450, f"PAGINA {len(paginas) + 1}")]])
+    return paginas, encabezado
+
+
+def _banamex(movimientos, totales, por_pagina, empresarial: bool):
+    encabezado = [(40, "ESTADO DE CUENTA AL 31 DE ENERO DE 2024")]
+    columnas = [[(40, "FECHA"), (90, "CONCEPTO"), (360, "RETIROS"), (440, "DEPOSITOS"), (540, "SALDO")]]
+    if empresarial:
+        resumen = [
+            [(40, "RESUMEN GENERAL")],
+            [(40, "Cuenta de Cheques Moneda Nacional 1234567890")],
+            [(40, "Saldo Anterior $" + formato_monto(totales["saldo_inicial"]))],
+            [(40, "SALDO AL 31 DE ENERO DE 2024 $" + formato_monto(totales["saldo_final"]))],
+            [(40, "RESUMEN DEL: 01 DE ENERO AL 31 DE ENERO DE 2024")],
+            [(40, f"{totales['num_depositos']} Depósitos"), derecha(300, formato_monto(totales["depositos"]))],
+            [(40, f"{totales['num_retiros']} Retiros"), derecha(300, formato_monto(totales["retiros"]))],
+            [(40, "RESUMEN POR MEDIOS DE ACCESO")],
+            [(40, "Cheques y Transferencias"), derecha(300, formato_monto(totales["retiros"], "$")),
+             derecha(400, formato_monto(totales["depositos"], "$"))],
+        ]
+    else:
+        resumen = [
+            [(40, "RESUMEN GENERAL")],
+            [(40, "MiCuenta 1234567890")],
+            [(40, "Saldo Anterior $" + formato_monto(totales["saldo_inicial"]))],
+            [(40, "SALDO AL 31 DE ENERO DE 2024 $" + formato_monto(totales["saldo_final"]))],
+            [(40, "RESUMEN DEL 01 DE ENERO AL 31 DE ENERO DE 2024")],
+            [(40, f"{totales['num_depositos']} Depósitos $" + formato_monto(totales["depositos"]))],
+            [(40, f"{totales['num_retiros']} Retiros $" + formato_monto(totales["retiros"]))],
+            [(40, "RESUMEN POR MEDIOS DE ACCESO")],
+            [(40, "Sucursal"), derecha(300, formato_monto(totales["retiros"], "$")),
+             derecha(400, formato_monto(totales["depositos"], "$"))],
+        ]
+    if empresarial:
+        filas = [[(90, "SALDO ANTERIOR"), derecha(570, formato_monto(totales["saldo_inicial"]))]]
+    else:
+        filas = [[(40, "01 ENE"), (90, "SALDO ANTERIOR"), derecha(570, formato_monto(totales["saldo_inicial"]))]]
+    for m in movimientos:
+        linea = [(40, f"{m['dia']:02d} ENE"), (90, m["descripcion"])]
+        if m["retiro"]:
+            linea.append(derecha(400, formato_monto(m["retiro"])))
+        else:
+            linea.append(derecha(480, formato_monto(m["deposito"])))
+        linea.append(derecha(570, formato_monto(m["saldo"])))
+        filas.append(linea)
+    paginas = [[encabezado] + resumen]
+    bloques = _paginar(filas, por_pagina)
+    for i, bloque in enumerate(bloques):
+        pagina = [encabezado, [(40, "DETALLE DE OPERACIONES")]] + columnas + bloque
+        if empresarial and i == len(bloques) - 1:
+            pagina.append([(40, "SALDO MINIMO REQUERIDO 0.00")])
+        paginas.append(pagina)
+    return paginas, encabezado
+
+
+def _santander(movimientos, totales, por_pagina):
+    encabezado = [(40, "BANCO SANTANDER MÉXICO, S.A. SANTANDER SELECT")]
+    primera = [
+        encabezado,
+        [(40, "PERIODO DEL 01-ENE-2024 AL 31-ENE-2024")],
+        [(40, "Saldo inicial"), derecha(300, formato_monto(totales["saldo_inicial"]))],
+        [(40, "+Depósitos"), derecha(300, formato_monto(totales["depositos"]))],
+        [(40, "- Retiros"), derecha(300, formato_monto(totales["retiros"]))],
+        [(40, "= Saldo final"), derecha(300, formato_monto(totales["saldo_final"]))],
+        [(40, "Detalle de movimientos cuenta de cheques")],
+    ]
+    filas = []
+    for m in movimientos:
+        linea = [(40, f"{m['dia']:02d}-ENE-2024"), (110, m["referencia"]), (170, m["descripcion"])]
+        if m["deposito"]:
+            linea.append(derecha(400, formato_monto(m["deposito"])))
+        else:
+            linea.append(derecha(480, formato_monto(m["retiro"])))
+        linea.append(derecha(570, formato_monto(m["saldo"])))
+        filas.append(linea)
+    bloques = _paginar(filas, por_pagina)
+    paginas = []
+    for i, bloque in enumerate(bloques):
+        pagina = primera[:] if i == 0 else [encabezado]
+        paginas.append(pagina + bloque)
+    paginas[-1] += [[(40, "Detalles de movimientos Dinero Creciente Santander")], [(40, "Información fiscal")]]
+    return paginas, encabezado
+
+
+def generar_estado(banco: str, ruta: str, transacciones: int = 100, paginas: int = 0,
+                   movimientos_por_pagina: int = 40, semilla: int = 0, pie: str = "") -> Dict:
+    """
+    Genera un estado de cuenta sintético en `ruta`.
+
+    Si `paginas` es mayor que las páginas necesarias para los movimientos, el resto
+    se rellena con anexos legales (páginas sin movimientos). Devuelve los totales
+    esperados para poder validar la salida de los procesadores. Con `pie` se agrega esa línea al
+    final de la última página de movimientos (p. ej. una leyenda del pie de página del banco).
+    """
+    if banco not in BANCOS_SOPORTADOS:
+        raise ValueError(f"Formato no soportado: {banco}")
+
+    rng = random.Random(semilla)
+    saldo_inicial = round(rng.uniform(10_000, 50_000), 2)
+    clave = banco if banco in CONCEPTOS_DEPOSITO else "banamex_personal"
+    movimientos = generar_movimientos(clave, transacciones, saldo_inicial, rng)
+    totales = _totales(saldo_inicial, movimientos)
+    esperado = {"banco": banco, "transacciones": transacciones, "cuentas": [totales]}
+
+    if banco == "bbva":
+        contenido, encabezado = _bbva(movimientos, totales, movimientos_por_pagina // 2)
+    elif banco == "banorte":
+        contenido, encabezado = _banorte(movimientos, totales, movimientos_por_pagina)
+    elif banco == "scotiabank":
+        contenido, encabezado = _scotiabank(movimientos, totales, movimientos_por_pagina // 2)
+    elif banco == "banbajio":
+        # La sección en dólares lleva una décima parte de los movimientos.
+        cantidad_usd = max(transacciones // 10, 1)
+        saldo_usd = round(rng.uniform(1_000, 5_000), 2)
+        movimientos_usd = generar_movimientos("banbajio", cantidad_usd, saldo_usd, rng)
+        totales_usd = _totales(saldo_usd, movimientos_usd)
+        esperado["cuentas"].append(totales_usd)
+        esperado["transacciones"] += cantidad_usd
+        contenido, encabezado = _banbajio(movimientos, totales, movimientos_por_pagina,
+                                          movimientos_usd, totales_usd)
+    elif banco == "banamex_personal":
+        contenido, encabezado = _banamex(movimientos, totales, movimientos_por_pagina, empresarial=False)
+    elif banco == "banamex_empresarial":
+        contenido, encabezado = _banamex(movimientos, totales, movimientos_por_pagina, empresarial=True)
+    else:
+        contenido, encabezado = _santander(movimientos, totales, movimientos_por_pagina)
+
+    if pie:
+        contenido[-1].append([(40, pie)])
+    faltantes = max(paginas - len(contenido), 0)
+    contenido += _anexos(faltantes, encabezado)
+    escribir_pdf(contenido, ruta)
+    esperado["paginas"] = len(contenido)
+    return esperado
@@ -0,0 +1,261 @@
+# benchmarks/supabase_falso.py
+"""
+Sustituto local de Supabase para pruebas de carga: implementa en memoria lo que usa
+app/services/supabase_client.py, sin tocar el proyecto real.
+
+- Auth (GoTrue): POST /auth/v1/signup, POST /auth/v1/token?grant_type=password y
+  GET /auth/v1/user. Los tokens son JWT HS256 firmados con SUPABASE_JWT_SECRET y con
+  audience "authenticated", igual que los reales, así que la API los acepta sin cambios.
+- PostgREST: /rest/v1/profiles y /rest/v1/analysis_history con select, filtros eq.,
+  order, limit, insert y update, incluyendo .single() (Accept: application/vnd.pgrst.object+json,
+  406 con PGRST116 si no hay exactamente una fila).
+
+Cada respuesta se retrasa `latencia_ms` ± `variacion_ms` para simular la red hasta Supabase.
+Al arrancar se crean `usuarios` cuentas usuario<N>@carga.example.com con contraseña "carga-<N>",
+cada una con su perfil.
+
+GET /__estado devuelve conteos del estado interno (para detectar carreras de cuota).
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.supabase_falso --puerto 54321 --latencia-ms 40 --variacion-ms 20
+Y la API con SUPABASE_URL=http://127.0.0.1:54321 y el mismo SUPABASE_JWT_SECRET.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from jose import jwt
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+SECRETO_JWT_POR_OMISION = "secreto-de-pruebas-de-carga"
+MEDIA_TYPE_OBJETO = "application/vnd.pgrst.object+json"
+DURACION_TOKEN_S = 3600
+
+
+def correo_usuario(numero: int) -> str:
+    return f"usuario{numero}@carga.example.com"
+
+
+def contrasena_usuario(numero: int) -> str:
+    return f"carga-{numero}"
+
+
+def _ahora() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class SupabaseFalso:
+    """Estado en memoria (usuarios y tablas) y las rutas que lo exponen."""
+
+    def __init__(self, secreto_jwt: str, latencia_ms: float = 0.0, variacion_ms: float = 0.0,
+                 usuarios: int = 0, semilla: Optional[int] = None):
+        self.secreto_jwt = secreto_jwt
+        self.latencia_ms = latencia_ms
+        self.variacion_ms = variacion_ms
+        self._aleatorio = random.Random(semilla)
+        # correo -> {"id", "email", "password", "created_at"}
+        self.usuarios: Dict[str, Dict[str, Any]] = {}
+        self.tablas: Dict[str, List[Dict[str, Any]]] = {"profiles": [], "analysis_history": []}
+        self.peticiones = 0
+        for numero in range(usuarios):
+            self.crear_usuario(correo_usuario(numero), contrasena_usuario(numero))
+
+    # --- Datos ---
+
+    def crear_usuario(self, correo: str, contrasena: str) -> Dict[str, Any]:
+        usuario = {"id": str(uuid.uuid4()), "email": correo, "password": contrasena, "created_at": _ahora()}
+        self.usuarios[correo] = usuario
+        # En el proyecto real lo hace un trigger de la base de datos.
+        self.tablas["profiles"].append({
+            "id": usuario["id"],
+            "plan_activo": "gratis",
+            "conversions_tokens": 7,
+            "daily_conversions_count": 0,
+            "last_conversion_at": None,
+        })
+        return usuario
+
+    def _usuario_publico(self, usuario: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": usuario["id"],
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": usuario["email"],
+            "app_metadata": {"provider": "email"},
+            "user_metadata": {},
+            "created_at": usuario["created_at"],
+        }
+
+    def _sesion(self, usuario: Dict[str, Any]) -> Dict[str, Any]:
+        emitido = int(time.time())
+        token = jwt.encode(
+            {"sub": usuario["id"], "aud": "authenticated", "role": "authenticated",
+             "email": usuario["email"], "iat": emitido, "exp": emitido + DURACION_TOKEN_S},
+            self.secreto_jwt,
+            algorithm="HS256",
+        )
+        return {
+            "access_token": token,
+            "token_type": "bearer",
+            "expires_in": DURACION_TOKEN_S,
+            "expires_at": emitido + DURACION_TOKEN_S,
+            "refresh_token": uuid.uuid4().hex,
+            "user": self._usuario_publico(usuario),
+        }
+
+    async def _latencia(self) -> None:
+        self.peticiones += 1
+        retraso = self.latencia_ms + self._aleatorio.uniform(-self.variacion_ms, self.variacion_ms)
+        if retraso > 0:
+            await asyncio.sleep(retraso / 1000)
+
+    # --- Auth (GoTrue) ---
+
+    @staticmethod
+    def _error_auth(estado: int, codigo: str, mensaje: str) -> JSONResponse:
+        return JSONResponse({"code": estado, "error_code": codigo, "msg": mensaje}, status_code=estado)
+
+    async def registrar(self, request: Request) -> Response:
+        await self._latencia()
+        datos = await request.json()
+        if datos.get("email") in self.usuarios:
+            return self._error_auth(422, "user_already_exists", "User already registered")
+        usuario = self.crear_usuario(datos["email"], datos["password"])
+        return JSONResponse(self._usuario_publico(usuario))
+
+    async def token(self, request: Request) -> Response:
+        await self._latencia()
+        if request.query_params.get("grant_type") != "password":
+            return self._error_auth(400, "unsupported_grant_type", "Solo se simula grant_type=password")
+        datos = await request.json()
+        usuario = self.usuarios.get(datos.get("email"))
+        if not usuario or usuario["password"] != datos.get("password"):
+            return self._error_auth(400, "invalid_credentials", "Invalid login credentials")
+        return JSONResponse(self._sesion(usuario))
+
+    async def usuario_actual(self, request: Request) -> Response:
+        await self._latencia()
+        token = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        try:
+            payload = jwt.decode(token, self.secreto_jwt, algorithms=["HS256"], audience="authenticated")
+        except Exception:
+            return self._error_auth(401, "bad_jwt", "invalid JWT")
+        usuario = next((u for u in self.usuarios.values() if u["id"] == payload.get("sub")), None)
+        if not usuario:
+            return self._error_auth(404, "user_not_found", "User not found")
+        return JSONResponse(self._usuario_publico(usuario))
+
+    # --- PostgREST ---
+
+    def _filtrar(self, filas: List[Dict[str, Any]], request: Request) -> List[Dict[str, Any]]:
+        for columna, condicion in request.query_params.multi_items():
+            if columna in ("select", "order", "limit", "offset", "columns"):
+                continue
+            operador, _, valor = condicion.partition(".")
+            if operador != "eq":
+                raise ValueError(f"Operador no simulado: {operador}")
+            filas = [fila for fila in filas if str(fila.get(columna)) == valor]
+        return filas
+
+    @staticmethod
+    def _proyectar(fila: Dict[str, Any], select: Optional[str]) -> Dict[str, Any]:
+        if not select or select == "*":
+            return dict(fila)
+        return {columna.strip(): fila.get(columna.strip()) for columna in select.split(",")}
+
+    @staticmethod
+    def _error_rest(estado: int, codigo: str, mensaje: str) -> JSONResponse:
+        return JSONResponse({"code": codigo, "details": None, "hint": None, "message": mensaje}, status_code=estado)
+
+    def _respuesta_filas(self, request: Request, filas: List[Dict[str, Any]], estado: int = 200) -> Response:
+        if MEDIA_TYPE_OBJETO in request.headers.get("accept", ""):
+            if len(filas) != 1:
+                return self._error_rest(406, "PGRST116", "JSON object requested, multiple (or no) rows returned")
+            return JSONResponse(filas[0], status_code=estado)
+        return JSONResponse(filas, status_code=estado)
+
+    async def tabla(self, request: Request) -> Response:
+        await self._latencia()
+        nombre = request.path_params["tabla"]
+        if nombre not in self.tablas:
+            return self._error_rest(404, "42P01", f'relation "public.{nombre}" does not exist')
+        filas = self.tablas[nombre]
+        try:
+            if request.method == "GET":
+                seleccion = self._filtrar(filas, request)
+                orden = request.query_params.get("order")
+                if orden:
+                    columna, _, direccion = orden.partition(".")
+                    seleccion = sorted(seleccion, key=lambda fila: fila.get(columna) or "",
+                                       reverse=direccion.startswith("desc"))
+                if "limit" in request.query_params:
+                    seleccion = seleccion[:int(request.query_params["limit"])]
+                select = request.query_params.get("select")
+                return self._respuesta_filas(request, [self._proyectar(fila, select) for fila in seleccion])
+
+            if request.method == "POST":
+                datos = await request.json()
+                nuevas = []
+                for fila in datos if isinstance(datos, list) else [datos]:
+                    nueva = {"id": str(uuid.uuid4()), "created_at": _ahora(), **fila}
+                    filas.append(nueva)
+                    nuevas.append(nueva)
+                return self._respuesta_filas(request, nuevas, estado=201)
+
+            if request.method == "PATCH":
+                datos = await request.json()
+                seleccion = self._filtrar(filas, request)
+                for fila in seleccion:
+                    fila.update(datos)
+                return self._respuesta_filas(request, [dict(fila) for fila in seleccion])
+        except ValueError as e:
+            return self._error_rest(400, "PGRST100", str(e))
+        return self._error_rest(405, "PGRST105", f"Método no simulado: {request.method}")
+
+    async def estado(self, request: Request) -> Response:
+        """Estado interno para el generador de carga (no existe en Supabase)."""
+        return JSONResponse({
+            "peticiones": self.peticiones,
+            "usuarios": len(self.usuarios),
+            "historial": len(self.tablas["analysis_history"]),
+            "conversiones_por_usuario": {
+                perfil["id"]: perfil["daily_conversions_count"] for perfil in self.tablas["profiles"]
+            },
+        })
+
+    def app(self) -> Starlette:
+        return Starlette(routes=[
+            Route("/auth/v1/signup", self.registrar, methods=["POST"]),
+            Route("/auth/v1/token", self.token, methods=["POST"]),
+            Route("/auth/v1/user", self.usuario_actual, methods=["GET"]),
+            Route("/rest/v1/{tabla}", self.tabla, methods=["GET", "POST", "PATCH"]),
+            Route("/__estado", self.estado, methods=["GET"]),
+        ])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=54321)
+    parser.add_argument("--latencia-ms", type=float, default=0.0)
+    parser.add_argument("--variacion-ms", type=float, default=0.0)
+    parser.add_argument("--usuarios", type=int, default=50)
+    parser.add_argument("--semilla", type=int)
+    parser.add_argument("--secreto-jwt", default=os.environ.get("SUPABASE_JWT_SECRET") or SECRETO_JWT_POR_OMISION)
+    args = parser.parse_args()
+
+    falso = SupabaseFalso(args.secreto_jwt, args.latencia_ms, args.variacion_ms, args.usuarios, args.semilla)
+    uvicorn.run(falso.app(), host=args.host, port=args.puerto, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
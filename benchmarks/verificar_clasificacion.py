@@ -0,0 +1,132 @@
+# benchmarks/verificar_clasificacion.py
+"""
+Verificación de la clasificación previa de páginas (app/services/clasificacion.py).
+
+Cada documento se analiza completo (identificación y procesador, como en el endpoint) dos veces:
+extrayendo todas las páginas, como antes de la clasificación, y con la clasificación, que
+identifica el documento con su primera página y no extrae las páginas de relleno. Los
+resultados serializados deben ser idénticos byte a byte. Se informa la clase de cada página y
+el tiempo de cada modo.
+
+Los documentos son estados sintéticos de cada banco con la mitad de sus páginas de anexos
+legales (benchmarks/estados_sinteticos.py) o, con --directorio, los PDFs de un directorio.
+Falla (código de salida 1) si algún resultado difiere.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.verificar_clasificacion
+    python -m benchmarks.verificar_clasificacion --bancos banorte --transacciones 2000 --anexos 3
+    python -m benchmarks.verificar_clasificacion --directorio /ruta/a/estados
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+from app.core.respuestas import serializar
+from app.services import analizador, clasificacion, extraccion, metricas
+from app.services.tabla_transacciones import convertir_resultado
+from benchmarks.estados_sinteticos import generar_estado
+from benchmarks.verificar_motores import BANCOS
+
+TRANSACCIONES = (40, 400, 2000)
+# Páginas de anexos por cada página con movimientos.
+ANEXOS = 1.0
+
+
+@contextmanager
+def sin_clasificacion() -> Iterator[None]:
+    """Extrae todas las páginas, para identificar y en los procesadores, mientras dura el bloque."""
+    previo = clasificacion.CLASIFICAR_PAGINAS, analizador.PAGINAS_IDENTIFICACION
+    clasificacion.CLASIFICAR_PAGINAS = False
+    analizador.PAGINAS_IDENTIFICACION = sys.maxsize
+    try:
+        yield
+    finally:
+        clasificacion.CLASIFICAR_PAGINAS, analizador.PAGINAS_IDENTIFICACION = previo
+
+
+def analizar(ruta_pdf: str) -> Tuple[bytes, float]:
+    """Resultado serializado del análisis (o el error, si lo hubo) y su duración."""
+    inicio = time.perf_counter()
+    try:
+        salida = serializar(convertir_resultado(analizador.analizar_documento(ruta_pdf)))
+    except analizador.ErrorAnalisis as e:
+        salida = f"ErrorAnalisis({e.resultado}): {e.detalle}".encode()
+    return salida, time.perf_counter() - inicio
+
+
+def paginas_por_clase() -> Counter:
+    valores = metricas.instantanea().get(metricas.PAGINAS_CLASIFICADAS.nombre, {})
+    clases = Counter()
+    for clave, cantidad in valores.items():
+        clases[clave[-1]] += cantidad
+    return clases
+
+
+def verificar(casos: List[Tuple[str, str]]) -> List[str]:
+    fallas = []
+    total_antes = total_despues = 0.0
+    for nombre, ruta in casos:
+        with sin_clasificacion():
+            antes, duracion_antes = analizar(ruta)
+        metricas.reiniciar()
+        despues, duracion_despues = analizar(ruta)
+        clases = paginas_por_clase()
+        total_antes += duracion_antes
+        total_despues += duracion_despues
+        iguales = antes == despues
+        print(f"{nombre:<34} resumen {clases[clasificacion.RESUMEN]:>3}  movimientos {clases[clasificacion.MOVIMIENTOS]:>4}  "
+              f"relleno {clases[clasificacion.RELLENO]:>4}   {duracion_antes:>6.2f} s -> {duracion_despues:>6.2f} s  "
+              f"resultado {'igual' if iguales else 'DISTINTO'}")
+        if not iguales:
+            fallas.append(f"{nombre}: el resultado cambia con la clasificación")
+    print(f"\nTotal: {total_antes:.2f} s sin clasificación, {total_despues:.2f} s con clasificación "
+          f"({total_antes / total_despues:.1f}x)")
+    return fallas
+
+
+def casos_sinteticos(directorio: str, bancos: List[str], transacciones: List[int], anexos: float) -> List[Tuple[str, str]]:
+    casos = []
+    for banco in bancos:
+        for cantidad in transacciones:
+            nombre = f"{banco}-{cantidad}"
+            ruta = os.path.join(directorio, nombre + ".pdf")
+            # Primero sin anexos, para saber cuántas páginas ocupan los movimientos.
+            generar_estado(banco, ruta, transacciones=cantidad)
+            with extraccion.abrir(ruta) as documento:
+                paginas = documento.numero_paginas()
+            generar_estado(banco, ruta, transacciones=cantidad, paginas=paginas + max(1, round(paginas * anexos)))
+            casos.append((nombre, ruta))
+    return casos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bancos", nargs="+", default=list(BANCOS), choices=list(BANCOS))
+    parser.add_argument("--transacciones", nargs="+", type=int, default=list(TRANSACCIONES))
+    parser.add_argument("--anexos", type=float, default=ANEXOS, help="Páginas de anexos por página con movimientos.")
+    parser.add_argument("--directorio", help="Verifica los PDFs de este directorio en lugar de los sintéticos.")
+    args = parser.parse_args()
+
+    if args.directorio:
+        casos = [(nombre, os.path.join(args.directorio, nombre))
+                 for nombre in sorted(os.listdir(args.directorio)) if nombre.lower().endswith(".pdf")]
+        fallas = verificar(casos)
+    else:
+        with tempfile.TemporaryDirectory() as directorio:
+            casos = casos_sinteticos(directorio, args.bancos, args.transacciones, args.anexos)
+            fallas = verificar(casos)
+
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    if fallas:
+        sys.exit(1)
+    print(f"\n{len(casos)} documentos con el mismo resultado con y sin clasificación.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# benchmarks/verificar_conciliacion.py
+"""
+Verificación de la conciliación de transacciones (app/services/conciliacion.py).
+
+1. Estados sintéticos de cada banco (benchmarks/estados_sinteticos.py) analizados completos:
+   todas sus cuentas deben cuadrar con confianza 1.
+2. Errores inyectados en tablas generadas: un saldo alterado, un retiro leído como depósito,
+   montos intercambiados con el saldo (como los deja la lectura por texto de Banorte) y saldos
+   ausentes. Cada caso debe marcar exactamente las filas esperadas y no cuadrar; el de saldos
+   ausentes debe cuadrar.
+3. Tiempo de conciliar tablas de 1 000 a 100 000 filas; la pendiente log-log debe quedarse
+   cerca de 1 (lineal).
+
+Falla (código de salida 1) si algo no se cumple.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.verificar_conciliacion
+    python -m benchmarks.verificar_conciliacion --bancos banorte --transacciones 2000
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.services import analizador, conciliacion
+from app.services.tabla_transacciones import TablaTransacciones
+from benchmarks.bench_parsers import pendiente_log_log
+from benchmarks.estados_sinteticos import generar_estado
+from benchmarks.verificar_motores import BANCOS
+
+TRANSACCIONES = (40, 400)
+TAMANOS = (1_000, 10_000, 100_000)
+PENDIENTE_MAXIMA = 1.3
+
+
+def tabla_aleatoria(filas: int, semilla: int = 0) -> Tuple[TablaTransacciones, Dict[str, int]]:
+    """Tabla con saldos consistentes y los totales de su resumen en centavos."""
+    aleatorio = random.Random(semilla)
+    tabla = TablaTransacciones()
+    saldo = inicial = 50_000_00
+    depositos = retiros = 0
+    tabla.agregar("01-ENE-24", "SALDO ANTERIOR", saldo=saldo / 100, tipo_movimiento="saldo_anterior")
+    for _ in range(filas - 1):
+        monto = aleatorio.randint(1, 900_000)
+        if aleatorio.random() < 0.5 or saldo < monto:
+            saldo += monto
+            depositos += monto
+            tabla.agregar("02-ENE-24", "DEPOSITO", deposito=monto / 100, saldo=saldo / 100, tipo_movimiento="ingreso")
+        else:
+            saldo -= monto
+            retiros += monto
+            tabla.agregar("02-ENE-24", "RETIRO", retiro=monto / 100, saldo=saldo / 100, tipo_movimiento="gasto")
+    return tabla, {"saldo_inicial": inicial, "total_depositos": depositos,
+                   "total_retiros": retiros, "saldo_final": saldo}
+
+
+def verificar_sinteticos(bancos: List[str], transacciones: List[int]) -> List[str]:
+    fallas = []
+    with tempfile.TemporaryDirectory() as directorio:
+        for banco in bancos:
+            for cantidad in transacciones:
+                ruta = os.path.join(directorio, f"{banco}-{cantidad}.pdf")
+                generar_estado(banco, ruta, transacciones=cantidad)
+                resultado = analizador.analizar_documento(ruta)
+                for numero, cuenta in enumerate(resultado["cuentas"]):
+                    detalle = cuenta.get("conciliacion")
+                    if detalle is None:
+                        continue
+                    print(f"{banco}-{cantidad} cuenta {numero}: confianza {detalle['confianza']:.4f}  "
+                          f"eslabones {detalle['eslabones']:>5}  descuadradas {len(detalle['filas_descuadradas'])}")
+                    if not detalle["cuadra"]:
+                        fallas.append(f"{banco}-{cantidad} cuenta {numero}: no cuadra ({detalle['diferencias']})")
+    return fallas
+
+
+def verificar_errores() -> List[str]:
+    casos: List[Tuple[str, TablaTransacciones, Dict[str, int], List[int], bool]] = []
+
+    tabla, totales = tabla_aleatoria(200, 1)
+    tabla.actualizar(50, saldo=tabla.saldo(50) + 1)
+    casos.append(("saldo alterado", tabla, totales, [50, 51], False))
+
+    tabla, totales = tabla_aleatoria(200, 2)
+    fila = next(i for i in range(100, 200) if tabla.retiros[i])
+    tabla.actualizar(fila, deposito=tabla.retiros[fila], retiro=0.0)
+    casos.append(("retiro como depósito", tabla, totales, [fila], False))
+
+    tabla, totales = tabla_aleatoria(200, 3)
+    fila = next(i for i in range(100, 200) if tabla.retiros[i])
+    tabla.actualizar(fila, retiro=tabla.saldos[fila], saldo=tabla.retiros[fila])
+    # La fila intercambiada sigue cuadrando con la anterior; la cadena se rompe en la siguiente.
+    casos.append(("monto y saldo intercambiados", tabla, totales, [fila + 1], False))
+
+    tabla, totales = tabla_aleatoria(200, 4)
+    for i in range(10, 200, 3):
+        tabla.actualizar(i, saldo=None)
+    casos.append(("saldos ausentes", tabla, totales, [], True))
+
+    fallas = []
+    for nombre, tabla, totales, esperadas, cuadra in casos:
+        detalle = conciliacion.conciliar(tabla, **totales)
+        print(f"{nombre:<30} confianza {detalle['confianza']:.4f}  descuadradas {detalle['filas_descuadradas']}")
+        if detalle["filas_descuadradas"] != esperadas or detalle["cuadra"] != cuadra:
+            fallas.append(f"{nombre}: se esperaban las filas {esperadas} (cuadra={cuadra})")
+    return fallas
+
+
+def medir(tabla: TablaTransacciones, totales: Dict[str, Optional[int]], repeticiones: int = 5) -> float:
+    mejor = math.inf
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        conciliacion.conciliar(tabla, **totales)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def verificar_escalamiento() -> List[str]:
+    tiempos = []
+    for filas in TAMANOS:
+        tabla, totales = tabla_aleatoria(filas)
+        tiempos.append(medir(tabla, totales))
+        print(f"{filas:>8} filas  {tiempos[-1] * 1e3:>8.2f} ms  ({tiempos[-1] / filas * 1e9:.0f} ns por fila)")
+    pendiente = pendiente_log_log(list(TAMANOS), tiempos)
+    print(f"pendiente log-log: {pendiente:.2f}")
+    if pendiente > PENDIENTE_MAXIMA:
+        return [f"la conciliación escala con pendiente {pendiente:.2f} (máximo {PENDIENTE_MAXIMA})"]
+    return []
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bancos", nargs="+", default=list(BANCOS), choices=list(BANCOS))
+    parser.add_argument("--transacciones", nargs="+", type=int, default=list(TRANSACCIONES))
+    args = parser.parse_args()
+
+    fallas = verificar_sinteticos(args.bancos, args.transacciones)
+    print()
+    fallas += verificar_errores()
+    print()
+    fallas += verificar_escalamiento()
+
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    if fallas:
+        sys.exit(1)
+    print("\nLa conciliación marca las filas esperadas y escala linealmente.")
+
+
+if __name__ == "__main__":
+    main()
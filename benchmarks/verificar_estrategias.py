@@ -0,0 +1,173 @@
+# benchmarks/verificar_estrategias.py
+"""
+Verificación del orden aprendido de las estrategias de extracción (app/services/estrategias.py)
+en Banorte y BBVA.
+
+Cada lote de estados sintéticos (benchmarks/estados_sinteticos.py) se analiza con el
+procesador de su banco dos veces: olvidando lo aprendido antes de cada documento y
+conservándolo entre documentos. Se hace con el formato normal (la lectura por columnas
+funciona) y con un formato en el que las columnas no se reconocen (las columnas requeridas no
+existen), donde la estrategia barata nunca sirve. Los resultados deben ser idénticos con y sin
+memoria; se informan los intentos de cada estrategia y el tiempo de cada modo.
+
+Además, con BBVA, un estado corto cuyo pie de página queda justo debajo de la tabla se analiza
+antes que uno largo del mismo formato: el largo debe leerse completo por columnas (el pie del
+corto no debe recortar sus páginas).
+
+Y en una huella en la que la primera vez ninguna estrategia cuadró, una estrategia que después
+sí cuadra debe volver a probarse (a más tardar cada estrategias.REVALIDAR_CADA usos).
+
+Falla (código de salida 1) si algún resultado difiere.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.verificar_estrategias
+    python -m benchmarks.verificar_estrategias --bancos bbva --transacciones 1000 --documentos 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from app.core.respuestas import serializar
+from app.services import columnas, estrategias, metricas, pdf_processor_banorte, pdf_processor_bbva
+from app.services.tabla_transacciones import convertir_resultado
+from benchmarks.estados_sinteticos import generar_estado
+
+PROCESADORES: Dict[str, Tuple[Callable[[str], dict], object]] = {
+    "banorte": (pdf_processor_banorte.procesar_estado_de_cuenta_banorte, pdf_processor_banorte.FORMATO_TABLA),
+    "bbva": (pdf_processor_bbva.procesar_estado_de_cuenta_bbva, pdf_processor_bbva.FORMATO_TABLA),
+}
+TRANSACCIONES = 300
+DOCUMENTOS = 4
+
+
+def vaciar_caches_columnas() -> None:
+    # Las columnas aprendidas por encabezado no deben pasar de un formato al otro.
+    columnas._DISPOSICIONES._datos.clear()
+
+
+@contextmanager
+def sin_columnas(formato) -> Iterator[None]:
+    """Simula un formato cuya tabla no se puede leer por columnas mientras dura el bloque."""
+    previo = formato.requeridas
+    formato.requeridas = ("inexistente",)
+    vaciar_caches_columnas()
+    try:
+        yield
+    finally:
+        formato.requeridas = previo
+        vaciar_caches_columnas()
+
+
+def intentos() -> Counter:
+    valores = metricas.instantanea().get(metricas.ESTRATEGIAS.nombre, {})
+    return Counter({f"{estrategia}:{resultado}": cantidad for (_, estrategia, resultado), cantidad in valores.items()})
+
+
+def analizar_lote(procesar: Callable[[str], dict], rutas: List[str], con_memoria: bool) -> Tuple[List[bytes], float, Counter]:
+    estrategias.reiniciar()
+    metricas.reiniciar()
+    salidas = []
+    inicio = time.perf_counter()
+    for ruta in rutas:
+        if not con_memoria:
+            estrategias.reiniciar()
+        salidas.append(serializar(convertir_resultado(procesar(ruta))))
+    return salidas, time.perf_counter() - inicio, intentos()
+
+
+def verificar_pie(directorio: str) -> List[str]:
+    corto, largo = os.path.join(directorio, "bbva-pie-corto.pdf"), os.path.join(directorio, "bbva-pie-largo.pdf")
+    generar_estado("bbva", corto, transacciones=15, pie="ESTIMADO CLIENTE: consulte su estado de cuenta en linea.")
+    esperado = generar_estado("bbva", largo, transacciones=80, semilla=1)["transacciones"]
+    vaciar_caches_columnas()
+    estrategias.reiniciar()
+    metricas.reiniciar()
+    procesar, _ = PROCESADORES["bbva"]
+    procesar(corto)
+    obtenidas = sum(len(cuenta["transacciones"]) for cuenta in procesar(largo)["cuentas"])
+    intentos_pie = intentos()
+    print(f"bbva     pie tras tabla corta: {obtenidas} de {esperado} transacciones  intentos {dict(sorted(intentos_pie.items()))}")
+    if obtenidas != esperado or intentos_pie["columnas:cuadra"] != 2:
+        return [f"bbva: tras un estado corto con pie, el largo da {obtenidas} de {esperado} transacciones "
+                f"y su lectura por columnas no cuadra"]
+    return []
+
+
+def verificar_revalidacion() -> List[str]:
+    """La estrategia cara descuadra en el primer documento y cuadra en los demás."""
+    llamadas = Counter()
+
+    def extractor(nombre: str, cuadra_desde: int) -> Callable[[], dict]:
+        def extraer() -> dict:
+            llamadas[nombre] += 1
+            return {"cuadra": llamadas[nombre] >= cuadra_desde, "confianza": 0.5 if nombre == "barata" else 0.1}
+        return extraer
+
+    def conciliar(resultado: dict) -> dict:
+        return {**resultado, "eslabones": 1, "diferencias": {}}
+
+    estrategias.reiniciar()
+    selector = estrategias.SelectorEstrategias("prueba", [
+        estrategias.Estrategia("barata", 1, extractor("barata", cuadra_desde=10**6)),
+        estrategias.Estrategia("cara", 2, extractor("cara", cuadra_desde=2)),
+    ])
+    usos = [selector.extraer("huella", conciliar)["cuadra"] for _ in range(2 * estrategias.REVALIDAR_CADA)]
+    estrategias.reiniciar()
+    print(f"revalidación: la estrategia que cuadra se vuelve a probar en el uso {usos.index(True) + 1 if True in usos else '-'}"
+          f"  llamadas {dict(sorted(llamadas.items()))}")
+    if True not in usos or usos.index(True) > estrategias.REVALIDAR_CADA:
+        return ["revalidación: tras no cuadrar la primera vez, las demás estrategias no se vuelven a probar"]
+    return []
+
+
+def verificar(banco: str, rutas: List[str]) -> List[str]:
+    procesar, formato = PROCESADORES[banco]
+    fallas = []
+    for nombre_formato, simular in (("normal", nullcontext), ("sin columnas", sin_columnas)):
+        with simular(formato):
+            sin, duracion_sin, intentos_sin = analizar_lote(procesar, rutas, con_memoria=False)
+            con, duracion_con, intentos_con = analizar_lote(procesar, rutas, con_memoria=True)
+        iguales = sin == con
+        print(f"{banco:<8} {nombre_formato:<13} {duracion_sin:>6.2f} s sin memoria -> {duracion_con:>6.2f} s con memoria  "
+              f"resultado {'igual' if iguales else 'DISTINTO'}")
+        print(f"{'':<23}intentos sin memoria: {dict(sorted(intentos_sin.items()))}")
+        print(f"{'':<23}intentos con memoria: {dict(sorted(intentos_con.items()))}")
+        if not iguales:
+            fallas.append(f"{banco} ({nombre_formato}): el resultado cambia con la memoria de estrategias")
+    return fallas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bancos", nargs="+", default=list(PROCESADORES), choices=list(PROCESADORES))
+    parser.add_argument("--transacciones", type=int, default=TRANSACCIONES)
+    parser.add_argument("--documentos", type=int, default=DOCUMENTOS)
+    args = parser.parse_args()
+
+    fallas = []
+    with tempfile.TemporaryDirectory() as directorio:
+        for banco in args.bancos:
+            rutas = []
+            for semilla in range(args.documentos):
+                ruta = os.path.join(directorio, f"{banco}-{semilla}.pdf")
+                generar_estado(banco, ruta, transacciones=args.transacciones, semilla=semilla)
+                rutas.append(ruta)
+            fallas += verificar(banco, rutas)
+        if "bbva" in args.bancos:
+            fallas += verificar_pie(directorio)
+    fallas += verificar_revalidacion()
+
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    if fallas:
+        sys.exit(1)
+    print("\nLos resultados son los mismos con y sin memoria de estrategias.")
+
+
+if __name__ == "__main__":
+    main()
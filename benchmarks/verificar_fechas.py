@@ -0,0 +1,84 @@
+# benchmarks/verificar_fechas.py
+"""
+Verificación de la interpretación de fechas compartida (app/services/fechas.py).
+
+1. Un ejemplo del formato de cada banco, con y sin año, en un periodo de enero y en uno que
+   cruza de diciembre a enero (las fechas de diciembre sin año son del año anterior).
+2. Tiempo de interpretar las fechas de 100 000 movimientos (con los días de un mes repetidos,
+   como en un estado real) con el cache y sin él.
+
+Falla (código de salida 1) si alguna fecha no es la esperada.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.verificar_fechas
+"""
+import sys
+import time
+from datetime import date
+from typing import List, Optional, Tuple
+
+from app.services import fechas
+
+ENERO = date(2024, 1, 31)
+DICIEMBRE_ENERO = date(2024, 1, 14)
+MOVIMIENTOS = 100_000
+
+# (texto, fin del periodo, fecha esperada en ISO)
+CASOS: List[Tuple[str, date, Optional[str]]] = [
+    ("05-ENE-24", ENERO, "2024-01-05"),                 # Banorte
+    ("28-DIC-23", DICIEMBRE_ENERO, "2023-12-28"),
+    ("05/ENE", ENERO, "2024-01-05"),                    # BBVA
+    ("28/DIC", DICIEMBRE_ENERO, "2023-12-28"),
+    ("05/01/2024", ENERO, "2024-01-05"),
+    ("05 ENE", ENERO, "2024-01-05"),                    # Banamex, BanBajío, Scotiabank
+    ("28 DIC", DICIEMBRE_ENERO, "2023-12-28"),
+    ("02 ENE", DICIEMBRE_ENERO, "2024-01-02"),
+    ("ENE 05", ENERO, "2024-01-05"),                    # Scotiabank
+    ("DIC 28", DICIEMBRE_ENERO, "2023-12-28"),
+    ("05-ENE-2024", ENERO, "2024-01-05"),               # Santander
+    ("31 DE ENERO DE 2024", ENERO, "2024-01-31"),       # Banamex
+    ("01 FEB", ENERO, "2024-02-01"),                    # Un día después del corte: mismo año
+    ("31 FEB", ENERO, None),
+    ("SALDO ANTERIOR", ENERO, None),
+]
+
+
+def verificar_casos() -> List[str]:
+    fallas = []
+    for texto, fin, esperada in CASOS:
+        obtenida = fechas.a_iso(fechas.fecha_en_periodo(texto, fin))
+        print(f"{texto:<22} fin {fin.isoformat()}  ->  {obtenida}")
+        if obtenida != esperada:
+            fallas.append(f"{texto!r} con fin {fin.isoformat()}: {obtenida}, se esperaba {esperada}")
+    return fallas
+
+
+def medir() -> None:
+    textos = [f"{dia:02d} ENE" for dia in range(1, 32)] * (MOVIMIENTOS // 31)
+    fechas.fecha_en_periodo.cache_clear()
+    inicio = time.perf_counter()
+    for texto in textos:
+        fechas.fecha_en_periodo(texto, ENERO)
+    con_cache = time.perf_counter() - inicio
+
+    # Sin cache: la interpretación de cada texto con el año ya resuelto.
+    interpretar = fechas.interpretar_fecha.__wrapped__
+    inicio = time.perf_counter()
+    for texto in textos:
+        interpretar(texto, ENERO.year)
+    sin = time.perf_counter() - inicio
+    print(f"\n{len(textos)} fechas: {sin * 1e3:.1f} ms sin cache, {con_cache * 1e3:.1f} ms con cache")
+
+
+def main() -> None:
+    fallas = verificar_casos()
+    medir()
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    if fallas:
+        sys.exit(1)
+    print("\nTodas las fechas son las esperadas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# benchmarks/verificar_lote.py
+"""
+Verificación de la conversión masiva (app/services/lote.py).
+
+1. Un lote de estados sintéticos (benchmarks/estados_sinteticos.py) de varios bancos, con un
+   archivo que no es PDF, se convierte con 1, 2 y 4 trabajadores: cada documento debe aparecer
+   una sola vez en `resultados.ndjson` con el mismo resultado que el análisis directo
+   (analizador.analizar_documento y el esquema v2). Se informa el rendimiento de cada corrida.
+2. El mismo lote desde un ZIP da los mismos resultados.
+3. Reanudación: una conversión interrumpida a la mitad y otra cortada a mitad de un bloque
+   (punto de control con una línea incompleta, resultados y una parte Parquet sin anotar)
+   terminan al reanudarse con cada documento exactamente una vez.
+4. Con pyarrow instalado, las partes Parquet tienen una fila por transacción del NDJSON.
+
+Falla (código de salida 1) si algo no se cumple.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.verificar_lote
+    python -m benchmarks.verificar_lote --documentos 4 --transacciones 500 --trabajadores 1 2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import zipfile
+from typing import Dict, List
+
+import orjson
+
+from app.core.respuestas import serializar
+from app.services import analizador, esquema_v2, lote
+from benchmarks.estados_sinteticos import generar_estado
+
+BANCOS = ("banorte", "bbva", "banbajio", "scotiabank", "banamex_personal", "santander")
+DOCUMENTOS = 2
+TRANSACCIONES = 200
+TRABAJADORES = (1, 2, 4)
+
+
+class Interrupcion(Exception):
+    pass
+
+
+def generar_lote(directorio: str, documentos: int, transacciones: int) -> None:
+    for banco in BANCOS:
+        os.makedirs(os.path.join(directorio, banco))
+        for semilla in range(documentos):
+            ruta = os.path.join(directorio, banco, f"{banco}-{semilla}.pdf")
+            generar_estado(banco, ruta, transacciones=transacciones, semilla=semilla)
+    with open(os.path.join(directorio, "no_es_pdf.pdf"), "wb") as archivo:
+        archivo.write(b"texto plano")
+
+
+def referencia(directorio: str) -> Dict[str, bytes]:
+    """Resultado v2 de cada documento analizado directamente, en este proceso."""
+    resultados = {}
+    for documento in lote.buscar_documentos(directorio):
+        try:
+            datos = analizador.analizar_documento(os.path.join(directorio, documento))
+        except Exception:
+            resultados[documento] = None
+            continue
+        resultados[documento] = serializar(esquema_v2.convertir_a_v2(datos))
+    return resultados
+
+
+def leer_resultados(directorio_salida: str) -> List[dict]:
+    with open(os.path.join(directorio_salida, lote.ARCHIVO_RESULTADOS), "rb") as archivo:
+        return [orjson.loads(linea) for linea in archivo]
+
+
+def comparar(nombre: str, directorio_salida: str, esperados: Dict[str, bytes]) -> List[str]:
+    lineas = leer_resultados(directorio_salida)
+    documentos = [linea["archivo"] for linea in lineas]
+    if sorted(documentos) != sorted(esperados):
+        return [f"{nombre}: {len(documentos)} líneas para {len(esperados)} documentos "
+                f"(repetidos: {sorted({d for d in documentos if documentos.count(d) > 1})})"]
+    fallas = []
+    for linea in lineas:
+        obtenido = serializar(linea["resultado"]) if "resultado" in linea else None
+        if obtenido != esperados[linea["archivo"]]:
+            fallas.append(f"{nombre}: {linea['archivo']} difiere del análisis directo ({linea['estado']})")
+    return fallas
+
+
+def verificar_trabajadores(directorio: str, salida: str, esperados: Dict[str, bytes], trabajadores: List[int]) -> List[str]:
+    fallas = []
+    for cantidad in trabajadores:
+        destino = os.path.join(salida, f"trabajadores-{cantidad}")
+        progreso = lote.convertir_lote(directorio, destino, trabajadores=cantidad)
+        print(f"{cantidad} trabajadores: {progreso.terminados} documentos en {progreso.transcurrido_s:.2f} s  "
+              f"{progreso.documentos_por_s:.2f} documentos/s  {progreso.transacciones_por_s:.0f} transacciones/s")
+        fallas += comparar(f"{cantidad} trabajadores", destino, esperados)
+    return fallas
+
+
+def verificar_zip(directorio: str, salida: str, esperados: Dict[str, bytes]) -> List[str]:
+    ruta_zip = os.path.join(salida, "lote.zip")
+    with zipfile.ZipFile(ruta_zip, "w") as comprimido:
+        for documento in lote.buscar_documentos(directorio):
+            comprimido.write(os.path.join(directorio, documento), documento)
+    destino = os.path.join(salida, "zip")
+    lote.convertir_lote(ruta_zip, destino, trabajadores=2)
+    print("ZIP convertido")
+    return comparar("ZIP", destino, esperados)
+
+
+def verificar_reanudacion(directorio: str, salida: str, esperados: Dict[str, bytes]) -> List[str]:
+    parquet = lote.pyarrow is not None
+    fallas = []
+
+    # Interrumpida en el primer reporte de avance: lo que ya terminó queda confirmado.
+    destino = os.path.join(salida, "interrumpida")
+
+    def interrumpir(progreso: lote.Progreso) -> None:
+        if progreso.terminados:
+            raise Interrupcion()
+
+    try:
+        lote.convertir_lote(directorio, destino, trabajadores=2, parquet=parquet, documentos_por_bloque=2,
+                            al_progresar=interrumpir, intervalo_progreso_s=0.5)
+    except Interrupcion:
+        pass
+    previos = len(leer_resultados(destino))
+    progreso = lote.convertir_lote(directorio, destino, trabajadores=2, parquet=parquet, documentos_por_bloque=2)
+    print(f"interrumpida: {previos} documentos antes de interrumpir, {progreso.terminados} al reanudar")
+    fallas += comparar("interrumpida", destino, esperados)
+
+    # Cortada a mitad de un bloque: se deshace el último bloque anotado como si el proceso hubiera
+    # muerto después de escribir sus resultados y su parte pero antes de terminar de anotarlo.
+    destino = os.path.join(salida, "cortada")
+    lote.convertir_lote(directorio, destino, trabajadores=2, parquet=parquet, documentos_por_bloque=3)
+    ruta_control = os.path.join(destino, lote.ARCHIVO_PUNTO_CONTROL)
+    with open(ruta_control, "rb") as archivo:
+        bloques = archivo.readlines()
+    with open(ruta_control, "wb") as archivo:
+        archivo.writelines(bloques[:-1])
+        archivo.write(bloques[-1][: len(bloques[-1]) // 2])
+    with open(os.path.join(destino, lote.ARCHIVO_RESULTADOS), "ab") as archivo:
+        archivo.write(b'{"archivo": "incompl')
+    if parquet:
+        with open(os.path.join(destino, lote.DIRECTORIO_PARTES, "parte-99999.parquet.tmp"), "wb") as archivo:
+            archivo.write(b"PAR1")
+    progreso = lote.convertir_lote(directorio, destino, trabajadores=2, parquet=parquet, documentos_por_bloque=3)
+    print(f"cortada: {progreso.previos} documentos en el punto de control, {progreso.terminados} al reanudar")
+    fallas += comparar("cortada", destino, esperados)
+    if parquet:
+        fallas += verificar_parquet(destino)
+    return fallas
+
+
+def verificar_parquet(destino: str) -> List[str]:
+    filas = lote.pyarrow.parquet.read_table(os.path.join(destino, lote.DIRECTORIO_PARTES)).num_rows
+    transacciones = sum(
+        len(cuenta["transacciones"])
+        for linea in leer_resultados(destino) if "resultado" in linea
+        for cuenta in linea["resultado"]["cuentas"]
+    )
+    print(f"Parquet: {filas} filas, {transacciones} transacciones en el NDJSON")
+    if filas != transacciones:
+        return [f"Parquet: {filas} filas para {transacciones} transacciones"]
+    return []
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documentos", type=int, default=DOCUMENTOS, help="Documentos por banco.")
+    parser.add_argument("--transacciones", type=int, default=TRANSACCIONES)
+    parser.add_argument("--trabajadores", nargs="+", type=int, default=list(TRABAJADORES))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio, tempfile.TemporaryDirectory() as salida:
+        generar_lote(directorio, args.documentos, args.transacciones)
+        esperados = referencia(directorio)
+        print(f"{len(esperados)} documentos, {os.cpu_count()} CPUs\n")
+        fallas = verificar_trabajadores(directorio, salida, esperados, args.trabajadores)
+        fallas += verificar_zip(directorio, salida, esperados)
+        if lote.pyarrow is None:
+            print("pyarrow no está instalado: no se verifican las partes Parquet.")
+        fallas += verificar_reanudacion(directorio, salida, esperados)
+
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    if fallas:
+        sys.exit(1)
+    print("\nCada documento se convierte una sola vez y con el mismo resultado que el análisis directo.")
+
+
+if __name__ == "__main__":
+    main()
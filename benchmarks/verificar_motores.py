@@ -0,0 +1,136 @@
+# benchmarks/verificar_motores.py
+"""
+Paridad entre los motores de extracción (app/services/extraccion.py).
+
+Cada documento se analiza completo (identificación y procesador, como en el endpoint) una vez
+con cada motor y los resultados serializados deben ser idénticos byte a byte. También se
+compara el texto de cada página y se mide el tiempo de cada motor.
+
+Los documentos son estados sintéticos de cada banco (benchmarks/estados_sinteticos.py) o,
+con --directorio, los PDFs de un directorio (p. ej. estados reales de un banco antes de
+cambiar su motor en MOTORES_POR_BANCO). Falla (código de salida 1) si algún resultado difiere.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.verificar_motores
+    python -m benchmarks.verificar_motores --bancos bbva banorte --transacciones 50 2000
+    python -m benchmarks.verificar_motores --directorio /ruta/a/estados/banorte
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+from app.core.respuestas import serializar
+from app.services import analizador, extraccion
+from app.services.tabla_transacciones import convertir_resultado
+from benchmarks.estados_sinteticos import BANCOS_SOPORTADOS, generar_estado
+
+# Santander se procesa con OCR, no con los motores de extracción.
+BANCOS = tuple(banco for banco in BANCOS_SOPORTADOS if banco != "santander")
+TRANSACCIONES = (20, 200, 1000)
+SEMILLAS = 2
+
+
+@contextmanager
+def motor_forzado(motor: str) -> Iterator[None]:
+    """Usa `motor` para todos los bancos mientras dura el bloque."""
+    previo = extraccion.MOTOR_EXTRACCION, dict(extraccion.MOTORES_POR_BANCO)
+    extraccion.MOTOR_EXTRACCION = motor
+    extraccion.MOTORES_POR_BANCO.clear()
+    try:
+        yield
+    finally:
+        extraccion.MOTOR_EXTRACCION = previo[0]
+        extraccion.MOTORES_POR_BANCO.clear()
+        extraccion.MOTORES_POR_BANCO.update(previo[1])
+
+
+def analizar(ruta_pdf: str, motor: str) -> Tuple[bytes, float]:
+    """Resultado serializado del análisis con `motor` (o el error, si lo hubo) y su duración."""
+    inicio = time.perf_counter()
+    with motor_forzado(motor):
+        try:
+            salida = serializar(convertir_resultado(analizador.analizar_documento(ruta_pdf)))
+        except analizador.ErrorAnalisis as e:
+            salida = f"ErrorAnalisis({e.resultado}): {e.detalle}".encode()
+    return salida, time.perf_counter() - inicio
+
+
+def paginas_distintas(ruta_pdf: str, motores: List[str]) -> Tuple[int, int]:
+    """Páginas cuyo texto no es igual con todos los motores, y total de páginas."""
+    documentos = [extraccion.abrir(ruta_pdf, motor=motor) for motor in motores]
+    try:
+        paginas = documentos[0].numero_paginas()
+        distintas = sum(
+            len({documento.texto_pagina(indice) for documento in documentos}) > 1 for indice in range(paginas)
+        )
+        return distintas, paginas
+    finally:
+        for documento in documentos:
+            documento.cerrar()
+
+
+def verificar(casos: List[Tuple[str, str]], motores: List[str]) -> List[str]:
+    fallas = []
+    tiempos: Dict[str, float] = {motor: 0.0 for motor in motores}
+    for nombre, ruta in casos:
+        salidas = {}
+        for motor in motores:
+            salidas[motor], duracion = analizar(ruta, motor)
+            tiempos[motor] += duracion
+        distintas, paginas = paginas_distintas(ruta, motores)
+        iguales = len(set(salidas.values())) == 1
+        print(f"{nombre:<40} {paginas:>4} págs  texto distinto en {distintas:>3}  "
+              f"resultado {'igual' if iguales else 'DISTINTO'}")
+        if not iguales:
+            fallas.append(f"{nombre}: el resultado depende del motor")
+
+    print()
+    referencia = tiempos[motores[0]]
+    for motor in motores:
+        print(f"{motor:<12} {tiempos[motor]:>8.2f} s   ({referencia / tiempos[motor]:.1f}x contra {motores[0]})")
+    return fallas
+
+
+def casos_sinteticos(directorio: str, bancos: List[str], transacciones: List[int], semillas: int) -> List[Tuple[str, str]]:
+    casos = []
+    for banco in bancos:
+        for cantidad in transacciones:
+            for semilla in range(semillas):
+                nombre = f"{banco}-{cantidad}-{semilla}"
+                ruta = os.path.join(directorio, nombre + ".pdf")
+                generar_estado(banco, ruta, transacciones=cantidad, semilla=semilla)
+                casos.append((nombre, ruta))
+    return casos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bancos", nargs="+", default=list(BANCOS), choices=list(BANCOS))
+    parser.add_argument("--transacciones", nargs="+", type=int, default=list(TRANSACCIONES))
+    parser.add_argument("--semillas", type=int, default=SEMILLAS)
+    parser.add_argument("--directorio", help="Verifica los PDFs de este directorio en lugar de los sintéticos.")
+    parser.add_argument("--motores", nargs="+", default=list(extraccion.MOTORES), choices=list(extraccion.MOTORES))
+    args = parser.parse_args()
+
+    if args.directorio:
+        casos = [(nombre, os.path.join(args.directorio, nombre))
+                 for nombre in sorted(os.listdir(args.directorio)) if nombre.lower().endswith(".pdf")]
+        fallas = verificar(casos, args.motores)
+    else:
+        with tempfile.TemporaryDirectory() as directorio:
+            casos = casos_sinteticos(directorio, args.bancos, args.transacciones, args.semillas)
+            fallas = verificar(casos, args.motores)
+
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    if fallas:
+        sys.exit(1)
+    print(f"\n{len(casos)} documentos con el mismo resultado en {', '.join(args.motores)}.")
+
+
+if __name__ == "__main__":
+    main()
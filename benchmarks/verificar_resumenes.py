@@ -0,0 +1,194 @@
+# benchmarks/verificar_resumenes.py
+"""
+Verificación de la extracción acotada de resúmenes (app/services/bloques.py) en BBVA
+(extraer_resumen_comportamiento) y BanBajío (extraer_resumen_cuenta_pesos/_dolares).
+
+1. Equivalencia: sobre el texto de estados sintéticos y variantes (bloques repetidos, partes
+   faltantes, ruido alrededor) el resultado debe ser el mismo que con los patrones de bloque
+   originales ("ANCLA .*? A .*? B" con re.DOTALL), que se conservan aquí como referencia.
+2. Entradas adversarias: anclas repetidas sin el resto del bloque, secuencias de dígitos sin
+   punto decimal, montos sin su etiqueta... a tamaños crecientes. La pendiente log-log del
+   tiempo contra el tamaño debe quedarse cerca de 1 (lineal); con los patrones originales
+   varias de estas entradas son cuadráticas.
+
+Falla (código de salida 1) si algo no se cumple.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.verificar_resumenes
+    python -m benchmarks.verificar_resumenes --referencia   # mide también los patrones originales
+"""
+import argparse
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+import pdfplumber
+
+from app.services import pdf_processor_banbajio, pdf_processor_bbva
+from benchmarks.bench_parsers import pendiente_log_log
+from benchmarks.estados_sinteticos import generar_estado
+
+PENDIENTE_MAXIMA = 1.3
+TAMANOS = (25_000, 50_000, 100_000, 200_000)
+
+# --- Patrones originales, como referencia ---
+_REFERENCIA_BBVA = re.compile(
+    r"Saldo de Operación Inicial\s+([\d,]+\.\d{2})"
+    r".*?Depósitos\s*/\s*Abonos\s*\(\+\)\s+\d+\s+([\d,]+\.\d{2})"
+    r".*?Retiros\s*/\s*Cargos\s*\(\-\)\s+\d+\s+([\d,]+\.\d{2})"
+    r".*?Saldo Final\s*\(\+\)\s+([\d,]+\.\d{2})",
+    re.DOTALL | re.IGNORECASE,
+)
+_REFERENCIA_PESOS = re.compile(
+    r"SALDO ANTERIOR.*?\(\+\)\s*DEPOSITOS.*?\(\-\)\s*CARGOS.*?SALDO ACTUAL"
+    r".*?\$\s*([\d,]+\.\d{2}).*?\$\s*([\d,]+\.\d{2}).*?\$\s*([\d,]+\.\d{2}).*?\$\s*([\d,]+\.\d{2})",
+    re.DOTALL,
+)
+_REFERENCIA_DOLARES = re.compile(
+    r"SALDO ANTERIOR.*?\(\+\)\s*DEPOSITOS.*?\(\-\)\s*CARGOS.*?SALDO ACTUAL"
+    r".*?\s*([\d,]+\.\d{2})\s*USD.*?\s*([\d,]+\.\d{2})\s*USD.*?\s*([\d,]+\.\d{2})\s*USD.*?\s*([\d,]+\.\d{2})\s*USD",
+    re.DOTALL,
+)
+
+
+def _referencia(patron: re.Pattern) -> Callable[[str], Tuple[float, ...]]:
+    def extraer(texto: str) -> Tuple[float, ...]:
+        match = patron.search(texto)
+        return tuple(float(g.replace(",", "")) for g in match.groups()) if match else (0.0,) * 4
+    return extraer
+
+
+FUNCIONES: Dict[str, Tuple[Callable[[str], Dict], Callable[[str], Tuple[float, ...]]]] = {
+    "bbva.extraer_resumen_comportamiento": (pdf_processor_bbva.extraer_resumen_comportamiento, _referencia(_REFERENCIA_BBVA)),
+    "banbajio.extraer_resumen_cuenta_pesos": (pdf_processor_banbajio.extraer_resumen_cuenta_pesos, _referencia(_REFERENCIA_PESOS)),
+    "banbajio.extraer_resumen_cuenta_dolares": (pdf_processor_banbajio.extraer_resumen_cuenta_dolares, _referencia(_REFERENCIA_DOLARES)),
+}
+
+# Entradas adversarias por función: (nombre, generador de texto de aproximadamente n caracteres).
+ADVERSARIAS: Dict[str, List[Tuple[str, Callable[[int], str]]]] = {
+    "bbva.extraer_resumen_comportamiento": [
+        ("anclas_sin_cierre", lambda n: "Saldo de Operación Inicial 1,000.00 x\n" * (n // 37)),
+        ("anclas_y_depositos", lambda n: "Saldo de Operación Inicial 1.00 Depósitos / Abonos (+) 3 2.00\n" * (n // 61)),
+        ("digitos_sin_decimal", lambda n: "Saldo de Operación Inicial " + "1" * n),
+    ],
+    "banbajio.extraer_resumen_cuenta_pesos": [
+        ("anclas_sin_cierre", lambda n: "SALDO ANTERIOR x\n" * (n // 17)),
+        ("encabezados_sin_montos", lambda n: "SALDO ANTERIOR (+) DEPOSITOS (-) CARGOS SALDO ACTUAL\n" * (n // 53)),
+        ("montos_incompletos", lambda n: "SALDO ANTERIOR (+) DEPOSITOS (-) CARGOS SALDO ACTUAL $ 1.00 $ 2.00 $ 3.00 "
+                                         + "$ " + "9" * n),
+    ],
+    "banbajio.extraer_resumen_cuenta_dolares": [
+        ("anclas_sin_cierre", lambda n: "SALDO ANTERIOR x\n" * (n // 17)),
+        ("digitos_sin_decimal", lambda n: "SALDO ANTERIOR (+) DEPOSITOS (-) CARGOS SALDO ACTUAL " + "1" * n),
+        ("montos_sin_usd", lambda n: "SALDO ANTERIOR (+) DEPOSITOS (-) CARGOS SALDO ACTUAL " + "1,234.56 MXN " * (n // 13)),
+    ],
+}
+
+
+def _valores(resultado: Dict) -> Tuple[float, ...]:
+    return tuple(resultado.values())
+
+
+def textos_sinteticos() -> Dict[str, List[str]]:
+    """Texto de estados sintéticos de BBVA y BanBajío, preparado como en cada procesador."""
+    textos: Dict[str, List[str]] = {nombre: [] for nombre in FUNCIONES}
+    with tempfile.TemporaryDirectory() as directorio:
+        for semilla, transacciones in enumerate((20, 200, 1000)):
+            ruta = os.path.join(directorio, "bbva.pdf")
+            generar_estado("bbva", ruta, transacciones=transacciones, semilla=semilla)
+            with pdfplumber.open(ruta) as pdf:
+                textos["bbva.extraer_resumen_comportamiento"].append(
+                    "".join((pagina.extract_text(x_tolerance=2) or "") + "\n" for pagina in pdf.pages)
+                )
+            ruta = os.path.join(directorio, "banbajio.pdf")
+            generar_estado("banbajio", ruta, transacciones=transacciones, semilla=semilla)
+            with pdfplumber.open(ruta) as pdf:
+                texto = pdf_processor_banbajio.limpiar_texto_ocr(
+                    "".join(pagina.extract_text(x_tolerance=2, y_tolerance=2) or "" for pagina in pdf.pages)
+                )
+            corte = texto.find("CUENTA DE CHEQUES EN DOLARES")
+            textos["banbajio.extraer_resumen_cuenta_pesos"].append(texto[texto.find("CUENTA CONECTA BANBAJIO"):corte])
+            textos["banbajio.extraer_resumen_cuenta_dolares"].append(texto[corte:])
+    return textos
+
+
+def variantes(texto: str, rng: random.Random) -> List[str]:
+    """El texto original más variantes con el texto repetido, ruido al inicio o líneas eliminadas."""
+    lineas = texto.splitlines()
+    resultado = [texto, texto + "\n" + texto, "ruido inicial\n" * 50 + texto]
+    for _ in range(10):
+        copia = list(lineas)
+        for _ in range(rng.randint(1, 3)):
+            if copia:
+                del copia[rng.randrange(len(copia))]
+        resultado.append("\n".join(copia))
+    # Sin cada una de las líneas del resumen (las primeras 15): el bloque queda incompleto.
+    resultado.extend("\n".join(lineas[:i] + lineas[i + 1:]) for i in range(min(15, len(lineas))))
+    return resultado
+
+
+def verificar_equivalencia() -> List[str]:
+    fallas = []
+    rng = random.Random(40)
+    for nombre, textos in textos_sinteticos().items():
+        funcion, referencia = FUNCIONES[nombre]
+        casos = [variante for texto in textos for variante in variantes(texto, rng)]
+        distintos = [i for i, texto in enumerate(casos) if _valores(funcion(texto)) != referencia(texto)]
+        print(f"{nombre:<42} equivalencia: {len(casos) - len(distintos)}/{len(casos)} casos iguales")
+        if distintos:
+            fallas.append(f"{nombre}: {len(distintos)} casos distintos de la referencia")
+    return fallas
+
+
+def medir(funcion: Callable[[str], object], texto: str, repeticiones: int = 3) -> float:
+    mejor = math.inf
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(texto)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def verificar_linealidad(tamanos: List[int], con_referencia: bool) -> List[str]:
+    fallas = []
+    for nombre, casos in ADVERSARIAS.items():
+        funcion, referencia = FUNCIONES[nombre]
+        for caso, generar in casos:
+            textos = [generar(n) for n in tamanos]
+            tiempos = [medir(funcion, texto) for texto in textos]
+            pendiente = pendiente_log_log([len(t) for t in textos], tiempos)
+            linea = f"{nombre:<42} {caso:<24} {tiempos[-1] * 1000:>8.2f} ms  pendiente {pendiente:>5.2f}"
+            if con_referencia:
+                # La referencia solo a tamaños menores: algunas entradas son cúbicas con ella.
+                chicos = [generar(tamanos[0] // 8), generar(tamanos[0] // 4)]
+                tiempos_ref = [medir(referencia, texto, 1) for texto in chicos]
+                linea += f"   referencia pendiente {pendiente_log_log([len(t) for t in chicos], tiempos_ref):>5.2f}"
+            print(linea)
+            if pendiente > PENDIENTE_MAXIMA:
+                fallas.append(f"{nombre} con {caso}: pendiente {pendiente:.2f} (máximo {PENDIENTE_MAXIMA})")
+    return fallas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", nargs="+", type=int, default=list(TAMANOS))
+    parser.add_argument("--referencia", action="store_true", help="Mide también los patrones originales.")
+    args = parser.parse_args()
+
+    fallas = verificar_equivalencia()
+    print()
+    fallas += verificar_linealidad(sorted(args.tamanos), args.referencia)
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    if fallas:
+        sys.exit(1)
+    print("\nEquivalencia y tiempo lineal verificados.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# benchmarks/verificar_vigilancia.py
+"""
+Verificación de la ingesta de una carpeta (app/services/vigilancia.py).
+
+El vigilante corre como en producción (python -m app.cli.vigilar, en otro proceso) sobre un
+directorio temporal al que se copian estados sintéticos (benchmarks/estados_sinteticos.py),
+uno de ellos escrito en dos partes como lo haría una sincronización lenta.
+
+1. Con 1, 2 y 4 trabajadores: tiempo desde la primera copia hasta que el último documento
+   queda en el manifiesto (documentos por segundo). Después se copian los mismos PDFs con otro
+   nombre: no deben volver a analizarse. El archivo que no es PDF falla con "error", que es
+   pasajero: debe reintentarse exactamente REINTENTOS veces antes de anotarse.
+2. Caída: el vigilante se mata con SIGKILL en cuanto anota el primer documento, se copian más
+   PDFs con el proceso detenido y se vuelve a arrancar.
+3. Reinicio: sobre la carpeta ya procesada, un vigilante nuevo no vuelve a calcular la huella
+   de ningún archivo salvo la del que se modificó.
+
+En todos los casos cada documento debe aparecer exactamente una vez en `resultados.ndjson`, con
+el mismo resultado que el análisis directo, y con --junto su `<archivo>.pdf.json` al lado.
+
+Falla (código de salida 1) si algo no se cumple.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.verificar_vigilancia
+    python -m benchmarks.verificar_vigilancia --documentos 3 --trabajadores 2 4
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List
+
+from app.services import lote, vigilancia
+from benchmarks.verificar_lote import comparar, generar_lote, leer_resultados, referencia
+
+DOCUMENTOS = 1
+TRANSACCIONES = 200
+TRABAJADORES = (1, 2, 4)
+ESTABILIDAD_S = 1.0
+REVISION_S = 1.0
+REINTENTOS = 2
+ESPERA_MAXIMA_S = 300
+
+
+def arrancar(directorio: str, salida: str, trabajadores: int, registro: str = os.devnull) -> subprocess.Popen:
+    entorno = dict(os.environ, LOG_FORMATO="json",
+                   VIGILANCIA_REVISION_S=str(REVISION_S), VIGILANCIA_REINTENTOS=str(REINTENTOS))
+    with open(registro, "ab") as salida_registro:
+        return subprocess.Popen(
+            [sys.executable, "-m", "app.cli.vigilar", directorio, "--salida", salida, "--junto",
+             "--trabajadores", str(trabajadores), "--estabilidad", str(ESTABILIDAD_S)],
+            stdout=salida_registro,
+            env=entorno,
+            start_new_session=True,
+        )
+
+
+def detener(proceso: subprocess.Popen) -> None:
+    proceso.send_signal(signal.SIGTERM)
+    proceso.wait(ESPERA_MAXIMA_S)
+
+
+def anotados(salida: str) -> int:
+    ruta = os.path.join(salida, lote.ARCHIVO_PUNTO_CONTROL)
+    return len(lote.PuntoControl(ruta).terminados) if os.path.exists(ruta) else 0
+
+
+def esperar(salida: str, cantidad: int) -> None:
+    limite = time.monotonic() + ESPERA_MAXIMA_S
+    while anotados(salida) < cantidad:
+        if time.monotonic() > limite:
+            raise TimeoutError(f"solo {anotados(salida)} de {cantidad} documentos anotados")
+        time.sleep(0.05)
+
+
+def copiar(origen: str, destino: str, documentos: List[str], sufijo: str = "") -> None:
+    """Copia los PDFs; el primero en dos partes, con una pausa menor a la estabilidad."""
+    for numero, documento in enumerate(documentos):
+        ruta = os.path.join(destino, documento[:-4] + sufijo + ".pdf")
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(os.path.join(origen, documento), "rb") as archivo:
+            contenido = archivo.read()
+        corte = len(contenido) // 2 if numero == 0 else 0
+        with open(ruta, "wb") as archivo:
+            if corte:
+                archivo.write(contenido[:corte])
+                archivo.flush()
+                time.sleep(ESTABILIDAD_S / 2)
+            archivo.write(contenido[corte:])
+
+
+def verificar_junto(nombre: str, directorio: str, esperados: Dict[str, bytes]) -> List[str]:
+    faltan = [documento for documento in esperados if not os.path.exists(os.path.join(directorio, documento) + ".json")]
+    return [f"{nombre}: falta el resultado junto a {', '.join(faltan)}"] if faltan else []
+
+
+def verificar_reintentos(nombre: str, salida: str, registro: str) -> List[str]:
+    """Cada documento anotado con un estado pasajero se reintentó REINTENTOS veces; los demás, ninguna."""
+    with open(registro, "rb") as archivo:
+        eventos = [json.loads(linea) for linea in archivo if linea.startswith(b"{")]
+    reintentos = Counter(evento["archivo"] for evento in eventos if evento["mensaje"].startswith("Falla pasajera"))
+    esperados = Counter({
+        linea["archivo"]: REINTENTOS
+        for linea in leer_resultados(salida) if linea["estado"] in vigilancia.ESTADOS_TRANSITORIOS
+    })
+    if reintentos != esperados:
+        return [f"{nombre}: reintentos {dict(reintentos)}, se esperaban {dict(esperados)}"]
+    return []
+
+
+def verificar_trabajadores(origen: str, base: str, esperados: Dict[str, bytes], trabajadores: List[int]) -> List[str]:
+    fallas = []
+    documentos = sorted(esperados)
+    for cantidad in trabajadores:
+        directorio, salida = os.path.join(base, f"carpeta-{cantidad}"), os.path.join(base, f"salida-{cantidad}")
+        os.makedirs(directorio)
+        registro = os.path.join(base, f"registro-{cantidad}.ndjson")
+        proceso = arrancar(directorio, salida, cantidad, registro)
+        try:
+            time.sleep(2)  # Arranque del pool y del vigilante.
+            inicio = time.monotonic()
+            copiar(origen, directorio, documentos)
+            esperar(salida, len(documentos))
+            duracion = time.monotonic() - inicio
+            # Los mismos contenidos con otro nombre: se omiten.
+            copiar(origen, directorio, documentos, sufijo="-copia")
+            time.sleep(ESTABILIDAD_S + 3)
+        finally:
+            detener(proceso)
+        print(f"{cantidad} trabajadores: {len(documentos)} documentos en {duracion:.2f} s  "
+              f"{len(documentos) / duracion:.2f} documentos/s")
+        fallas += comparar(f"{cantidad} trabajadores", salida, esperados)
+        fallas += verificar_junto(f"{cantidad} trabajadores", directorio, esperados)
+        fallas += verificar_reintentos(f"{cantidad} trabajadores", salida, registro)
+    return fallas
+
+
+def verificar_caida(origen: str, base: str, esperados: Dict[str, bytes]) -> List[str]:
+    documentos = sorted(esperados)
+    mitad = len(documentos) // 2
+    directorio, salida = os.path.join(base, "carpeta-caida"), os.path.join(base, "salida-caida")
+    os.makedirs(directorio)
+
+    proceso = arrancar(directorio, salida, 2)
+    copiar(origen, directorio, documentos[:mitad])
+    esperar(salida, 1)
+    os.killpg(proceso.pid, signal.SIGKILL)
+    proceso.wait()
+    antes = anotados(salida)
+    # Llegan más documentos con el vigilante detenido.
+    copiar(origen, directorio, documentos[mitad:])
+
+    proceso = arrancar(directorio, salida, 2)
+    try:
+        esperar(salida, len(documentos))
+        time.sleep(ESTABILIDAD_S + 1)
+    finally:
+        detener(proceso)
+    print(f"caída: {antes} documentos anotados antes de SIGKILL, {len(leer_resultados(salida))} líneas al final")
+    return comparar("caída", salida, esperados) + verificar_junto("caída", directorio, esperados)
+
+
+def verificar_reinicio(base: str) -> List[str]:
+    directorio, salida = os.path.join(base, "carpeta-caida"), os.path.join(base, "salida-caida")
+    modificado = os.path.join(directorio, lote.buscar_documentos(directorio)[0])
+    os.utime(modificado, ns=(time.time_ns(), time.time_ns()))
+    calculadas = []
+    original = vigilancia.huella_archivo
+    vigilancia.huella_archivo = lambda ruta: calculadas.append(ruta) or original(ruta)
+    try:
+        vigilante = vigilancia.VigilanteCarpeta(directorio, salida, estabilidad_s=0)
+        vigilante.revisar()
+        vigilante.paso()
+        vigilante.cerrar()
+    finally:
+        vigilancia.huella_archivo = original
+    print(f"reinicio: {len(calculadas)} huellas calculadas de {len(lote.buscar_documentos(directorio))} archivos")
+    if calculadas != [modificado]:
+        return [f"reinicio: se calcularon las huellas de {[os.path.relpath(r, directorio) for r in calculadas]}, "
+                f"se esperaba solo la del archivo modificado"]
+    return []
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documentos", type=int, default=DOCUMENTOS, help="Documentos por banco.")
+    parser.add_argument("--transacciones", type=int, default=TRANSACCIONES)
+    parser.add_argument("--trabajadores", nargs="+", type=int, default=list(TRABAJADORES))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as origen, tempfile.TemporaryDirectory() as base:
+        generar_lote(origen, args.documentos, args.transacciones)
+        esperados = referencia(origen)
+        print(f"{len(esperados)} documentos, {os.cpu_count()} CPUs\n")
+        fallas = verificar_trabajadores(origen, base, esperados, args.trabajadores)
+        fallas += verificar_caida(origen, base, esperados)
+        fallas += verificar_reinicio(base)
+
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    if fallas:
+        sys.exit(1)
+    print("\nCada PDF se analiza exactamente una vez por contenido, también después de una caída.")
+
+
+if __name__ == "__main__":
+    main()